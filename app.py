@@ -1,51 +1,112 @@
+import io
+import hashlib
 import logging
 import traceback
 from datetime import datetime
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
-from flask_openapi3 import OpenAPI, Info, Tag
+from flask_openapi3 import Info, Tag
 from database import db, init_db
+from config import configuracao_cache_produtos, configurar_banco
+from services.documentacao import API, configuracao_docs
+from services.logs import configurar_logs
+from services.metricas import configurar_metricas
+from services.detector import configurar_detector
 from models.pagamento import Pagamento
 from models.produto import Produto
 from models.estoque import Estoque
 from models.venda import Venda
 from models.vendaItem import VendaItem
+from models.saldoProduto import SaldoProduto
+from services.saldo import (EstoqueInsuficienteError, ProdutoInexistenteError, ajustar_saldo, criar_saldo_produto,
+                            reservar_estoque)
+from services.contadores import (TOTAL_ENTRADAS_ESTOQUE, TOTAL_PRODUTOS, TOTAL_SAIDAS_ESTOQUE,
+                                 VALOR_TOTAL_VENDAS, VERSAO_ESTOQUES, VERSAO_PRODUTOS,
+                                 incrementar_contador, ler_contador, ler_contadores)
+from services.busca import buscar_produtos
+from services.arquivo import codigos_arquivados
+from services.rollup import acumular_rollups, relatorio_vendas
+from services.saldo_historico import invalidar_checkpoints, saldo_na_data
+from services.venda import buscar_venda, dados_venda, listar_vendas, registrar_vendas_em_lote, saidas_da_venda
+from services.importacao import importar_estoques_csv
+from services.cache import criar_cache
+from services.fila_vendas import ResultadoDesconhecidoError, TempoEsgotadoError, configurar_fila_vendas
+from services.paginacao import codificar_cursor, decodificar_cursor
+from services.serializacao import codificar_json, estoque_como_dict, produto_como_dict, resposta_json, venda_como_dict
+from commands import registrar_comandos
 from schemas.mensagem import MensagemSchema
-from schemas.produto import ListagemProdutosSchema, ProdutoBuscaPorIDSchema, ProdutoCriarSchema, ProdutoSchema
-from schemas.estoque import EstoqueBuscaPorIDSchema, EstoqueSchema, ListagemEstoquesSchema
-from schemas.venda import VendaSchema
+from schemas.produto import ListagemProdutosSchema, ProdutoBuscaPorIDSchema, ProdutoBuscaTextualQuerySchema, ProdutoCriarSchema, ProdutoListagemQuerySchema, ProdutoSchema
+from schemas.estoque import EstoqueBuscaPorIDSchema, EstoqueImportacaoFormSchema, EstoqueImportacaoResultadoSchema, EstoqueListagemQuerySchema, EstoqueSaldoQuerySchema, EstoqueSaldoSchema, EstoqueSchema, ListagemEstoquesSchema
+from schemas.venda import ListagemVendasSchema, RelatorioVendasQuerySchema, RelatorioVendasSchema, VendaBuscaQuerySchema, VendaListagemQuerySchema, VendaLoteResultadoSchema, VendaLoteSchema, VendaPendenteSchema, VendaSchema
 from schemas.error import ErrorSchema
 from sqlalchemy.exc import SQLAlchemyError
-from schemas.response import ValorSchema, TotalSchema
+from werkzeug.http import quote_etag
+from schemas.response import CacheEstatisticasSchema, DashboardSchema, ValorSchema, TotalSchema
 from flask_migrate import Migrate
 import os
 from dotenv import load_dotenv
 
-logging.basicConfig(level=logging.DEBUG)  
 logger = logging.getLogger(__name__)
 
 load_dotenv()  # Carrega as variáveis de ambiente do arquivo .env
 
-database_url = os.getenv("DATABASE_URL")
-
 # Informações da API
 info = Info(title="VestSoft  API", version="1.0.0", description="API para gerenciar produtos, estoque e vendas.")
-app = OpenAPI(__name__, info=info)
+# Documentação em /openapi (OPENAPI_DOCS), com a especificação pré-gerada em OPENAPI_ARQUIVO
+app = API(__name__, info=info, **configuracao_docs())
 CORS(app)
 
-# Configurações do banco de dados
-basedir = os.path.abspath(os.path.dirname(__file__))
-app.config["SQLALCHEMY_DATABASE_URI"] = 'sqlite:///' + os.path.join(basedir, 'database.db')
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-db.init_app(app)
+# Log estruturado em JSON, escrito por uma thread própria (LOG_LEVEL, LOG_FORMATO, LOG_SQL)
+configurar_logs(app)
+
+# Configurações do banco de dados (DATABASE_URL, PRAGMAs do SQLite e pool de conexões)
+configurar_banco(app, db)
+
+# Métricas por rota em /metrics (apenas com METRICAS_HABILITADAS=1)
+configurar_metricas(app, db)
+
+# Detector de N+1 e de SQL lento (DETECTOR_DESEMPENHO=log|erro, apenas desenvolvimento/CI)
+configurar_detector(app, db)
 
 # Inicializa o Flask-Migrate com a aplicação e o banco de dados
 migrate = Migrate(app, db)
 
+# Cache de leitura dos produtos (local por processo, ou compartilhado via PRODUTO_CACHE_URL)
+produto_cache = criar_cache(**configuracao_cache_produtos())
+
+# Com VENDAS_VALIDAR_ESTOQUE=1 as vendas reservam o estoque e são rejeitadas sem saldo
+VALIDAR_ESTOQUE = os.getenv("VENDAS_VALIDAR_ESTOQUE", "0").lower() in ("1", "true", "sim")
+
+# Commit em grupo das vendas concorrentes (apenas com VENDAS_COMMIT_EM_GRUPO=1)
+fila_vendas = configurar_fila_vendas(app, db, validar_estoque=VALIDAR_ESTOQUE)
+
+# Registra os comandos de manutenção (flask recalcular-saldos, ...)
+registrar_comandos(app)
+
+# Tipo de conteúdo das respostas em streaming (uma entrada JSON por linha)
+NDJSON_MIMETYPE = "application/x-ndjson"
+
 # Tags para categorização dos endpoints
 produto_tag = Tag(name="Produto", description="Endpoints para gerenciar produtos.")
 estoque_tag = Tag(name="Estoque", description="Endpoints para gerenciar o estoque.")
 venda_tag = Tag(name="Venda", description="Endpoints para gerenciar vendas.")
+dashboard_tag = Tag(name="Dashboard", description="Totalizadores para a tela de início.")
+
+def etag_listagem(nome_versao):
+    """Gera a ETag forte de uma listagem a partir da versão da tabela.
+
+    A versão é um contador incrementado pelas escritas. A URL e o formato
+    aceito entram no hash, pois filtros, páginas e NDJSON geram corpos distintos.
+    """
+    versao = int(ler_contador(db.session, nome_versao))
+    variante = f"{request.full_path}|{request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE])}"
+    return f"{versao}-{hashlib.sha1(variante.encode()).hexdigest()[:16]}"
+
+def resposta_nao_modificada(etag):
+    """Resposta 304 para um If-None-Match que ainda corresponde à versão atual."""
+    resposta = Response(status=304)
+    resposta.set_etag(etag)
+    return resposta
 
 # Endpoints
 @app.post("/produtos", tags=[produto_tag], responses={"201": ProdutoSchema})
@@ -53,7 +114,12 @@ def criar_produto(body: ProdutoCriarSchema):
     """Cria um novo produto."""
     produto = Produto(**body.dict())
     db.session.add(produto)
+    db.session.flush()  # Gera produto.id para a linha de saldo
+    criar_saldo_produto(db.session, produto.id)
+    incrementar_contador(db.session, TOTAL_PRODUTOS, 1)
+    incrementar_contador(db.session, VERSAO_PRODUTOS, 1)
     db.session.commit()
+    produto_cache.remover(chave_produto(produto.id))
 
     # Reutilizando apresenta_produtos para retornar o produto criado
     return {"produto": apresenta_produtos([produto])[0]}, 201
@@ -66,8 +132,8 @@ def get_produto(query: ProdutoBuscaPorIDSchema):
     Retorna uma representação dos produtos e comentários associados.
     """
     produto_id = query.id
-    # fazendo a busca
-    produto = db.session.query(Produto).filter(Produto.id == produto_id).first()
+    # fazendo a busca (primeiro no cache)
+    produto = carrega_produtos([produto_id]).get(produto_id)
 
     if not produto:
         # se o produto não foi encontrado
@@ -75,50 +141,92 @@ def get_produto(query: ProdutoBuscaPorIDSchema):
         return {"mesage": error_msg}, 404
     else:
         # retorna a representação de produto
-        return ProdutoSchema.from_orm(produto).dict(), 200
+        return produto, 200
 
 
 @app.get('/produtos', tags=[produto_tag],
-         responses={"200": ListagemProdutosSchema, "404": ErrorSchema})
-def get_produtos():
+         responses={"200": ListagemProdutosSchema, "400": ErrorSchema})
+def get_produtos(query: ProdutoListagemQuerySchema):
     """
-    Faz a busca por todos os Produtos cadastrados.
+    Faz a busca paginada dos Produtos cadastrados.
 
-    Retorna uma representação da listagem de produtos com o saldo em estoque.
+    Retorna uma página da listagem de produtos com o saldo em estoque, ordenada
+    pelo id. Para obter a página seguinte, envie o proximo_cursor recebido no
+    parâmetro after.
     """
     session = db.session
 
-    # Busca todos os produtos
-    produtos = session.query(Produto).all()
+    # Sem alterações desde a última consulta do cliente: 304 sem executar a listagem
+    etag = etag_listagem(VERSAO_PRODUTOS)
+    if request.if_none_match.contains(etag):
+        return resposta_nao_modificada(etag)
+
+    after_id = 0
+    if query.after:
+        try:
+            after_id = int(decodificar_cursor(query.after)["id"])
+        except (ValueError, KeyError, TypeError):
+            return {"mesage": "Cursor de paginação inválido."}, 400
+
+    # Uma única consulta por página: produtos + totais pré-agregados de entradas e saídas.
+    # Os dados cadastrais não vêm do cache de produtos: o corpo precisa corresponder à ETag.
+    saldo = (db.func.coalesce(SaldoProduto.total_entradas, 0)
+             - db.func.coalesce(SaldoProduto.total_saidas, 0))
+    linhas = session.query(Produto.id, Produto.nome, Produto.descricao, Produto.preco, saldo).outerjoin(
+        SaldoProduto, SaldoProduto.produto_id == Produto.id
+    ).filter(
+        Produto.id > after_id
+    ).order_by(Produto.id).limit(query.limit + 1).all()
+
+    # A linha excedente indica que existe uma próxima página
+    proximo_cursor = None
+    if len(linhas) > query.limit:
+        linhas = linhas[:query.limit]
+        proximo_cursor = codificar_cursor(id=linhas[-1].id)
+
+    produtos_com_saldo = [
+        dict(produto_como_dict(produto_id, nome, descricao, preco), saldo=saldo_produto)
+        for produto_id, nome, descricao, preco, saldo_produto in linhas
+    ]
+
+    return {"produtos": produtos_com_saldo, "proximo_cursor": proximo_cursor}, 200, {"ETag": quote_etag(etag)}
+
+@app.get('/produtos/busca', tags=[produto_tag],
+         responses={"200": ListagemProdutosSchema, "400": ErrorSchema})
+def buscar_produtos_por_texto(query: ProdutoBuscaTextualQuerySchema):
+    """
+    Busca produtos pelo nome e pela descrição.
 
-    if not produtos:
-        return {"produtos": []}, 200
+    Todos os termos informados precisam aparecer, cada um como prefixo de uma
+    palavra ("cami alg" encontra "Camisa de algodão"), sem diferenciar acentos
+    ou maiúsculas. Os produtos vêm ordenados por relevância, com o saldo em
+    estoque, e são paginados pelo proximo_cursor.
+    """
+    etag = etag_listagem(VERSAO_PRODUTOS)
+    if request.if_none_match.contains(etag):
+        return resposta_nao_modificada(etag)
 
-    produtos_com_saldo = []
-    for produto in produtos:
-        # Calcula o total de entradas no estoque
-        total_estoque = session.query(
-            db.func.sum(Estoque.quantidade)
-        ).filter(Estoque.produto_id == produto.id).scalar() or 0
+    apos = None
+    if query.after:
+        try:
+            chave = decodificar_cursor(query.after)
+            apos = (float(chave["relevancia"]), int(chave["id"]))
+        except (ValueError, KeyError, TypeError):
+            return {"mesage": "Cursor de paginação inválido."}, 400
 
-        # Calcula o total de saídas (vendas)
-        total_vendas = session.query(
-            db.func.sum(VendaItem.quantidade)
-        ).filter(VendaItem.produto_id == produto.id).scalar() or 0
+    linhas = buscar_produtos(db.session, query.q, query.limit, apos)
 
-        # Saldo = total_estoque - total_vendas
-        saldo = total_estoque - total_vendas
+    proximo_cursor = None
+    if len(linhas) > query.limit:
+        linhas = linhas[:query.limit]
+        proximo_cursor = codificar_cursor(relevancia=linhas[-1].relevancia, id=linhas[-1].produto_id)
 
-        # Adiciona o produto com saldo à lista
-        produtos_com_saldo.append({
-            "id": produto.id,
-            "nome": produto.nome,
-            "descricao": produto.descricao,
-            "preco": produto.preco,
-            "saldo": saldo
-        })
+    produtos_com_saldo = [
+        dict(produto_como_dict(linha.produto_id, linha.nome, linha.descricao, linha.preco), saldo=linha.saldo)
+        for linha in linhas
+    ]
 
-    return {"produtos": produtos_com_saldo}, 200
+    return {"produtos": produtos_com_saldo, "proximo_cursor": proximo_cursor}, 200, {"ETag": quote_etag(etag)}
 
 @app.put('/produto', tags=[produto_tag],
          responses={"200": ProdutoSchema, "404": ErrorSchema})
@@ -149,7 +257,9 @@ def atualizar_produto(body: ProdutoSchema):
         if key != "id":  # Ignorar o ID para evitar conflitos
             setattr(produto, key, value)
 
+    incrementar_contador(session, VERSAO_PRODUTOS, 1)
     session.commit()
+    produto_cache.remover(chave_produto(produto_id))
 
     return apresenta_produtos([produto])[0], 200
 
@@ -173,49 +283,157 @@ def deletar_produto(query: ProdutoBuscaPorIDSchema):
     if not produto:
         return {"message": f"Produto com ID {query.id} não encontrado."}, 404
 
-    # Removendo o produto
+    # Removendo o produto e o seu saldo materializado
+    session.query(SaldoProduto).filter(SaldoProduto.produto_id == produto.id).delete()
     session.delete(produto)
+    incrementar_contador(session, TOTAL_PRODUTOS, -1)
+    incrementar_contador(session, VERSAO_PRODUTOS, 1)
     session.commit()
+    produto_cache.remover(chave_produto(query.id))
 
     return MensagemSchema(message=f"Produto com ID {query.id} deletado com sucesso.").dict(), 200
 
 def apresenta_produtos(produtos):
-    """Converte os objetos Produto em uma lista de dicionários.
+    """Converte os objetos Produto em uma lista de dicionários (formato de ProdutoSchema).
 
     Funciona tanto para uma lista quanto para um único produto.
     """
-    return [ProdutoSchema.from_orm(produto).dict() for produto in produtos]
+    return [produto_como_dict(produto.id, produto.nome, produto.descricao, produto.preco)
+            for produto in produtos]
+
+def chave_produto(produto_id):
+    """Chave do produto no cache de leitura."""
+    return f"produto:{produto_id}"
+
+def carrega_produtos(produto_ids):
+    """Carrega os produtos pelo id, consultando primeiro o cache.
+
+    Os produtos ausentes do cache são buscados em uma única consulta e
+    armazenados. Criação, alteração e exclusão removem a chave do produto
+    após o commit. Retorna um dicionário id -> representação do produto, sem
+    os ids inexistentes.
+    """
+    encontrados = produto_cache.obter_varios([chave_produto(produto_id) for produto_id in produto_ids])
+    produtos = {produto["id"]: produto for produto in encontrados.values()}
+
+    faltantes = [produto_id for produto_id in produto_ids if produto_id not in produtos]
+    if faltantes:
+        linhas = db.session.query(Produto.id, Produto.nome, Produto.descricao, Produto.preco).filter(
+            Produto.id.in_(faltantes))
+        for linha in linhas:
+            produtos[linha.id] = produto_como_dict(*linha)
+            produto_cache.definir(chave_produto(linha.id), produtos[linha.id])
 
+    return produtos
 
-@app.post("/estoques", tags=[estoque_tag], responses={"201": EstoqueSchema})
+@app.get('/produtos/cache', tags=[produto_tag], responses={"200": CacheEstatisticasSchema})
+def get_estatisticas_cache_produtos():
+    """
+    Retorna as estatísticas do cache de produtos (acertos, falhas e despejos).
+
+    Os contadores são do processo que atendeu a requisição (campo processo).
+    """
+    return CacheEstatisticasSchema(processo=os.getpid(), **produto_cache.estatisticas()).dict(), 200
+
+
+@app.post("/estoques", tags=[estoque_tag], responses={"201": EstoqueSchema, "404": ErrorSchema})
 def criar_estoque(body: EstoqueSchema):
     """Adiciona uma nova entrada de estoque."""
     estoque = Estoque(**body.dict())
     db.session.add(estoque)
+    try:
+        ajustar_saldo(db.session, estoque.produto_id, entradas=estoque.quantidade)
+    except ProdutoInexistenteError as e:
+        db.session.rollback()
+        return {"message": str(e)}, 404
+    invalidar_checkpoints(db.session, estoque.data_entrada, [estoque.produto_id])
+    incrementar_contador(db.session, VERSAO_ESTOQUES, 1)
     db.session.commit()
     return EstoqueSchema.from_orm(estoque).dict(), 201
 
+@app.post("/estoques/importar", tags=[estoque_tag],
+          responses={"200": EstoqueImportacaoResultadoSchema, "400": ErrorSchema})
+def importar_estoques(form: EstoqueImportacaoFormSchema):
+    """Importa as entradas de estoque de uma nota fiscal a partir de um arquivo CSV.
+
+    O arquivo é lido em streaming e gravado em blocos, retornando as linhas
+    rejeitadas e a vazão da importação.
+    """
+    arquivo = io.TextIOWrapper(form.arquivo.stream, encoding="utf-8-sig", newline="")
+    try:
+        relatorio = importar_estoques_csv(db.session, arquivo, form.tamanho_lote)
+    except (ValueError, UnicodeDecodeError) as e:
+        db.session.rollback()
+        return {"mesage": f"Arquivo inválido: {e}"}, 400
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.exception("Erro ao importar estoques:")
+        return {"mesage": f"Erro ao importar estoques: {str(e)}"}, 400
+
+    return EstoqueImportacaoResultadoSchema(**relatorio).dict(), 200
+
 @app.get('/estoques', tags=[estoque_tag],
          responses={"200": ListagemEstoquesSchema, "404": ErrorSchema})
-def get_estoques():
-    """Faz a busca por todos os Estoques cadastrados.
+def get_estoques(query: EstoqueListagemQuerySchema):
+    """Faz a busca pelos Estoques cadastrados, com filtros opcionais.
 
-    Retorna uma representação da listagem de estoques.
+    Retorna uma representação da listagem de estoques. Com stream=1 ou com o
+    cabeçalho Accept: application/x-ndjson, as entradas são enviadas em NDJSON
+    (uma por linha) à medida que são lidas do banco, em lotes.
     """
     session = db.session
-    estoques = session.query(Estoque).all()
-
-    if not estoques:
-        return {"estoques": []}, 200
 
-    return {"estoques": apresenta_estoques(estoques)}, 200
+    # Sem alterações desde a última consulta do cliente: 304 sem executar a listagem
+    etag = etag_listagem(VERSAO_ESTOQUES)
+    if request.if_none_match.contains(etag):
+        return resposta_nao_modificada(etag)
+
+    consulta = session.query(Estoque)
+
+    # Filtros aplicados diretamente no SQL
+    if query.produto_id is not None:
+        consulta = consulta.filter(Estoque.produto_id == query.produto_id)
+    if query.data_inicio is not None:
+        consulta = consulta.filter(Estoque.data_entrada >= query.data_inicio)
+    if query.data_fim is not None:
+        consulta = consulta.filter(Estoque.data_entrada <= query.data_fim)
+    if query.numero_nota_fiscal is not None:
+        consulta = consulta.filter(Estoque.numero_nota_fiscal == query.numero_nota_fiscal)
+
+    formato = request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE])
+    if query.stream or formato == NDJSON_MIMETYPE:
+        resposta = Response(stream_with_context(gera_estoques_ndjson(consulta)), mimetype=NDJSON_MIMETYPE)
+        resposta.set_etag(etag)
+        return resposta
+
+    # Apenas as colunas da resposta, convertidas direto em dicionários
+    linhas = consulta.with_entities(
+        Estoque.id, Estoque.produto_id, Estoque.quantidade,
+        Estoque.data_entrada, Estoque.numero_nota_fiscal
+    )
+
+    return resposta_json({"estoques": [estoque_como_dict(*linha) for linha in linhas]},
+                         headers={"ETag": quote_etag(etag)})
+
+def gera_estoques_ndjson(consulta, tamanho_lote=1000):
+    """Gera as entradas de estoque em NDJSON lendo o resultado em lotes."""
+    linhas = consulta.with_entities(
+        Estoque.id, Estoque.produto_id, Estoque.quantidade,
+        Estoque.data_entrada, Estoque.numero_nota_fiscal
+    ).order_by(Estoque.id).yield_per(tamanho_lote)
+
+    # Mesmo formato da listagem em JSON (datas em RFC 822)
+    for linha in linhas:
+        yield codificar_json(estoque_como_dict(*linha)) + b"\n"
 
 def apresenta_estoques(estoques):
-    """Converte os objetos Estoque em uma lista de dicionários.
+    """Converte os objetos Estoque em uma lista de dicionários (formato de EstoqueSchema).
 
     Funciona tanto para uma lista quanto para um único estoque.
     """
-    return [EstoqueSchema.from_orm(estoque).dict() for estoque in estoques]
+    return [estoque_como_dict(estoque.id, estoque.produto_id, estoque.quantidade,
+                              estoque.data_entrada, estoque.numero_nota_fiscal)
+            for estoque in estoques]
 
 @app.put('/estoque', tags=[estoque_tag],
          responses={"200": EstoqueSchema, "404": ErrorSchema})
@@ -241,11 +459,23 @@ def atualizar_estoque(body: EstoqueSchema):
     if not estoque:
         return {"message": f"Estoque com ID {estoque_id} não encontrado."}, 404
 
+    # Estorna a entrada anterior do saldo antes de aplicar os novos dados
+    ajustar_saldo(session, estoque.produto_id, entradas=-estoque.quantidade)
+    desde, produto_anterior = estoque.data_entrada, estoque.produto_id
+
     # Atualizando os dados
     for key, value in body.dict().items():
         if key != "id":  # Ignorar o ID para evitar conflitos
             setattr(estoque, key, value)
 
+    try:
+        ajustar_saldo(session, estoque.produto_id, entradas=estoque.quantidade)
+    except ProdutoInexistenteError as e:
+        session.rollback()
+        return {"message": str(e)}, 404
+    invalidar_checkpoints(session, min(desde.date(), estoque.data_entrada.date()),
+                          {produto_anterior, estoque.produto_id})
+    incrementar_contador(session, VERSAO_ESTOQUES, 1)
     session.commit()
 
     return apresenta_estoques([estoque])[0], 200
@@ -270,13 +500,17 @@ def deletar_estoque(query: EstoqueBuscaPorIDSchema):
     if not estoque:
         return {"message": f"Estoque com ID {query.id} não encontrado."}, 404
 
-    # Removendo o estoque
+    # Removendo o estoque e estornando a entrada do saldo
+    ajustar_saldo(session, estoque.produto_id, entradas=-estoque.quantidade)
+    incrementar_contador(session, VERSAO_ESTOQUES, 1)
     session.delete(estoque)
+    invalidar_checkpoints(session, estoque.data_entrada, [estoque.produto_id])
     session.commit()
 
     return MensagemSchema(message=f"Estoque com ID {query.id} deletado com sucesso.").dict(), 200
 
-@app.post("/vendas", tags=[venda_tag], responses={"201": VendaSchema, "400": ErrorSchema})
+@app.post("/vendas", tags=[venda_tag],
+          responses={"201": VendaSchema, "202": VendaPendenteSchema, "400": ErrorSchema, "503": ErrorSchema})
 def criar_venda(body: VendaSchema):
     """
     Registra uma nova venda e seus itens, além dos pagamentos, se houver.
@@ -287,34 +521,41 @@ def criar_venda(body: VendaSchema):
     Returns:
         dict: Dados da venda registrada ou mensagem de erro.
     """
+    if fila_vendas:
+        return criar_venda_em_grupo(body)
+
     session = db.session
     try:
+        # O índice único de venda.codigo não cobre as vendas já arquivadas
+        if codigos_arquivados(session, [body.codigo]):
+            return {"message": "Erro ao registrar a venda: Já existe uma venda com este código."}, 400
+
+        if VALIDAR_ESTOQUE:
+            # Reserva atômica: falha sem gravar nada se algum item não tiver saldo
+            reservar_estoque(session, saidas_da_venda(body))
+
         data_criacao = datetime.utcnow()
         
         # Cria o cabeçalho da venda (não incluem dados específicos de item)
-        venda = Venda(
-            codigo=body.codigo,
-            data=data_criacao,
-            frete_cep=body.frete.cep if body.frete else None,
-            frete_logradouro=body.frete.logradouro if body.frete else None,
-            frete_numero=body.frete.numero if body.frete else None,
-            frete_complemento=body.frete.complemento if body.frete else None,
-            frete_bairro=body.frete.bairro if body.frete else None,
-            frete_cidade=body.frete.cidade if body.frete else None,
-            frete_uf=body.frete.uf if body.frete else None,
-        )
+        venda = Venda(**dados_venda(body, data_criacao))
         session.add(venda)
         session.flush()  # Gera venda.id para os itens associados
+        venda_id = venda.id
         
         # Cria os itens da venda na tabela VendaItem
         for item in body.itens:
             venda_item = VendaItem(
-                venda_id=venda.id,
+                venda_id=venda_id,
                 produto_id=item.produto_id,
                 quantidade=item.quantidade,
                 preco=item.preco
             )
             session.add(venda_item)
+            if not VALIDAR_ESTOQUE:
+                ajustar_saldo(session, item.produto_id, saidas=item.quantidade)
+        incrementar_contador(session, VALOR_TOTAL_VENDAS,
+                             sum(item.quantidade * item.preco for item in body.itens))
+        acumular_rollups(session, data_criacao, [body])
         
         # Registra os pagamentos, se houver (mantém a lógica atual)
         pagamentos_registrados = []
@@ -330,31 +571,154 @@ def criar_venda(body: VendaSchema):
         
         session.commit()
 
-        # Prepara o resultado: utilize os schemas se desejar retornar os dados
+        # Prepara o resultado a partir do corpo recebido, sem recarregar a venda e os itens
         resultado = {
-            "venda": VendaSchema.from_orm(venda).dict(),
+            "venda": venda_como_dict(venda_id, body.codigo, data_criacao, body.itens),
             "pagamentos": [{"forma": p.forma, "valor": p.valor} for p in pagamentos_registrados]
         }
         return jsonify(resultado), 201
 
+    except (EstoqueInsuficienteError, ProdutoInexistenteError) as e:
+        session.rollback()
+        return {"message": f"Erro ao registrar a venda: {str(e)}"}, 400
     except SQLAlchemyError as e:
         session.rollback()
         logger.exception("Erro ao registrar a venda:")
         return {"message": f"Erro ao registrar a venda: {str(e)}"}, 400
 
-# Totalizadores para a tela de início    
+def criar_venda_em_grupo(body):
+    """Registra a venda pela fila de commit em grupo, com a mesma resposta de criar_venda.
+
+    Com o prazo esgotado, responde 503 se a venda foi retirada da fila (pode
+    ser reenviada) ou 202 se o seu grupo já estava em gravação (o resultado
+    deve ser conferido em GET /venda?codigo= antes de reenviá-la).
+    """
+    try:
+        pedido = fila_vendas.registrar(body)
+    except TempoEsgotadoError as e:
+        return {"message": str(e)}, 503, {"Retry-After": "1"}
+    except ResultadoDesconhecidoError as e:
+        return VendaPendenteSchema(codigo=body.codigo, message=str(e)).dict(), 202
+
+    if not pedido.resultado["sucesso"]:
+        return {"message": f"Erro ao registrar a venda: {pedido.resultado['mensagem']}"}, 400
+
+    resultado = {
+        "venda": venda_como_dict(pedido.resultado["id"], body.codigo, pedido.data, body.itens),
+        "pagamentos": [{"forma": p.forma, "valor": p.valor} for p in body.pagamentos or []]
+    }
+    return jsonify(resultado), 201
+
+@app.post("/vendas/lote", tags=[venda_tag], responses={"200": VendaLoteResultadoSchema})
+def criar_vendas_lote(body: VendaLoteSchema):
+    """
+    Registra um lote de vendas (ex.: sincronização offline dos PDVs).
+
+    As vendas são gravadas com inserções em massa, em transações de até
+    tamanho_lote vendas. O resultado informa, para cada venda, se ela foi
+    registrada ou o motivo da rejeição (ex.: código duplicado). Se um erro do
+    banco interromper o lote, as vendas já gravadas continuam informadas como
+    registradas e as demais como não registradas.
+    """
+    resultados = registrar_vendas_em_lote(db.session, body.vendas, datetime.utcnow(), body.tamanho_lote,
+                                          validar_estoque=VALIDAR_ESTOQUE)
+
+    registradas = sum(1 for resultado in resultados if resultado["sucesso"])
+    return VendaLoteResultadoSchema(
+        registradas=registradas,
+        rejeitadas=len(resultados) - registradas,
+        resultados=resultados
+    ).dict(), 200
+
+@app.get('/vendas', tags=[venda_tag], responses={"200": ListagemVendasSchema, "400": ErrorSchema})
+def get_vendas(query: VendaListagemQuerySchema):
+    """Faz a busca pelas Vendas registradas, com filtros opcionais de data e código.
+
+    Retorna uma página das vendas, ordenada pelo id, com itens, frete e
+    pagamentos. Para obter a página seguinte, envie o proximo_cursor recebido
+    no parâmetro after. Cada página custa três consultas: vendas, itens e
+    pagamentos. Com incluir_arquivadas=1, inclui as vendas movidas para o
+    banco de arquivo.
+    """
+    session = db.session
+
+    after_id = 0
+    if query.after:
+        try:
+            after_id = int(decodificar_cursor(query.after)["id"])
+        except (ValueError, KeyError, TypeError):
+            return {"mesage": "Cursor de paginação inválido."}, 400
+
+    vendas, mais = listar_vendas(session, query.limit, after_id, query.codigo, query.data_inicio, query.data_fim,
+                                 query.incluir_arquivadas)
+
+    proximo_cursor = codificar_cursor(id=vendas[-1].id) if mais else None
+
+    return ListagemVendasSchema(
+        vendas=vendas,
+        proximo_cursor=proximo_cursor
+    ).dict(), 200
+
+@app.get('/venda', tags=[venda_tag], responses={"200": VendaSchema, "400": ErrorSchema, "404": ErrorSchema})
+def get_venda(query: VendaBuscaQuerySchema):
+    """Faz a busca por uma Venda a partir do id ou do código da venda.
+
+    Com incluir_arquivadas=1, a venda também é procurada no banco de arquivo.
+    """
+    if query.id is None and not query.codigo:
+        return {"message": "Informe o id ou o código da venda."}, 400
+
+    venda = buscar_venda(db.session, query.id, query.codigo, query.incluir_arquivadas)
+
+    if not venda:
+        return {"message": "Venda não encontrada."}, 404
+
+    return venda.dict(), 200
+
+@app.get('/vendas/relatorio', tags=[venda_tag], responses={"200": RelatorioVendasSchema, "400": ErrorSchema})
+def get_relatorio_vendas(query: RelatorioVendasQuerySchema):
+    """
+    Retorna quantidade vendida, receita e número de vendas por dia, semana ou mês.
+
+    Os totais são lidos dos rollups diários mantidos a cada venda registrada,
+    sem percorrer as tabelas de vendas e itens.
+    """
+    if query.de > query.ate:
+        return {"message": "O período informado é inválido: 'de' é posterior a 'ate'."}, 400
+
+    periodos = relatorio_vendas(db.session, query.de, query.ate, query.granularidade, query.produto_id)
+
+    return RelatorioVendasSchema(
+        de=query.de,
+        ate=query.ate,
+        granularidade=query.granularidade,
+        produto_id=query.produto_id,
+        periodos=periodos
+    ).model_dump(mode="json"), 200  # datas em ISO 8601 (AAAA-MM-DD)
+
+# Totalizadores para a tela de início (lidos dos contadores mantidos pelas escritas)
+@app.get('/dashboard', tags=[dashboard_tag], responses={"200": DashboardSchema})
+def get_dashboard():
+    """
+    Retorna todos os totalizadores da tela de início em uma única consulta.
+    """
+    contadores = ler_contadores(db.session)
+
+    return DashboardSchema(
+        valor_total_vendas=contadores.get(VALOR_TOTAL_VENDAS, 0.0),
+        total_produtos=contadores.get(TOTAL_PRODUTOS, 0),
+        total_estoque=contadores.get(TOTAL_ENTRADAS_ESTOQUE, 0) - contadores.get(TOTAL_SAIDAS_ESTOQUE, 0)
+    ).dict(), 200
+
+
 @app.get('/vendas/total', tags=[venda_tag], responses={"200": ValorSchema})
 def get_valor_total_vendas():
     """
     Retorna o valor total das vendas com base no preço registrado em cada venda.
     """
-    session = db.session
-    # Calcula o valor total em vendas usando o preço na tabela Venda
-    total_vendas = session.query(
-        db.func.sum(VendaItem.quantidade * VendaItem.preco)
-    ).scalar() or 0.0
+    contadores = ler_contadores(db.session)
 
-    return ValorSchema(valor=total_vendas).dict(), 200
+    return ValorSchema(valor=contadores.get(VALOR_TOTAL_VENDAS, 0.0)).dict(), 200
 
 
 @app.get('/produtos/total', tags=[produto_tag], responses={"200": TotalSchema})
@@ -362,11 +726,9 @@ def get_total_produtos():
     """
     Retorna o total de produtos cadastrados.
     """
-    session = db.session
-    # Conta o total de produtos cadastrados
-    total_produtos = session.query(db.func.count(Produto.id)).scalar() or 0
+    contadores = ler_contadores(db.session)
 
-    return TotalSchema(total=total_produtos).dict(), 200
+    return TotalSchema(total=contadores.get(TOTAL_PRODUTOS, 0)).dict(), 200
 
 
 @app.get('/estoque/total', tags=[estoque_tag], responses={"200": TotalSchema})
@@ -374,22 +736,34 @@ def get_total_estoque():
     """
     Retorna o total geral de itens em estoque considerando as vendas.
     """
-    session = db.session
-    # Soma o total de itens no estoque
-    total_estoque = session.query(
-        db.func.sum(Estoque.quantidade)
-    ).scalar() or 0
-
-    # Soma o total de itens vendidos
-    total_vendido = session.query(
-        db.func.sum(VendaItem.quantidade)
-    ).scalar() or 0
+    contadores = ler_contadores(db.session)
 
-    # Calcula o estoque disponível
-    estoque_disponivel = total_estoque - total_vendido
+    # Estoque disponível = entradas - itens vendidos
+    estoque_disponivel = contadores.get(TOTAL_ENTRADAS_ESTOQUE, 0) - contadores.get(TOTAL_SAIDAS_ESTOQUE, 0)
 
     return TotalSchema(total=estoque_disponivel).dict(), 200   
 
+@app.get('/estoque/saldo', tags=[estoque_tag], responses={"200": EstoqueSaldoSchema, "404": ErrorSchema})
+def get_saldo_estoque_na_data(query: EstoqueSaldoQuerySchema):
+    """
+    Retorna o saldo em estoque de um produto ao fim de um dia.
+
+    O saldo parte do checkpoint diário mais próximo (gerado por
+    `flask gerar-checkpoints-saldo`) e soma apenas a movimentação posterior
+    a ele, sem percorrer todo o histórico do produto.
+    """
+    if query.produto_id not in carrega_produtos([query.produto_id]):
+        return {"message": f"Produto com ID {query.produto_id} não encontrado."}, 404
+
+    saldo, checkpoint = saldo_na_data(db.session, query.produto_id, query.data)
+
+    return EstoqueSaldoSchema(
+        produto_id=query.produto_id,
+        data=query.data,
+        saldo=saldo,
+        checkpoint=checkpoint
+    ).model_dump(mode="json"), 200  # datas em ISO 8601 (AAAA-MM-DD)
+
 if __name__ == "__main__":
     with app.app_context():
         init_db()
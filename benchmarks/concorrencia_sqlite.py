@@ -0,0 +1,127 @@
+"""Benchmark de leitura/escrita concorrente no SQLite, antes e depois dos PRAGMAs.
+
+Compara o engine sem configuração (journal padrão, rollback) com o engine
+configurado por config.aplicar_pragmas_sqlite (WAL, synchronous=NORMAL, ...),
+com leitores e escritores simultâneos sobre as tabelas da aplicação.
+
+Uso:
+    python -m benchmarks.concorrencia_sqlite --leitores 4 --escritores 2 --duracao 5
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import aplicar_pragmas_sqlite, pragmas_sqlite  # noqa: E402
+from database import db  # noqa: E402
+import models.contador  # noqa: E402,F401
+import models.estoque  # noqa: E402,F401
+import models.pagamento  # noqa: E402,F401
+import models.produto  # noqa: E402,F401
+import models.saldoProduto  # noqa: E402,F401
+import models.venda  # noqa: E402,F401
+import models.vendaItem  # noqa: E402,F401
+
+PRODUTOS = 200
+ENTRADAS = 20000
+
+
+def preparar_banco(caminho, pragmas):
+    engine = create_engine(f"sqlite:///{caminho}", connect_args={"timeout": 5})
+    if pragmas:
+        aplicar_pragmas_sqlite(engine, pragmas)
+    db.metadata.create_all(engine)
+
+    with engine.begin() as conexao:
+        conexao.execute(text("INSERT INTO produto (nome, descricao, preco) VALUES (:n, 'bench', 10)"),
+                        [{"n": f"Produto {i}"} for i in range(PRODUTOS)])
+        conexao.execute(text("INSERT INTO saldo_produto (produto_id, total_entradas, total_saidas) "
+                             "SELECT id, 0, 0 FROM produto"))
+        conexao.execute(text("INSERT INTO estoque (produto_id, quantidade, data_entrada, numero_nota_fiscal) "
+                             "VALUES (:p, 10, CURRENT_TIMESTAMP, 'NF')"),
+                        [{"p": random.randint(1, PRODUTOS)} for _ in range(ENTRADAS)])
+        conexao.execute(text("INSERT INTO venda (codigo, data) VALUES ('bench-0', CURRENT_TIMESTAMP)"))
+    return engine
+
+
+def leitor(engine, parar, resultado):
+    with engine.connect() as conexao:
+        while not parar.is_set():
+            produto_id = random.randint(1, PRODUTOS)
+            try:
+                conexao.execute(text("SELECT SUM(quantidade) FROM estoque WHERE produto_id = :p"),
+                                {"p": produto_id}).scalar()
+                conexao.execute(text("SELECT id, produto_id, quantidade FROM estoque "
+                                     "WHERE id > :a ORDER BY id LIMIT 100"),
+                                {"a": random.randint(0, ENTRADAS)}).all()
+                conexao.commit()
+                resultado["leituras"] += 1
+            except OperationalError:
+                conexao.rollback()
+                resultado["erros_leitura"] += 1
+
+
+def escritor(engine, parar, resultado):
+    with engine.connect() as conexao:
+        while not parar.is_set():
+            produto_id = random.randint(1, PRODUTOS)
+            try:
+                conexao.execute(text("INSERT INTO venda_item (venda_id, produto_id, quantidade, preco) "
+                                     "VALUES (1, :p, 1, 10)"), {"p": produto_id})
+                conexao.execute(text("UPDATE saldo_produto SET total_saidas = total_saidas + 1 "
+                                     "WHERE produto_id = :p"), {"p": produto_id})
+                conexao.commit()
+                resultado["escritas"] += 1
+            except OperationalError:
+                conexao.rollback()
+                resultado["erros_escrita"] += 1
+
+
+def executar(nome, pragmas, leitores, escritores, duracao):
+    with tempfile.TemporaryDirectory() as pasta:
+        engine = preparar_banco(os.path.join(pasta, "bench.db"), pragmas)
+        parar = threading.Event()
+        resultados = [dict(leituras=0, escritas=0, erros_leitura=0, erros_escrita=0)
+                      for _ in range(leitores + escritores)]
+        threads = [threading.Thread(target=leitor, args=(engine, parar, resultados[i]))
+                   for i in range(leitores)]
+        threads += [threading.Thread(target=escritor, args=(engine, parar, resultados[leitores + i]))
+                    for i in range(escritores)]
+
+        for thread in threads:
+            thread.start()
+        time.sleep(duracao)
+        parar.set()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    total = {chave: sum(r[chave] for r in resultados) for chave in resultados[0]}
+    print(f"{nome:<12} leituras/s: {total['leituras'] / duracao:>9.1f}   "
+          f"escritas/s: {total['escritas'] / duracao:>8.1f}   "
+          f"erros (leitura/escrita): {total['erros_leitura']}/{total['erros_escrita']}")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--leitores", type=int, default=4)
+    parser.add_argument("--escritores", type=int, default=2)
+    parser.add_argument("--duracao", type=float, default=5.0, help="Segundos por cenário.")
+    args = parser.parse_args()
+
+    print(f"{args.leitores} leitor(es), {args.escritores} escritor(es), {args.duracao}s por cenário")
+    executar("padrão", {}, args.leitores, args.escritores, args.duracao)
+    executar("configurado", pragmas_sqlite(), args.leitores, args.escritores, args.duracao)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Teste de estresse da reserva de estoque concorrente (VENDAS_VALIDAR_ESTOQUE=1).
+
+Vários clientes disputam o estoque limitado de poucos produtos até esgotá-lo.
+Ao final verifica que nenhum produto foi vendido além do estoque (saldo nunca
+negativo, inclusive recalculando a partir do histórico) e mede a vazão.
+Termina com código 1 se houver venda acima do estoque.
+
+Uso:
+    python -m benchmarks.estoque_concorrente --clientes 16 --estoque 300
+"""
+import argparse
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, RAIZ)
+
+PRODUTOS = 5
+
+
+def executar_modo(clientes, estoque):
+    from app import app
+    from database import db, init_db
+    from models.estoque import Estoque
+    from models.saldoProduto import SaldoProduto
+    from models.vendaItem import VendaItem
+    from services.saldo import recalcular_saldos
+
+    logging.disable(logging.CRITICAL)
+    with app.app_context():
+        init_db()
+    http = app.test_client()
+    produto_ids = []
+    for i in range(PRODUTOS):
+        produto_id = http.post("/produtos", json={"nome": f"Disputado {i}", "descricao": "estresse",
+                                                  "preco": 10.0}).get_json()["produto"]["id"]
+        http.post("/estoques", json={"produto_id": produto_id, "quantidade": estoque,
+                                     "data_entrada": "2025-01-01T00:00:00", "numero_nota_fiscal": "NF"})
+        produto_ids.append(produto_id)
+
+    esgotados = threading.Event()
+    contagens = [[0, 0, 0] for _ in range(clientes)]  # aceitas, recusadas por estoque, outros erros
+
+    def cliente(contagem, semente):
+        aleatorio = random.Random(semente)
+        cliente_http = app.test_client()
+        recusas_seguidas = 0
+        while not esgotados.is_set():
+            itens = [{"produto_id": produto_id, "quantidade": aleatorio.randint(1, 3), "preco": 10.0}
+                     for produto_id in aleatorio.sample(produto_ids, aleatorio.randint(1, 2))]
+            resposta = cliente_http.post("/vendas", json={"codigo": str(uuid.uuid4()), "itens": itens})
+            if resposta.status_code == 201:
+                contagem[0] += 1
+                recusas_seguidas = 0
+            elif "Estoque insuficiente" in resposta.get_json().get("message", ""):
+                contagem[1] += 1
+                recusas_seguidas += 1
+                if recusas_seguidas >= 50:
+                    esgotados.set()
+            else:
+                contagem[2] += 1
+
+    threads = [threading.Thread(target=cliente, args=(contagens[i], i)) for i in range(clientes)]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duracao = time.perf_counter() - inicio
+
+    with app.app_context():
+        session = db.session
+        vendidos = dict(session.query(VendaItem.produto_id, db.func.sum(VendaItem.quantidade))
+                        .group_by(VendaItem.produto_id).all())
+        entradas = dict(session.query(Estoque.produto_id, db.func.sum(Estoque.quantidade))
+                        .group_by(Estoque.produto_id).all())
+        saldos = dict(session.query(SaldoProduto.produto_id,
+                                    SaldoProduto.total_entradas - SaldoProduto.total_saidas).all())
+        divergencias = recalcular_saldos(session, corrigir=False)
+
+    excedidos = [produto_id for produto_id in produto_ids
+                 if (vendidos.get(produto_id) or 0) > entradas[produto_id] or saldos[produto_id] < 0]
+    aceitas, recusadas, erros = (sum(c[i] for c in contagens) for i in range(3))
+    print(f"{aceitas} vendas aceitas ({aceitas / duracao:.1f}/s), {recusadas} recusadas por estoque, "
+          f"{erros} erros; vendido {sum(vendidos.values())}/{sum(entradas.values())}; "
+          f"saldos finais {sorted(saldos.values())}; divergências {len(divergencias)}")
+
+    if excedidos or divergencias:
+        print(f"VENDA ACIMA DO ESTOQUE nos produtos {excedidos}")
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estresse da reserva de estoque concorrente.")
+    parser.add_argument("--clientes", type=int, default=16)
+    parser.add_argument("--estoque", type=int, default=300, help="Estoque inicial de cada produto.")
+    parser.add_argument("--interno", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.interno:
+        executar_modo(args.clientes, args.estoque)
+        return
+
+    print(f"{args.clientes} cliente(s) disputando {PRODUTOS} produto(s) com {args.estoque} unidade(s) cada")
+    falhou = False
+    for nome, grupo in (("individual", "0"), ("em grupo", "1")):
+        ambiente = dict(os.environ, VENDAS_VALIDAR_ESTOQUE="1", VENDAS_COMMIT_EM_GRUPO=grupo,
+                        DATABASE_URL=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+        saida = subprocess.run([sys.executable, "-W", "ignore", "-m", "benchmarks.estoque_concorrente", "--interno",
+                                "--clientes", str(args.clientes), "--estoque", str(args.estoque)],
+                               cwd=RAIZ, env=ambiente, capture_output=True, text=True)
+        print(f"{nome:<12} {saida.stdout.strip()}{saida.stderr.strip()[-500:]}")
+        falhou = falhou or saida.returncode != 0
+
+    sys.exit(1 if falhou else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Gerador reprodutível de dados sintéticos para benchmarks.
+
+Carrega em massa N produtos, M entradas de estoque e K vendas com itens e
+pagamentos no banco configurado em DATABASE_URL, e em seguida recalcula os
+saldos, contadores, rollups diários de vendas e checkpoints de saldo
+mantidos. A mesma semente gera sempre os mesmos dados.
+
+Uso:
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.gerador --produtos 1000 --estoques 50000 --vendas 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models.estoque import Estoque  # noqa: E402
+from models.pagamento import Pagamento  # noqa: E402
+from models.produto import Produto  # noqa: E402
+from models.venda import Venda  # noqa: E402
+from models.vendaItem import VendaItem  # noqa: E402
+from services.contadores import reconciliar_contadores  # noqa: E402
+from services.rollup import reconstruir_rollups  # noqa: E402
+from services.saldo import recalcular_saldos  # noqa: E402
+from services.saldo_historico import gerar_checkpoints  # noqa: E402
+
+DATA_BASE = datetime(2025, 1, 1)
+FORMAS_PAGAMENTO = ("pix", "credito", "debito", "dinheiro")
+CORES = ("azul", "preta", "branca", "rosa", "verde", "vermelha", "cinza")
+TIPOS = ("Camiseta", "Calça", "Bermuda", "Vestido", "Jaqueta", "Saia", "Blusa")
+TAMANHOS = ("PP", "P", "M", "G", "GG")
+
+
+def gerar_dados(session, produtos=1000, estoques=20000, vendas=10000, itens_por_venda=3,
+                semente=42, tamanho_lote=5000):
+    """Insere os dados sintéticos e retorna a contagem do que foi gerado.
+
+    Os códigos das vendas dependem apenas da semente: para gerar dados de
+    novo no mesmo banco, use outra semente.
+    """
+    aleatorio = random.Random(semente)
+    prefixo = f"bench-{semente}"
+    if session.query(Venda.id).filter(Venda.codigo.like(f"{prefixo}-%")).first():
+        raise ValueError(f"O banco já contém vendas geradas com a semente {semente}.")
+
+    linhas = []
+    for i in range(produtos):
+        tipo, cor, tamanho = aleatorio.choice(TIPOS), aleatorio.choice(CORES), aleatorio.choice(TAMANHOS)
+        linhas.append({
+            "nome": f"{tipo} {cor} {tamanho} #{i}",
+            "descricao": f"{tipo.lower()} básica {cor} tamanho {tamanho}",
+            "preco": round(aleatorio.uniform(19.9, 299.9), 2),
+        })
+    _inserir(session, Produto, linhas, tamanho_lote)
+    produto_ids = [produto_id for (produto_id,) in session.query(Produto.id).order_by(Produto.id)]
+
+    _inserir(session, Estoque, ({
+        "produto_id": aleatorio.choice(produto_ids),
+        "quantidade": aleatorio.randint(1, 50),
+        "data_entrada": DATA_BASE + timedelta(minutes=aleatorio.randint(0, 365 * 24 * 60)),
+        "numero_nota_fiscal": str(aleatorio.randint(100000, 999999)),
+    } for _ in range(estoques)), tamanho_lote)
+
+    _inserir(session, Venda, ({
+        "codigo": f"{prefixo}-{i}",
+        "data": DATA_BASE + timedelta(minutes=aleatorio.randint(0, 365 * 24 * 60)),
+    } for i in range(vendas)), tamanho_lote)
+    venda_ids = session.query(Venda.codigo, Venda.id).filter(Venda.codigo.like(f"{prefixo}-%")).all()
+
+    itens, pagamentos = [], []
+    for codigo, venda_id in venda_ids:
+        total = 0.0
+        for _ in range(aleatorio.randint(1, itens_por_venda)):
+            quantidade, preco = aleatorio.randint(1, 3), round(aleatorio.uniform(19.9, 299.9), 2)
+            itens.append({"venda_id": venda_id, "produto_id": aleatorio.choice(produto_ids),
+                          "quantidade": quantidade, "preco": preco})
+            total += quantidade * preco
+        pagamentos.append({"codigo_venda": codigo, "forma": aleatorio.choice(FORMAS_PAGAMENTO),
+                           "valor": round(total, 2)})
+    _inserir(session, VendaItem, itens, tamanho_lote)
+    _inserir(session, Pagamento, pagamentos, tamanho_lote)
+
+    # Saldos, contadores, rollups e checkpoints mantidos passam a refletir os dados gerados
+    recalcular_saldos(session)
+    reconciliar_contadores(session)
+    reconstruir_rollups(session)
+    gerar_checkpoints(session, reconstruir=True)
+
+    return {"produtos": produtos, "estoques": estoques, "vendas": vendas, "itens": len(itens)}
+
+
+def _inserir(session, modelo, linhas, tamanho_lote):
+    lote = []
+    for linha in linhas:
+        lote.append(linha)
+        if len(lote) >= tamanho_lote:
+            session.execute(insert(modelo), lote)
+            lote = []
+    if lote:
+        session.execute(insert(modelo), lote)
+    session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos no banco de DATABASE_URL.")
+    parser.add_argument("--produtos", type=int, default=1000)
+    parser.add_argument("--estoques", type=int, default=20000)
+    parser.add_argument("--vendas", type=int, default=10000)
+    parser.add_argument("--itens-por-venda", type=int, default=3)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    from app import app
+    from database import db, init_db
+
+    with app.app_context():
+        init_db()
+        inicio = time.perf_counter()
+        try:
+            gerados = gerar_dados(db.session, args.produtos, args.estoques, args.vendas,
+                                  args.itens_por_venda, args.semente)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"Gerados {gerados} em {time.perf_counter() - inicio:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""Harness de carga dos endpoints da API.
+
+Cria um banco SQLite temporário, popula-o com benchmarks.gerador e executa
+cada endpoint da aplicação pelo cliente de testes do Flask, medindo latência
+(p50/p95/p99), vazão e quantidade de comandos SQL por requisição. O resultado
+é gravado em JSON para comparação entre commits.
+
+Uso:
+    python -m benchmarks.harness --produtos 1000 --estoques 20000 --vendas 10000 --saida resultado.json
+    python -m benchmarks.harness --saida novo.json --comparar resultado.json
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, RAIZ)
+
+
+def percentil(valores, p):
+    """Percentil pelo método do posto mais próximo (valores já ordenados)."""
+    if not valores:
+        return 0.0
+    indice = max(0, min(len(valores) - 1, int(round(p / 100 * len(valores) + 0.5)) - 1))
+    return valores[indice]
+
+
+# Termos de GET /produtos/busca: tipo, cor e combinações com prefixo (nomes de benchmarks.gerador)
+TERMOS_BUSCA = ("camiseta", "azul", "calca preta", "vest", "jaqueta verde G")
+
+
+def cenarios(contexto):
+    """Requisições de cada endpoint; cada uma recebe o cliente e o número da repetição."""
+    produto_ids = contexto["produto_ids"]
+
+    def produto(i):
+        return produto_ids[i % len(produto_ids)]
+
+    def estoque_json(i):
+        return {"produto_id": produto(i), "quantidade": 5, "data_entrada": "2025-06-01T10:00:00",
+                "numero_nota_fiscal": f"NF{i}"}
+
+    def venda_json(i):
+        return {"codigo": f"harness-{uuid.uuid4()}",
+                "itens": [{"produto_id": produto(i), "quantidade": 1, "preco": 49.9},
+                          {"produto_id": produto(i + 7), "quantidade": 2, "preco": 19.9}],
+                "pagamentos": [{"forma": "pix", "valor": 89.7}]}
+
+    def novo_produto(cliente):
+        resposta = cliente.post("/produtos", json={"nome": "Harness", "descricao": "temporário", "preco": 1})
+        return resposta.get_json()["produto"]["id"] if resposta.status_code == 201 else 0
+
+    def novo_estoque(cliente, i):
+        resposta = cliente.post("/estoques", json=estoque_json(i))
+        return resposta.get_json()["id"] if resposta.status_code == 201 else 0
+
+    csv = "produto_id,quantidade,data_entrada,numero_nota_fiscal\n" + "".join(
+        f"{produto(i)},3,2025-06-01T10:00:00,NF-CSV\n" for i in range(200))
+
+    return [
+        ("POST /produtos", lambda c, i: c.post("/produtos", json={
+            "nome": f"Produto harness {i}", "descricao": "harness", "preco": 10.0})),
+        ("GET /produto", lambda c, i: c.get(f"/produto?id={produto(i)}")),
+        ("GET /produtos", lambda c, i: c.get("/produtos")),
+        ("GET /produtos?limit=20", lambda c, i: c.get("/produtos?limit=20")),
+        ("GET /produtos/busca", lambda c, i: c.get(f"/produtos/busca?q={TERMOS_BUSCA[i % len(TERMOS_BUSCA)]}")),
+        ("PUT /produto", lambda c, i: c.put("/produto", json={
+            "id": produto(i), "nome": f"Produto {i}", "descricao": "alterado", "preco": 11.0})),
+        ("DELETE /produto", lambda c, i: c.delete(f"/produto?id={novo_produto(c)}")),
+        ("GET /produtos/total", lambda c, i: c.get("/produtos/total")),
+        ("GET /produtos/cache", lambda c, i: c.get("/produtos/cache")),
+        ("POST /estoques", lambda c, i: c.post("/estoques", json=estoque_json(i))),
+        ("GET /estoques?produto_id", lambda c, i: c.get(f"/estoques?produto_id={produto(i)}")),
+        ("GET /estoques?stream=1", lambda c, i: c.get(f"/estoques?stream=1&produto_id={produto(i)}")),
+        ("PUT /estoque", lambda c, i: c.put("/estoque", json=dict(estoque_json(i), id=contexto["estoque_id"]))),
+        ("DELETE /estoque", lambda c, i: c.delete(f"/estoque?id={novo_estoque(c, i)}")),
+        ("POST /estoques/importar", lambda c, i: c.post("/estoques/importar", data={
+            "arquivo": (io.BytesIO(csv.encode()), "nota.csv")}, content_type="multipart/form-data")),
+        ("GET /estoque/total", lambda c, i: c.get("/estoque/total")),
+        ("GET /estoque/saldo", lambda c, i: c.get(f"/estoque/saldo?produto_id={produto(i)}&data=2025-09-30")),
+        ("POST /vendas", lambda c, i: c.post("/vendas", json=venda_json(i))),
+        ("POST /vendas/lote", lambda c, i: c.post("/vendas/lote", json={
+            "vendas": [venda_json(i + j) for j in range(50)]})),
+        ("GET /vendas", lambda c, i: c.get("/vendas?limit=50")),
+        ("GET /vendas?codigo", lambda c, i: c.get(f"/vendas?codigo={contexto['codigo_venda']}")),
+        ("GET /venda", lambda c, i: c.get(f"/venda?id={contexto['venda_id']}")),
+        ("GET /vendas/relatorio", lambda c, i: c.get("/vendas/relatorio?de=2025-01-01&ate=2025-12-31&granularidade=mes")),
+        ("GET /vendas/relatorio?produto_id", lambda c, i: c.get(
+            f"/vendas/relatorio?de=2025-01-01&ate=2025-12-31&produto_id={produto(i)}")),
+        ("GET /vendas/total", lambda c, i: c.get("/vendas/total")),
+        ("GET /dashboard", lambda c, i: c.get("/dashboard")),
+    ]
+
+
+def executar(args):
+    caminho_banco = os.path.join(tempfile.mkdtemp(prefix="vestsoft-bench-"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{caminho_banco}"
+
+    from sqlalchemy import event
+    from app import app
+    from benchmarks.gerador import gerar_dados
+    from database import db, init_db
+    from models.estoque import Estoque
+    from models.produto import Produto
+    from models.venda import Venda
+
+    logging.disable(logging.CRITICAL)
+    cliente = app.test_client()
+
+    with app.app_context():
+        init_db()
+        inicio = time.perf_counter()
+        gerados = gerar_dados(db.session, args.produtos, args.estoques, args.vendas, semente=args.semente)
+        print(f"Dados gerados em {time.perf_counter() - inicio:.1f}s: {gerados}")
+
+        contexto = {
+            "produto_ids": [produto_id for (produto_id,) in db.session.query(Produto.id).limit(500)],
+            "estoque_id": db.session.query(Estoque.id).first()[0],
+        }
+        contexto["venda_id"], contexto["codigo_venda"] = db.session.query(Venda.id, Venda.codigo).first()
+
+        comandos = {"total": 0}
+
+        def _contar(*_):
+            comandos["total"] += 1
+
+        # Com DB_ROTEAR_LEITURAS=1 os GETs usam o engine de leitura (BIND_LEITURA)
+        for engine in set(db.engines.values()):
+            event.listen(engine, "before_cursor_execute", _contar)
+
+    resultados = {}
+    for nome, requisicao in cenarios(contexto):
+        if args.filtro and args.filtro not in nome:
+            continue
+        latencias, consultas, erros = [], [], 0
+        inicio_cenario = time.perf_counter()
+        for i in range(args.repeticoes):
+            comandos["total"] = 0
+            inicio = time.perf_counter()
+            resposta = requisicao(cliente, i)
+            resposta.get_data()  # consome respostas em streaming
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            consultas.append(comandos["total"])
+            if resposta.status_code >= 400:
+                erros += 1
+        duracao = time.perf_counter() - inicio_cenario
+
+        latencias.sort()
+        resultados[nome] = {
+            "p50_ms": round(percentil(latencias, 50), 3),
+            "p95_ms": round(percentil(latencias, 95), 3),
+            "p99_ms": round(percentil(latencias, 99), 3),
+            "media_ms": round(sum(latencias) / len(latencias), 3),
+            "req_por_s": round(args.repeticoes / duracao, 1),
+            "consultas_sql": round(sum(consultas) / len(consultas), 2),
+            "erros": erros,
+        }
+        r = resultados[nome]
+        print(f"{nome:<28} p50 {r['p50_ms']:>8.2f}ms  p95 {r['p95_ms']:>8.2f}ms  p99 {r['p99_ms']:>8.2f}ms  "
+              f"{r['req_por_s']:>8.1f} req/s  {r['consultas_sql']:>6.1f} SQL/req  erros {erros}")
+
+    # Problemas apontados pelo detector de desempenho (DETECTOR_DESEMPENHO=log|erro)
+    detector = app.extensions.get("detector_desempenho")
+    problemas = detector.problemas if detector else []
+    if problemas:
+        print(f"\nDetector de desempenho: {len(problemas)} problema(s)")
+        for descricao in sorted({problema["descricao"] for problema in problemas}):
+            print(f"  {descricao}")
+
+    return {
+        "commit": _commit_atual(),
+        "data": datetime.utcnow().isoformat(),
+        "parametros": vars(args) | {"dados": gerados},
+        "endpoints": resultados,
+        "problemas_desempenho": len(problemas),
+    }
+
+
+def comparar(atual, anterior):
+    """Imprime a variação de p95 e de comandos SQL em relação a um resultado anterior."""
+    print(f"\nComparação com {anterior.get('commit')} ({anterior.get('data')}):")
+    for nome, r in atual["endpoints"].items():
+        base = anterior.get("endpoints", {}).get(nome)
+        if not base:
+            print(f"{nome:<28} (novo)")
+            continue
+        variacao = (r["p95_ms"] - base["p95_ms"]) / base["p95_ms"] * 100 if base["p95_ms"] else 0.0
+        print(f"{nome:<28} p95 {base['p95_ms']:>8.2f} -> {r['p95_ms']:>8.2f}ms ({variacao:+6.1f}%)  "
+              f"SQL/req {base['consultas_sql']:>6.1f} -> {r['consultas_sql']:>6.1f}")
+
+
+def _commit_atual():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede a latência e a vazão de cada endpoint da API.")
+    parser.add_argument("--produtos", type=int, default=1000)
+    parser.add_argument("--estoques", type=int, default=20000)
+    parser.add_argument("--vendas", type=int, default=10000)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--repeticoes", type=int, default=200, help="Requisições por endpoint.")
+    parser.add_argument("--filtro", help="Executa apenas os endpoints cujo nome contém este texto.")
+    parser.add_argument("--saida", help="Arquivo JSON onde gravar o resultado.")
+    parser.add_argument("--comparar", help="Resultado JSON anterior para comparação.")
+    args = parser.parse_args()
+
+    resultado = executar(args)
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+        print(f"\nResultado gravado em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            comparar(resultado, json.load(arquivo))
+
+    # Com o detector no modo "erro", qualquer problema reprova a execução (CI)
+    if resultado["problemas_desempenho"] and os.getenv("DETECTOR_DESEMPENHO", "").lower() == "erro":
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Tempo de inicialização: importação da aplicação e primeiras requisições.
+
+Cada medição roda em um processo novo (partida a frio), nas configurações de
+documentação: especificação gerada das rotas (padrão), especificação
+pré-gerada em arquivo (OPENAPI_ARQUIVO) e documentação desabilitada
+(OPENAPI_DOCS=0). Mostra a mediana das execuções.
+
+Uso:
+    python -m benchmarks.inicializacao --execucoes 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+MEDICAO = """
+import json, time
+inicio, inicio_cpu = time.perf_counter(), time.process_time()
+from app import app
+importacao, importacao_cpu = time.perf_counter(), time.process_time()
+http = app.test_client()
+http.get("/produtos/total")
+primeira = time.perf_counter()
+resposta = http.get("/openapi/openapi.json")
+especificacao = time.perf_counter()
+print(json.dumps({
+    "importacao_ms": (importacao - inicio) * 1000,
+    "importacao_cpu_ms": (importacao_cpu - inicio_cpu) * 1000,
+    "primeira_requisicao_ms": (primeira - importacao) * 1000,
+    "especificacao_ms": (especificacao - primeira) * 1000 if resposta.status_code == 200 else None,
+}))
+"""
+
+
+def medir(ambiente, execucoes):
+    resultados = []
+    for _ in range(execucoes):
+        saida = subprocess.run([sys.executable, "-W", "ignore", "-c", MEDICAO], cwd=RAIZ, env=ambiente,
+                               capture_output=True, text=True, check=True)
+        resultados.append(json.loads(saida.stdout.strip().splitlines()[-1]))
+    return {chave: (statistics.median(r[chave] for r in resultados) if resultados[0][chave] is not None else None)
+            for chave in resultados[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede a importação da aplicação e as primeiras requisições.")
+    parser.add_argument("--execucoes", type=int, default=5)
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp(prefix="vestsoft-bench-")
+    base = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(pasta, 'bench.db')}", LOG_LEVEL="WARNING")
+    base.pop("OPENAPI_ARQUIVO", None)
+    base.pop("OPENAPI_DOCS", None)
+
+    # Mesmo passo do build da imagem: gera a especificação uma vez
+    arquivo_spec = os.path.join(pasta, "openapi.json")
+    subprocess.run([sys.executable, "-W", "ignore", "-m", "flask", "--app", "app", "openapi", "-o", arquivo_spec],
+                   cwd=RAIZ, env=base, capture_output=True, check=True)
+
+    modos = (
+        ("especificação gerada", base),
+        ("especificação pré-gerada", dict(base, OPENAPI_ARQUIVO=arquivo_spec)),
+        ("sem documentação", dict(base, OPENAPI_DOCS="0")),
+    )
+    print(f"Mediana de {args.execucoes} partida(s) a frio, em ms:")
+    print(f"  {'modo':<26} {'importação':>10} {'(CPU)':>8} {'1ª requisição':>14} {'openapi.json':>13}")
+    for nome, ambiente in modos:
+        r = medir(ambiente, args.execucoes)
+        especificacao = f"{r['especificacao_ms']:13.1f}" if r["especificacao_ms"] is not None else f"{'-':>13}"
+        print(f"  {nome:<26} {r['importacao_ms']:10.1f} {r['importacao_cpu_ms']:8.1f} "
+              f"{r['primeira_requisicao_ms']:14.1f} {especificacao}")
+
+
+if __name__ == "__main__":
+    main()
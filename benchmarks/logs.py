@@ -0,0 +1,101 @@
+"""Latência das requisições com log síncrono x log em fila.
+
+Simula um destino de log lento (ex.: pipe do coletor de logs cheio, disco
+ocupado) com uma espera fixa por escrita e compara a latência de POST /vendas
+e GET /produtos quando o registro é escrito na própria thread da requisição
+(StreamHandler) e quando é enfileirado para a thread do QueueListener.
+
+Uso:
+    python -m benchmarks.logs --requisicoes 300 --escrita-ms 2
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, RAIZ)
+
+
+class DestinoLento:
+    """Stream que demora escrita_ms a cada escrita."""
+
+    def __init__(self, escrita_ms):
+        self.espera = escrita_ms / 1000
+        self.linhas = 0
+
+    def write(self, texto):
+        time.sleep(self.espera)
+        self.linhas += texto.count("\n")
+
+    def flush(self):
+        pass
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+def medir(http, requisicoes, produto_id, prefixo):
+    latencias = {"POST /vendas": [], "GET /produtos": []}
+    for i in range(requisicoes):
+        inicio = time.perf_counter()
+        http.post("/vendas", json={"codigo": f"{prefixo}-{i}",
+                                   "itens": [{"produto_id": produto_id, "quantidade": 1, "preco": 10.0}]})
+        latencias["POST /vendas"].append(time.perf_counter() - inicio)
+        inicio = time.perf_counter()
+        http.get("/produtos")
+        latencias["GET /produtos"].append(time.perf_counter() - inicio)
+    return latencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara a latência com log síncrono e com log em fila.")
+    parser.add_argument("--requisicoes", type=int, default=300)
+    parser.add_argument("--escrita-ms", type=float, default=2.0, help="Espera simulada por escrita de log.")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='vestsoft-bench-'), 'bench.db')}"
+    os.environ.setdefault("LOG_LEVEL", "INFO")
+    from app import app
+    from database import init_db
+    from services.logs import FiltroRequisicao, FormatadorJSON
+
+    with app.app_context():
+        init_db()
+    http = app.test_client()
+    produto_id = http.post("/produtos", json={"nome": "Bench", "descricao": "logs",
+                                              "preco": 10.0}).get_json()["produto"]["id"]
+
+    logs = app.extensions["logs"]
+    raiz = logging.getLogger()
+
+    # Log síncrono: mesmo formato JSON, escrito pela thread da requisição
+    sincrono = logging.StreamHandler(DestinoLento(args.escrita_ms))
+    sincrono.setFormatter(FormatadorJSON())
+    sincrono.addFilter(FiltroRequisicao())
+    raiz.removeHandler(logs.handler)
+    raiz.addHandler(sincrono)
+    resultados = {"síncrono": medir(http, args.requisicoes, produto_id, "sincrono")}
+    raiz.removeHandler(sincrono)
+
+    # Log em fila: a escrita lenta fica com a thread do listener
+    raiz.addHandler(logs.handler)
+    logs.destino.setStream(DestinoLento(args.escrita_ms))
+    resultados["em fila"] = medir(http, args.requisicoes, produto_id, "fila")
+    logs.parar()
+
+    print(f"{args.requisicoes} requisição(ões) por rota, escrita de log de {args.escrita_ms} ms; latência em ms:")
+    for modo, latencias in resultados.items():
+        for rota, valores in latencias.items():
+            print(f"  {modo:<9} {rota:<14} p50 {statistics.median(valores) * 1000:6.2f}   "
+                  f"p99 {percentil(valores, 0.99) * 1000:6.2f}")
+    print(f"  registros descartados com a fila cheia: {logs.handler.descartados}")
+
+
+if __name__ == "__main__":
+    main()
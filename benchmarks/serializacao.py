@@ -0,0 +1,86 @@
+"""Custo por linha da serialização das listagens.
+
+Compara, sobre as mesmas entradas de estoque, o caminho anterior (objetos ORM
+-> EstoqueSchema.from_orm().dict() -> JSON do Flask) com o caminho rápido
+(tuplas com as colunas -> dicionários -> orjson/json), separando o tempo de
+serialização do tempo total com a consulta. Ao final mede GET /estoques
+completo.
+
+Uso:
+    python -m benchmarks.serializacao --estoques 20000 --repeticoes 5
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, RAIZ)
+
+
+def melhor_tempo(funcao, repeticoes):
+    """Menor tempo entre as repetições (menos sujeito a ruído)."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede o custo por linha da serialização das listagens.")
+    parser.add_argument("--estoques", type=int, default=20000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='vestsoft-bench-'), 'bench.db')}"
+    from app import app
+    from benchmarks.gerador import gerar_dados
+    from database import db, init_db
+    from models.estoque import Estoque
+    from schemas.estoque import EstoqueSchema
+    from services.serializacao import codificar_json, estoque_como_dict, orjson
+
+    logging.disable(logging.CRITICAL)
+    with app.app_context():
+        init_db()
+        gerar_dados(db.session, produtos=100, estoques=args.estoques, vendas=0)
+        colunas = (Estoque.id, Estoque.produto_id, Estoque.quantidade,
+                   Estoque.data_entrada, Estoque.numero_nota_fiscal)
+
+        objetos = db.session.query(Estoque).all()
+        tuplas = db.session.query(*colunas).all()
+        linhas = len(tuplas)
+
+        def pydantic_serializacao():
+            app.json.dumps({"estoques": [EstoqueSchema.from_orm(estoque).dict() for estoque in objetos]})
+
+        def rapido_serializacao():
+            codificar_json({"estoques": [estoque_como_dict(*linha) for linha in tuplas]})
+
+        def pydantic_total():
+            db.session.expunge_all()
+            app.json.dumps({"estoques": [EstoqueSchema.from_orm(estoque).dict()
+                                         for estoque in db.session.query(Estoque).all()]})
+
+        def rapido_total():
+            codificar_json({"estoques": [estoque_como_dict(*linha) for linha in db.session.query(*colunas)]})
+
+        print(f"{linhas} linha(s), encoder {'orjson' if orjson else 'json'}; microssegundos por linha:")
+        for nome, antes, depois in (("serialização", pydantic_serializacao, rapido_serializacao),
+                                    ("consulta + serialização", pydantic_total, rapido_total)):
+            tempo_antes = melhor_tempo(antes, args.repeticoes) / linhas * 1e6
+            tempo_depois = melhor_tempo(depois, args.repeticoes) / linhas * 1e6
+            print(f"  {nome:<24} pydantic {tempo_antes:7.2f}   rápido {tempo_depois:7.2f}   "
+                  f"({tempo_antes / tempo_depois:.1f}x)")
+
+    http = app.test_client()
+    tempo = melhor_tempo(lambda: http.get("/estoques"), args.repeticoes)
+    print(f"  GET /estoques completo: {tempo * 1000:.1f} ms ({tempo / linhas * 1e6:.2f} us por linha)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Compara a vazão do servidor de desenvolvimento com o gunicorn de produção.
+
+Sobe cada servidor sobre um banco SQLite temporário populado pelo gerador e
+dispara requisições concorrentes (com keep-alive) por alguns segundos.
+
+Uso:
+    python -m benchmarks.servidor --clientes 16 --duracao 10
+"""
+import argparse
+import http.client
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+SERVIDORES = {
+    "flask run": ["flask", "--app", "app", "run", "--port", "{porta}"],
+    "gunicorn": ["gunicorn", "-c", "gunicorn.conf.py", "--bind", "127.0.0.1:{porta}",
+                 "--access-logfile", "/dev/null", "wsgi:application"],
+}
+ROTAS = ("/produtos?limit=20", "/produto?id=1", "/dashboard", "/estoques?produto_id=1")
+
+
+def aguardar(porta, limite=30):
+    fim = time.time() + limite
+    while time.time() < fim:
+        try:
+            conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=1)
+            conexao.request("GET", "/dashboard")
+            conexao.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Servidor não respondeu na porta {porta}.")
+
+
+def cliente(porta, parar, contagem):
+    conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=10)
+    i = 0
+    while not parar.is_set():
+        try:
+            conexao.request("GET", ROTAS[i % len(ROTAS)])
+            conexao.getresponse().read()
+            contagem[0] += 1
+        except (OSError, http.client.HTTPException):
+            contagem[1] += 1
+            conexao.close()
+            conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=10)
+        i += 1
+
+
+def medir(nome, comando, porta, ambiente, clientes, duracao):
+    processo = subprocess.Popen([parte.format(porta=porta) for parte in comando], cwd=RAIZ, env=ambiente,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        aguardar(porta)
+        parar = threading.Event()
+        contagens = [[0, 0] for _ in range(clientes)]
+        threads = [threading.Thread(target=cliente, args=(porta, parar, contagens[i])) for i in range(clientes)]
+        for thread in threads:
+            thread.start()
+        time.sleep(duracao)
+        parar.set()
+        for thread in threads:
+            thread.join()
+    finally:
+        processo.terminate()
+        processo.wait()
+
+    respostas = sum(c[0] for c in contagens)
+    erros = sum(c[1] for c in contagens)
+    print(f"{nome:<10} {respostas / duracao:>8.1f} req/s   erros: {erros}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara a vazão de flask run e gunicorn.")
+    parser.add_argument("--clientes", type=int, default=16)
+    parser.add_argument("--duracao", type=float, default=10.0)
+    parser.add_argument("--porta", type=int, default=5055)
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp(prefix="vestsoft-servidor-")
+    ambiente = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(pasta, 'bench.db')}")
+    subprocess.run([sys.executable, "-m", "benchmarks.gerador", "--produtos", "1000",
+                    "--estoques", "20000", "--vendas", "5000"], cwd=RAIZ, env=ambiente, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    print(f"{os.cpu_count()} núcleo(s), {args.clientes} cliente(s) concorrente(s), {args.duracao}s")
+    for nome, comando in SERVIDORES.items():
+        medir(nome, comando, args.porta, ambiente, args.clientes, args.duracao)
+
+
+if __name__ == "__main__":
+    main()
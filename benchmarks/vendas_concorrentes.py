@@ -0,0 +1,81 @@
+"""Vazão sustentada de POST /vendas concorrente, com e sem commit em grupo.
+
+Cada modo roda em um subprocesso com um banco SQLite temporário próprio,
+com várias threads enviando vendas pelo cliente de testes do Flask.
+
+Uso:
+    python -m benchmarks.vendas_concorrentes --clientes 16 --duracao 5
+"""
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, RAIZ)
+
+
+def executar_modo(clientes, duracao):
+    from app import app
+    from benchmarks.gerador import gerar_dados
+    from database import db, init_db
+
+    logging.disable(logging.CRITICAL)
+    with app.app_context():
+        init_db()
+        gerar_dados(db.session, produtos=200, estoques=2000, vendas=0)
+
+    parar = threading.Event()
+    contagens = [[0, 0] for _ in range(clientes)]
+
+    def cliente(contagem):
+        http = app.test_client()
+        while not parar.is_set():
+            resposta = http.post("/vendas", json={
+                "codigo": str(uuid.uuid4()),
+                "itens": [{"produto_id": 1 + contagem[0] % 200, "quantidade": 1, "preco": 10.0}],
+                "pagamentos": [{"forma": "pix", "valor": 10.0}],
+            })
+            contagem[0 if resposta.status_code == 201 else 1] += 1
+
+    threads = [threading.Thread(target=cliente, args=(contagens[i],)) for i in range(clientes)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duracao)
+    parar.set()
+    for thread in threads:
+        thread.join()
+
+    vendas = sum(c[0] for c in contagens)
+    erros = sum(c[1] for c in contagens)
+    print(f"{vendas / duracao:.1f} vendas/s, erros: {erros}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara POST /vendas com e sem commit em grupo.")
+    parser.add_argument("--clientes", type=int, default=16)
+    parser.add_argument("--duracao", type=float, default=5.0)
+    parser.add_argument("--interno", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.interno:
+        executar_modo(args.clientes, args.duracao)
+        return
+
+    print(f"{args.clientes} cliente(s) concorrente(s), {args.duracao}s por modo")
+    for nome, grupo in (("individual", "0"), ("em grupo", "1")):
+        ambiente = dict(os.environ, VENDAS_COMMIT_EM_GRUPO=grupo,
+                        DATABASE_URL=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+        saida = subprocess.run([sys.executable, "-W", "ignore", "-m", "benchmarks.vendas_concorrentes", "--interno",
+                                "--clientes", str(args.clientes), "--duracao", str(args.duracao)],
+                               cwd=RAIZ, env=ambiente, capture_output=True, text=True, check=True)
+        print(f"{nome:<12} {saida.stdout.strip()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import os
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from database import db
+from services.arquivo import arquivar_vendas
+from services.contadores import reconciliar_contadores
+from services.planos import amostra_do_banco, planos_dos_endpoints, requisicoes_monitoradas, varredura_completa
+from services.importacao import importar_estoques_csv
+from services.rollup import reconstruir_rollups
+from services.saldo import recalcular_saldos
+from services.saldo_historico import gerar_checkpoints
+
+
+@click.command("recalcular-saldos")
+@click.option("--verificar", is_flag=True, help="Apenas verifica as divergências, sem corrigir.")
+@with_appcontext
+def recalcular_saldos_command(verificar):
+    """Recalcula o saldo materializado de cada produto a partir do histórico."""
+    divergencias = recalcular_saldos(db.session, corrigir=not verificar)
+
+    for produto_id, materializado, calculado in divergencias:
+        click.echo(f"Produto {produto_id}: saldo materializado {materializado}, calculado {calculado}")
+
+    if verificar and divergencias:
+        raise click.ClickException(f"{len(divergencias)} saldo(s) divergente(s).")
+
+    if verificar:
+        click.echo("Verificação concluída: nenhum saldo divergente.")
+    else:
+        click.echo(f"Recálculo concluído: {len(divergencias)} saldo(s) corrigido(s).")
+
+
+@click.command("reconciliar-contadores")
+@click.option("--verificar", is_flag=True, help="Apenas verifica as divergências, sem corrigir.")
+@with_appcontext
+def reconciliar_contadores_command(verificar):
+    """Reconcilia os totalizadores da tela de início com as tabelas de origem."""
+    divergencias = reconciliar_contadores(db.session, corrigir=not verificar)
+
+    for nome, mantido, calculado in divergencias:
+        click.echo(f"Contador {nome}: valor mantido {mantido}, calculado {calculado}")
+
+    if verificar and divergencias:
+        raise click.ClickException(f"{len(divergencias)} contador(es) divergente(s).")
+
+    if verificar:
+        click.echo("Verificação concluída: nenhum contador divergente.")
+    else:
+        click.echo(f"Reconciliação concluída: {len(divergencias)} contador(es) corrigido(s).")
+
+
+@click.command("importar-estoques")
+@click.argument("arquivo", type=click.File("r", encoding="utf-8-sig"))
+@click.option("--tamanho-lote", default=500, show_default=True, help="Linhas gravadas por transação.")
+@with_appcontext
+def importar_estoques_command(arquivo, tamanho_lote):
+    """Importa entradas de estoque de um CSV (produto_id, quantidade, data_entrada, numero_nota_fiscal)."""
+    try:
+        relatorio = importar_estoques_csv(db.session, arquivo, tamanho_lote)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    for rejeicao in relatorio["rejeicoes"]:
+        click.echo(f"Linha {rejeicao['linha']} rejeitada: {rejeicao['motivo']}", err=True)
+
+    click.echo(f"{relatorio['importadas']} linha(s) importada(s), {relatorio['rejeitadas']} rejeitada(s) "
+               f"em {relatorio['duracao_segundos']}s ({relatorio['linhas_por_segundo']} linhas/s).")
+
+
+@click.command("verificar-planos")
+@click.option("--detalhar", is_flag=True, help="Exibe o plano de todos os comandos executados.")
+@with_appcontext
+def verificar_planos_command(detalhar):
+    """Falha se algum comando SQL dos endpoints de leitura fizer varredura completa de tabela.
+
+    Os endpoints são chamados pelo cliente de testes com ids existentes no
+    banco; apenas requisições GET são feitas, sem alterar os dados.
+    """
+    try:
+        requisicoes = requisicoes_monitoradas(amostra_do_banco(db.session))
+        planos = planos_dos_endpoints(current_app, db.engines.values(), requisicoes)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+
+    problemas = 0
+    for nome, statement, plano in planos:
+        if varredura_completa(plano):
+            problemas += 1
+            click.echo(f"Varredura completa em '{nome}': {' | '.join(plano)}\n    {statement}", err=True)
+        elif detalhar:
+            click.echo(f"{nome}: {statement}")
+            for detalhe in plano:
+                click.echo(f"    {detalhe}")
+
+    if problemas:
+        raise click.ClickException(f"{problemas} consulta(s) sem índice adequado.")
+
+    click.echo("Nenhuma consulta monitorada faz varredura completa de tabela.")
+
+
+@click.command("recalcular-rollups")
+@click.option("--de", type=click.DateTime(formats=["%Y-%m-%d"]), help="Primeiro dia a reconstruir (AAAA-MM-DD).")
+@click.option("--ate", type=click.DateTime(formats=["%Y-%m-%d"]), help="Último dia a reconstruir (AAAA-MM-DD).")
+@with_appcontext
+def recalcular_rollups_command(de, ate):
+    """Reconstrói os totais diários de vendas a partir do histórico (backfill)."""
+    dias = reconstruir_rollups(db.session, de.date() if de else None, ate.date() if ate else None)
+
+    click.echo(f"Rollups reconstruídos: {dias} dia(s) com vendas.")
+
+
+@click.command("gerar-checkpoints-saldo")
+@click.option("--ate", type=click.DateTime(formats=["%Y-%m-%d"]), help="Último dia a gerar (AAAA-MM-DD); no máximo ontem.")
+@click.option("--reconstruir", is_flag=True, help="Descarta os checkpoints existentes e gera todo o histórico.")
+@with_appcontext
+def gerar_checkpoints_saldo_command(ate, reconstruir):
+    """Gera os checkpoints diários de saldo por produto (execute uma vez por dia)."""
+    gerados = gerar_checkpoints(db.session, ate.date() if ate else None, reconstruir)
+
+    click.echo(f"Checkpoints de saldo gerados: {gerados}.")
+
+
+@click.command("arquivar-vendas")
+@click.option("--dias", type=int, default=lambda: int(os.getenv("ARQUIVO_HORIZONTE_DIAS", "365")),
+              show_default="ARQUIVO_HORIZONTE_DIAS ou 365", help="Arquiva as vendas com mais de N dias.")
+@click.option("--tamanho-lote", default=1000, show_default=True, help="Vendas movidas por transação.")
+@with_appcontext
+def arquivar_vendas_command(dias, tamanho_lote):
+    """Move as vendas antigas, com itens e pagamentos, para o banco de arquivo (DATABASE_ARQUIVO)."""
+    horizonte = datetime.combine(datetime.utcnow().date() - timedelta(days=dias), datetime.min.time())
+    try:
+        registro = arquivar_vendas(db.session, horizonte, tamanho_lote)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+
+    click.echo(f"Vendas anteriores a {horizonte:%Y-%m-%d} arquivadas: {registro.vendas} venda(s), "
+               f"{registro.itens} item(ns), {registro.pagamentos} pagamento(s).")
+
+
+def registrar_comandos(app):
+    """Registra os comandos de manutenção na CLI do Flask."""
+    app.cli.add_command(recalcular_saldos_command)
+    app.cli.add_command(reconciliar_contadores_command)
+    app.cli.add_command(importar_estoques_command)
+    app.cli.add_command(verificar_planos_command)
+    app.cli.add_command(recalcular_rollups_command)
+    app.cli.add_command(gerar_checkpoints_saldo_command)
+    app.cli.add_command(arquivar_vendas_command)
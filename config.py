@@ -0,0 +1,182 @@
+import os
+
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from database import BIND_LEITURA
+from models.arquivo import ESQUEMA_ARQUIVO
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+# Banco padrão quando DATABASE_URL não é informada
+DATABASE_URL_PADRAO = "sqlite:///" + os.path.join(basedir, "database.db")
+
+# PRAGMAs aplicados a cada nova conexão SQLite (sobrescritos pelas variáveis de ambiente)
+PRAGMAS_SQLITE_PADRAO = {
+    "journal_mode": "WAL",       # leitores não bloqueiam o escritor e vice-versa
+    "synchronous": "NORMAL",     # seguro com WAL; fsync apenas nos checkpoints
+    "busy_timeout": "5000",      # ms aguardando o lock de escrita antes de falhar
+    "cache_size": "-20000",      # negativo = KiB (aprox. 20 MB por conexão)
+    "mmap_size": "268435456",    # 256 MB de leitura via memória mapeada
+}
+
+
+# PRAGMAs do engine de leitura no SQLite: os de escrita ficam com o primário
+PRAGMAS_SQLITE_LEITURA = ("busy_timeout", "cache_size", "mmap_size")
+
+# Cabeçalho com que o cliente pede que um GET leia do primário (ex.: logo após uma escrita)
+CABECALHO_LER_PRIMARIO = "X-Ler-Primario"
+
+
+def database_url():
+    """Retorna a URL do banco, resolvendo caminhos SQLite relativos a partir do projeto.
+
+    O Flask-SQLAlchemy resolveria "sqlite:///database.db" dentro da pasta
+    instance; aqui o caminho relativo é mantido relativo à raiz do projeto.
+    """
+    url = os.getenv("DATABASE_URL") or DATABASE_URL_PADRAO
+    url_parseada = make_url(url)
+
+    if url_parseada.get_backend_name() == "sqlite":
+        caminho = url_parseada.database
+        if caminho and caminho != ":memory:" and not caminho.startswith("file:") and not os.path.isabs(caminho):
+            url = url_parseada.set(database=os.path.join(basedir, caminho)).render_as_string(hide_password=False)
+
+    return url
+
+
+def caminho_arquivo():
+    """Caminho do banco SQLite de arquivo de vendas (DATABASE_ARQUIVO), ou None se desabilitado.
+
+    Caminhos relativos são resolvidos a partir da raiz do projeto.
+    """
+    caminho = os.getenv("DATABASE_ARQUIVO")
+    if not caminho:
+        return None
+    return caminho if os.path.isabs(caminho) else os.path.join(basedir, caminho)
+
+
+def configuracao_cache_produtos():
+    """Parâmetros de criar_cache para o cache de leitura dos produtos (PRODUTO_CACHE_*).
+
+    Sem PRODUTO_CACHE_URL o cache é um LRU local por processo: com o gunicorn
+    cada worker tem a sua cópia, com memória, taxa de acertos e estatísticas
+    (GET /produtos/cache) próprias, e a remoção da chave após uma escrita
+    alcança apenas o worker que a fez: nos demais, a entrada antiga vale até
+    expirar pelo TTL. Com PRODUTO_CACHE_URL=redis://... as entradas são
+    compartilhadas e a remoção vale para todos os workers.
+    """
+    return {
+        "url": os.getenv("PRODUTO_CACHE_URL"),
+        "tamanho_maximo": int(os.getenv("PRODUTO_CACHE_TAMANHO", "1024")),
+        "ttl": float(os.getenv("PRODUTO_CACHE_TTL", "60")),
+    }
+
+
+def pragmas_sqlite():
+    """PRAGMAs SQLite configurados, a partir de SQLITE_<PRAGMA> (ex.: SQLITE_JOURNAL_MODE)."""
+    return {
+        pragma: os.getenv(f"SQLITE_{pragma.upper()}", valor)
+        for pragma, valor in PRAGMAS_SQLITE_PADRAO.items()
+    }
+
+
+def opcoes_engine(url):
+    """Opções do create_engine conforme o banco.
+
+    Para bancos servidor (PostgreSQL, MySQL...) expõe o ajuste do pool de
+    conexões. No SQLite o pool padrão do SQLAlchemy já é o adequado.
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "1").lower() in ("1", "true", "sim"),
+    }
+
+
+def aplicar_pragmas_sqlite(engine, pragmas=None):
+    """Registra a aplicação dos PRAGMAs em cada nova conexão do engine SQLite."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    pragmas = pragmas_sqlite() if pragmas is None else pragmas
+
+    @event.listens_for(engine, "connect")
+    def _aplicar(conexao_dbapi, _registro):
+        cursor = conexao_dbapi.cursor()
+        for pragma, valor in pragmas.items():
+            if valor:
+                cursor.execute(f"PRAGMA {pragma}={valor}")
+        cursor.close()
+
+
+def anexar_arquivo_sqlite(engine, caminho):
+    """Anexa o banco de arquivo (ATTACH ... AS arquivo) a cada nova conexão do engine SQLite."""
+    if engine.dialect.name != "sqlite" or not caminho:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _anexar(conexao_dbapi, _registro):
+        conexao_dbapi.execute(f"ATTACH DATABASE ? AS {ESQUEMA_ARQUIVO}", (caminho,))
+
+
+def url_leitura(url):
+    """URL do engine de leitura, ou None quando as leituras ficam no primário.
+
+    DATABASE_URL_LEITURA aponta para uma réplica. Sem ela, um banco SQLite em
+    arquivo é lido por um segundo pool de conexões ao mesmo arquivo, com
+    PRAGMA query_only (com WAL, os leitores não disputam o lock do escritor).
+    DB_ROTEAR_LEITURAS=0 desliga o roteamento.
+    """
+    if os.getenv("DB_ROTEAR_LEITURAS", "1").lower() not in ("1", "true", "sim"):
+        return None
+
+    replica = os.getenv("DATABASE_URL_LEITURA")
+    if replica:
+        return replica
+
+    url_parseada = make_url(url)
+    if url_parseada.get_backend_name() == "sqlite" and url_parseada.database not in (None, "", ":memory:"):
+        return url
+    return None
+
+
+def configurar_roteamento(app, db):
+    """Liga a sessão de leitura nas requisições GET/HEAD.
+
+    O cliente pode pedir a leitura do primário com o cabeçalho X-Ler-Primario: 1;
+    dentro do handler, database.ler_do_primario() tem o mesmo efeito.
+    """
+    @app.before_request
+    def _rotear_sessao():
+        db.session.info["leitura"] = (request.method in ("GET", "HEAD")
+                                      and request.headers.get(CABECALHO_LER_PRIMARIO) != "1")
+
+
+def configurar_banco(app, db):
+    """Configura o Flask-SQLAlchemy a partir das variáveis de ambiente."""
+    url = database_url()
+    leitura = url_leitura(url)
+    app.config["SQLALCHEMY_DATABASE_URI"] = url
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = opcoes_engine(url)
+    if leitura:
+        app.config["SQLALCHEMY_BINDS"] = {BIND_LEITURA: {"url": leitura, **opcoes_engine(leitura)}}
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+
+    with app.app_context():
+        aplicar_pragmas_sqlite(db.engine)
+        anexar_arquivo_sqlite(db.engine, caminho_arquivo())
+        if leitura:
+            pragmas = {pragma: valor for pragma, valor in pragmas_sqlite().items() if pragma in PRAGMAS_SQLITE_LEITURA}
+            aplicar_pragmas_sqlite(db.engines[BIND_LEITURA], dict(pragmas, query_only="ON"))
+            anexar_arquivo_sqlite(db.engines[BIND_LEITURA], caminho_arquivo())
+
+    if leitura:
+        configurar_roteamento(app, db)
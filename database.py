@@ -1,10 +1,81 @@
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import Delete, Insert, MetaData, Table, Update, inspect
+
+# Chave, em SQLALCHEMY_BINDS, do engine usado pelas leituras (réplica ou conexão somente leitura)
+BIND_LEITURA = "leitura"
+
+# Índices que saíram dos modelos (tabela, índice), removidos por init_db dos bancos existentes
+INDICES_REMOVIDOS = [
+    # Coberto por ix_estoque_produto_id_data_entrada (produto_id, data_entrada, quantidade)
+    ("estoque", "ix_estoque_produto_id_quantidade"),
+]
+
+
+class SessaoRoteada(Session):
+    """Sessão que envia as consultas ao engine de leitura quando permitido.
+
+    session.info["leitura"] é ligado por requisição (GET/HEAD, ver
+    config.configurar_roteamento). Flushes e comandos de escrita vão sempre
+    para o primário, e a partir da primeira escrita (ou de ler_do_primario())
+    a sessão inteira passa a usar o primário, lendo o que acabou de gravar.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get("leitura") and not self.info.get("primario"):
+            if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+                self.info["primario"] = True
+            else:
+                return self._db.engines[BIND_LEITURA]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={"class_": SessaoRoteada})
+
+
+def ler_do_primario():
+    """Faz as próximas consultas da sessão atual lerem do primário (read-your-writes)."""
+    db.session.info["primario"] = True
+
+def remover_indices(engine, indices):
+    """Remove, dos bancos em que ainda existem, os índices (tabela, nome) informados."""
+    for tabela, nome in indices:
+        if not inspect(engine).has_table(tabela):
+            continue
+        for indice in Table(tabela, MetaData(), autoload_with=engine).indexes:
+            if indice.name == nome:
+                indice.drop(engine)
 
-db = SQLAlchemy()
 
 def init_db():
     from models.produto import Produto
     from models.estoque import Estoque
     from models.venda import Venda
     from models.pagamento import Pagamento
+    from models.vendaItem import VendaItem
+    from models.saldoProduto import SaldoProduto
+    from models.contador import Contador
+    from models.vendaDiaria import VendaDiaria, VendaProdutoDiaria
+    from models.saldoProdutoDiario import SaldoProdutoDiario
+    from models.vendaArquivada import Arquivamento, VendaArquivadaProduto
     db.create_all()
+
+    # create_all não adiciona índices novos a tabelas que já existem, nem remove os antigos
+    for tabela in db.metadata.sorted_tables:
+        for indice in tabela.indexes:
+            indice.create(db.engine, checkfirst=True)
+    remover_indices(db.engine, INDICES_REMOVIDOS)
+
+    # Índice de busca textual dos produtos (FTS5, apenas SQLite)
+    from services.busca import criar_indice_busca
+    with db.engine.begin() as conexao:
+        criar_indice_busca(conexao)
+
+    # Tabelas do banco de arquivo de vendas (apenas com DATABASE_ARQUIVO)
+    from services.arquivo import criar_tabelas_arquivo
+    with db.engine.begin() as conexao:
+        criar_tabelas_arquivo(conexao)
+
+    # Produtos sem linha de saldo (ex.: banco anterior à tabela saldo_produto)
+    from services.saldo import preencher_saldos_ausentes
+    preencher_saldos_ausentes(db.session)
@@ -0,0 +1,63 @@
+"""Configuração do gunicorn para produção.
+
+Recarga graciosa: envie SIGHUP ao processo mestre para reiniciar os workers
+sem derrubar conexões (com preload_app o código é carregado pelo mestre, então
+para publicar código novo use SIGUSR2 seguido de SIGTERM no mestre antigo, ou
+reinicie o container).
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+
+# Processos: por padrão 2 x núcleos + 1; threads atendem requisições concorrentes em cada processo
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+worker_class = "gthread"
+
+# Importa a aplicação (e gera a especificação OpenAPI) uma única vez antes do fork
+preload_app = True
+
+# Keep-alive: reaproveita conexões de clientes e do proxy reverso
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+
+# Recicla os workers periodicamente para conter crescimento de memória
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "5000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "500"))
+
+accesslog = os.getenv("GUNICORN_ACCESSLOG", "-")
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOGLEVEL", "info")
+
+
+def post_fork(server, worker):
+    # Cada worker abre o seu próprio pool de conexões
+    from app import app
+    from database import db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+    # A thread que escreve os logs não é herdada pelo fork
+    app.extensions["logs"].apos_fork()
+
+
+def on_starting(server):
+    # Métricas somadas entre os workers: descarta os arquivos de uma execução anterior
+    from services.metricas import diretorio_metricas, limpar_diretorio
+
+    diretorio = diretorio_metricas()
+    if diretorio and os.path.isdir(diretorio):
+        limpar_diretorio(diretorio)
+
+
+def child_exit(server, worker):
+    # Consolida as métricas do worker encerrado (reciclado por max_requests, por exemplo)
+    from services.metricas import diretorio_metricas, encerrar_processo
+
+    diretorio = diretorio_metricas()
+    if diretorio:
+        encerrar_processo(diretorio, worker.pid)
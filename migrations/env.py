@@ -45,6 +45,18 @@ target_db = current_app.extensions['migrate'].db
 # ... etc.
 
 
+# Índice FTS5 de busca de produtos (services/busca.py) e suas tabelas-sombra
+# (_config, _data, _docsize, _idx): criados por init_db fora dos modelos, não
+# devem ser removidos pelo autogenerate.
+PREFIXO_TABELAS_BUSCA = "produto_busca"
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "table" and reflected and compare_to is None and name.startswith(PREFIXO_TABELAS_BUSCA):
+        return False
+    return True
+
+
 def get_metadata():
     if hasattr(target_db, 'metadatas'):
         return target_db.metadatas[None]
@@ -65,7 +77,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -93,6 +106,7 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_object", include_object)
 
     connectable = get_engine()
 
@@ -0,0 +1,39 @@
+"""Adiciona saldo materializado por produto
+
+Revision ID: 3b1f6c2a9d10
+Revises: 8d42f8fcf5eb
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b1f6c2a9d10'
+down_revision = '8d42f8fcf5eb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('saldo_produto',
+    sa.Column('produto_id', sa.Integer(), nullable=False),
+    sa.Column('total_entradas', sa.Integer(), nullable=False),
+    sa.Column('total_saidas', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['produto_id'], ['produto.id'], ),
+    sa.PrimaryKeyConstraint('produto_id')
+    )
+
+    # Preenche os saldos com o histórico já existente
+    op.execute(
+        "INSERT INTO saldo_produto (produto_id, total_entradas, total_saidas) "
+        "SELECT produto.id, "
+        "COALESCE((SELECT SUM(estoque.quantidade) FROM estoque WHERE estoque.produto_id = produto.id), 0), "
+        "COALESCE((SELECT SUM(venda_item.quantidade) FROM venda_item WHERE venda_item.produto_id = produto.id), 0) "
+        "FROM produto"
+    )
+
+
+def downgrade():
+    op.drop_table('saldo_produto')
@@ -0,0 +1,36 @@
+"""Adiciona contadores da tela de início
+
+Revision ID: 5c7e2d4b8a31
+Revises: 3b1f6c2a9d10
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c7e2d4b8a31'
+down_revision = '3b1f6c2a9d10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('contador',
+    sa.Column('nome', sa.String(length=50), nullable=False),
+    sa.Column('valor', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('nome')
+    )
+    # Valores iniciais calculados a partir do histórico existente
+    op.execute("""
+        INSERT INTO contador (nome, valor)
+        SELECT 'valor_total_vendas', COALESCE(SUM(quantidade * preco), 0) FROM venda_item
+        UNION ALL SELECT 'total_produtos', COUNT(id) FROM produto
+        UNION ALL SELECT 'total_entradas_estoque', COALESCE(SUM(quantidade), 0) FROM estoque
+        UNION ALL SELECT 'total_saidas_estoque', COALESCE(SUM(quantidade), 0) FROM venda_item
+    """)
+
+
+def downgrade():
+    op.drop_table('contador')
@@ -0,0 +1,35 @@
+"""Adiciona índices das consultas frequentes
+
+Revision ID: 7e9a1f3c5b62
+Revises: 5c7e2d4b8a31
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7e9a1f3c5b62'
+down_revision = '5c7e2d4b8a31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_estoque_produto_id_quantidade', 'estoque', ['produto_id', 'quantidade'], unique=False)
+    op.create_index('ix_estoque_data_entrada', 'estoque', ['data_entrada'], unique=False)
+    op.create_index('ix_estoque_numero_nota_fiscal', 'estoque', ['numero_nota_fiscal'], unique=False)
+    op.create_index('ix_venda_item_produto_id_quantidade', 'venda_item', ['produto_id', 'quantidade'], unique=False)
+    op.create_index('ix_venda_item_venda_id', 'venda_item', ['venda_id'], unique=False)
+    op.create_index('ix_pagamento_codigo_venda', 'pagamento', ['codigo_venda'], unique=False)
+    op.create_index('ix_venda_data', 'venda', ['data'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_venda_data', table_name='venda')
+    op.drop_index('ix_pagamento_codigo_venda', table_name='pagamento')
+    op.drop_index('ix_venda_item_venda_id', table_name='venda_item')
+    op.drop_index('ix_venda_item_produto_id_quantidade', table_name='venda_item')
+    op.drop_index('ix_estoque_numero_nota_fiscal', table_name='estoque')
+    op.drop_index('ix_estoque_data_entrada', table_name='estoque')
+    op.drop_index('ix_estoque_produto_id_quantidade', table_name='estoque')
@@ -0,0 +1,58 @@
+"""Adiciona rollups diários de vendas
+
+Revision ID: 9a4c6e1d2f73
+Revises: 7e9a1f3c5b62
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a4c6e1d2f73'
+down_revision = '7e9a1f3c5b62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('venda_diaria',
+    sa.Column('dia', sa.Date(), nullable=False),
+    sa.Column('quantidade', sa.Integer(), nullable=False),
+    sa.Column('receita', sa.Float(), nullable=False),
+    sa.Column('vendas', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('dia')
+    )
+    op.create_table('venda_produto_diaria',
+    sa.Column('dia', sa.Date(), nullable=False),
+    sa.Column('produto_id', sa.Integer(), nullable=False),
+    sa.Column('quantidade', sa.Integer(), nullable=False),
+    sa.Column('receita', sa.Float(), nullable=False),
+    sa.Column('vendas', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['produto_id'], ['produto.id'], ),
+    sa.PrimaryKeyConstraint('dia', 'produto_id')
+    )
+    op.create_index('ix_venda_produto_diaria_produto_id_dia', 'venda_produto_diaria', ['produto_id', 'dia'], unique=False)
+
+    # Preenche os rollups com o histórico já existente
+    op.execute(
+        "INSERT INTO venda_diaria (dia, quantidade, receita, vendas) "
+        "SELECT date(venda.data), COALESCE(SUM(venda_item.quantidade), 0), "
+        "COALESCE(SUM(venda_item.quantidade * venda_item.preco), 0), COUNT(DISTINCT venda.id) "
+        "FROM venda LEFT OUTER JOIN venda_item ON venda_item.venda_id = venda.id "
+        "GROUP BY date(venda.data)"
+    )
+    op.execute(
+        "INSERT INTO venda_produto_diaria (dia, produto_id, quantidade, receita, vendas) "
+        "SELECT date(venda.data), venda_item.produto_id, SUM(venda_item.quantidade), "
+        "SUM(venda_item.quantidade * venda_item.preco), COUNT(DISTINCT venda.id) "
+        "FROM venda JOIN venda_item ON venda_item.venda_id = venda.id "
+        "GROUP BY date(venda.data), venda_item.produto_id"
+    )
+
+
+def downgrade():
+    op.drop_index('ix_venda_produto_diaria_produto_id_dia', table_name='venda_produto_diaria')
+    op.drop_table('venda_produto_diaria')
+    op.drop_table('venda_diaria')
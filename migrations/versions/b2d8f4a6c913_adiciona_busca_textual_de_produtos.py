@@ -0,0 +1,61 @@
+"""Adiciona busca textual de produtos (FTS5)
+
+Revision ID: b2d8f4a6c913
+Revises: 9a4c6e1d2f73
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2d8f4a6c913'
+down_revision = '9a4c6e1d2f73'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FTS5 existe apenas no SQLite; nos demais bancos a busca usa LIKE
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    op.execute("""
+        CREATE VIRTUAL TABLE produto_busca USING fts5(
+            nome, descricao,
+            content='produto', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER produto_busca_ai AFTER INSERT ON produto BEGIN
+            INSERT INTO produto_busca (rowid, nome, descricao) VALUES (new.id, new.nome, new.descricao);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER produto_busca_ad AFTER DELETE ON produto BEGIN
+            INSERT INTO produto_busca (produto_busca, rowid, nome, descricao)
+            VALUES ('delete', old.id, old.nome, old.descricao);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER produto_busca_au AFTER UPDATE ON produto BEGIN
+            INSERT INTO produto_busca (produto_busca, rowid, nome, descricao)
+            VALUES ('delete', old.id, old.nome, old.descricao);
+            INSERT INTO produto_busca (rowid, nome, descricao) VALUES (new.id, new.nome, new.descricao);
+        END
+    """)
+    op.execute("INSERT INTO produto_busca (produto_busca, rank) VALUES ('rank', 'bm25(10.0, 1.0)')")
+    # Indexa os produtos já cadastrados
+    op.execute("INSERT INTO produto_busca (produto_busca) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS produto_busca_au")
+    op.execute("DROP TRIGGER IF EXISTS produto_busca_ad")
+    op.execute("DROP TRIGGER IF EXISTS produto_busca_ai")
+    op.execute("DROP TABLE IF EXISTS produto_busca")
@@ -0,0 +1,38 @@
+"""Adiciona checkpoints diários de saldo por produto
+
+Revision ID: d5e3a7b1c482
+Revises: b2d8f4a6c913
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5e3a7b1c482'
+down_revision = 'b2d8f4a6c913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('saldo_produto_diario',
+    sa.Column('produto_id', sa.Integer(), nullable=False),
+    sa.Column('dia', sa.Date(), nullable=False),
+    sa.Column('saldo', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['produto_id'], ['produto.id'], ),
+    sa.PrimaryKeyConstraint('produto_id', 'dia')
+    )
+    op.create_index('ix_saldo_produto_diario_dia', 'saldo_produto_diario', ['dia'], unique=False)
+    op.create_index('ix_estoque_produto_id_data_entrada', 'estoque', ['produto_id', 'data_entrada', 'quantidade'], unique=False)
+    # Coberto pelo índice acima (mesmo prefixo produto_id, também com quantidade)
+    op.drop_index('ix_estoque_produto_id_quantidade', table_name='estoque')
+    # Os checkpoints do histórico são gerados por `flask gerar-checkpoints-saldo`
+
+
+def downgrade():
+    op.create_index('ix_estoque_produto_id_quantidade', 'estoque', ['produto_id', 'quantidade'], unique=False)
+    op.drop_index('ix_estoque_produto_id_data_entrada', table_name='estoque')
+    op.drop_index('ix_saldo_produto_diario_dia', table_name='saldo_produto_diario')
+    op.drop_table('saldo_produto_diario')
@@ -0,0 +1,41 @@
+"""Adiciona totais das vendas arquivadas e registro do arquivamento
+
+Revision ID: e8c1f5a3d726
+Revises: d5e3a7b1c482
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8c1f5a3d726'
+down_revision = 'd5e3a7b1c482'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('venda_arquivada_produto',
+    sa.Column('produto_id', sa.Integer(), nullable=False),
+    sa.Column('quantidade', sa.Integer(), nullable=False),
+    sa.Column('receita', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['produto_id'], ['produto.id'], ),
+    sa.PrimaryKeyConstraint('produto_id')
+    )
+    op.create_table('arquivamento',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('executado_em', sa.DateTime(), nullable=False),
+    sa.Column('horizonte', sa.DateTime(), nullable=False),
+    sa.Column('vendas', sa.Integer(), nullable=False),
+    sa.Column('itens', sa.Integer(), nullable=False),
+    sa.Column('pagamentos', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # As tabelas do banco de arquivo (DATABASE_ARQUIVO) são criadas pela aplicação ao anexá-lo
+
+
+def downgrade():
+    op.drop_table('arquivamento')
+    op.drop_table('venda_arquivada_produto')
@@ -0,0 +1,43 @@
+from sqlalchemy import Column, DateTime, Float, Index, Integer, MetaData, String, Table
+
+# Banco SQLite de arquivo, anexado a cada conexão com este nome (DATABASE_ARQUIVO)
+ESQUEMA_ARQUIVO = "arquivo"
+
+# Tabelas fora de db.metadata: criadas apenas no banco de arquivo (services.arquivo)
+metadata_arquivo = MetaData(schema=ESQUEMA_ARQUIVO)
+
+# Mesmas colunas de venda, venda_item e pagamento, sem as chaves estrangeiras
+venda_arquivada = Table(
+    "venda", metadata_arquivo,
+    Column("id", Integer, primary_key=True),
+    Column("codigo", String, nullable=False),
+    Column("data", DateTime, nullable=False),
+    Column("frete_cep", String(9)),
+    Column("frete_logradouro", String),
+    Column("frete_numero", Integer),
+    Column("frete_complemento", String),
+    Column("frete_bairro", String),
+    Column("frete_cidade", String),
+    Column("frete_uf", String(2)),
+    Index("ix_venda_codigo", "codigo"),
+    Index("ix_venda_data", "data"),
+)
+
+venda_item_arquivada = Table(
+    "venda_item", metadata_arquivo,
+    Column("id", Integer, primary_key=True),
+    Column("venda_id", Integer, nullable=False),
+    Column("produto_id", Integer, nullable=False),
+    Column("quantidade", Integer, nullable=False),
+    Column("preco", Float, nullable=False),
+    Index("ix_venda_item_venda_id", "venda_id"),
+)
+
+pagamento_arquivado = Table(
+    "pagamento", metadata_arquivo,
+    Column("id", Integer, primary_key=True),
+    Column("codigo_venda", String, nullable=False),
+    Column("forma", String, nullable=False),
+    Column("valor", Float, nullable=False),
+    Index("ix_pagamento_codigo_venda", "codigo_venda"),
+)
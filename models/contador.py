@@ -0,0 +1,6 @@
+from database import db
+
+class Contador(db.Model):
+    # Totalizadores mantidos de forma incremental pelas escritas (tela de início)
+    nome = db.Column(db.String(50), primary_key=True)
+    valor = db.Column(db.Float, nullable=False, default=0)
@@ -9,3 +9,11 @@ class Estoque(db.Model):
     numero_nota_fiscal = db.Column(db.String(50), nullable=False)    
 
     produto = db.relationship("Produto", backref="estoque")
+
+    __table_args__ = (
+        db.Index("ix_estoque_data_entrada", "data_entrada"),
+        # Entradas de um produto em um período (saldo em uma data a partir do checkpoint);
+        # também cobre as somas de quantidade por produto e o filtro por produto_id
+        db.Index("ix_estoque_produto_id_data_entrada", "produto_id", "data_entrada", "quantidade"),
+        db.Index("ix_estoque_numero_nota_fiscal", "numero_nota_fiscal"),
+    )
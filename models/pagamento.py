@@ -5,3 +5,8 @@ class Pagamento(db.Model):
     codigo_venda = db.Column(db.String, nullable=False)  # Utiliza o mesmo código da venda
     forma = db.Column(db.String, nullable=False)
     valor = db.Column(db.Float, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_pagamento_codigo_venda", "codigo_venda"),
+    )
+
@@ -0,0 +1,13 @@
+from database import db
+
+class SaldoProduto(db.Model):
+    __tablename__ = "saldo_produto"
+
+    # Saldo materializado por produto, mantido na mesma transação das escritas
+    produto_id = db.Column(db.Integer, db.ForeignKey("produto.id"), primary_key=True)
+    total_entradas = db.Column(db.Integer, nullable=False, default=0)
+    total_saidas = db.Column(db.Integer, nullable=False, default=0)
+
+    @property
+    def saldo(self):
+        return self.total_entradas - self.total_saidas
@@ -0,0 +1,14 @@
+from database import db
+
+class SaldoProdutoDiario(db.Model):
+    __tablename__ = "saldo_produto_diario"
+
+    # Saldo de cada produto ao fim do dia (checkpoint), gerado para os dias com movimentação
+    produto_id = db.Column(db.Integer, db.ForeignKey("produto.id"), primary_key=True)
+    dia = db.Column(db.Date, primary_key=True)
+    saldo = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        # Invalidação dos checkpoints a partir de um dia, para todos os produtos
+        db.Index("ix_saldo_produto_diario_dia", "dia"),
+    )
@@ -16,4 +16,8 @@ class Venda(db.Model):
     frete_uf = db.Column(db.String(2), nullable=True)
 
     # Relacionamento com os itens da venda
-    itens = db.relationship("VendaItem", backref="venda", cascade="all, delete-orphan")
\ No newline at end of file
+    itens = db.relationship("VendaItem", backref="venda", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        db.Index("ix_venda_data", "data"),
+    )
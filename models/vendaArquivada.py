@@ -0,0 +1,22 @@
+from database import db
+
+class VendaArquivadaProduto(db.Model):
+    __tablename__ = "venda_arquivada_produto"
+
+    # Totais por produto das vendas movidas para o banco de arquivo (carry-forward):
+    # somados ao histórico na reconciliação de saldos e contadores
+    produto_id = db.Column(db.Integer, db.ForeignKey("produto.id"), primary_key=True)
+    quantidade = db.Column(db.Integer, nullable=False, default=0)
+    receita = db.Column(db.Float, nullable=False, default=0)
+
+
+class Arquivamento(db.Model):
+    __tablename__ = "arquivamento"
+
+    # Execuções do arquivamento; as vendas anteriores ao maior horizonte estão no arquivo
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    executado_em = db.Column(db.DateTime, nullable=False)
+    horizonte = db.Column(db.DateTime, nullable=False)
+    vendas = db.Column(db.Integer, nullable=False, default=0)
+    itens = db.Column(db.Integer, nullable=False, default=0)
+    pagamentos = db.Column(db.Integer, nullable=False, default=0)
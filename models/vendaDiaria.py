@@ -0,0 +1,25 @@
+from database import db
+
+class VendaDiaria(db.Model):
+    __tablename__ = "venda_diaria"
+
+    # Totais de vendas por dia, mantidos de forma incremental (relatórios)
+    dia = db.Column(db.Date, primary_key=True)
+    quantidade = db.Column(db.Integer, nullable=False, default=0)
+    receita = db.Column(db.Float, nullable=False, default=0)
+    vendas = db.Column(db.Integer, nullable=False, default=0)
+
+
+class VendaProdutoDiaria(db.Model):
+    __tablename__ = "venda_produto_diaria"
+
+    # Totais de vendas por dia e produto; vendas = vendas distintas que incluíram o produto
+    dia = db.Column(db.Date, primary_key=True)
+    produto_id = db.Column(db.Integer, db.ForeignKey("produto.id"), primary_key=True)
+    quantidade = db.Column(db.Integer, nullable=False, default=0)
+    receita = db.Column(db.Float, nullable=False, default=0)
+    vendas = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index("ix_venda_produto_diaria_produto_id_dia", "produto_id", "dia"),
+    )
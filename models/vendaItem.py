@@ -7,4 +7,10 @@ class VendaItem(db.Model):
     quantidade = db.Column(db.Integer, nullable=False)
     preco = db.Column(db.Float, nullable=False)
 
-    produto = db.relationship("Produto", backref="itens_venda")
\ No newline at end of file
+    produto = db.relationship("Produto", backref="itens_venda")
+
+    __table_args__ = (
+        # Cobre as somas de quantidade por produto
+        db.Index("ix_venda_item_produto_id_quantidade", "produto_id", "quantidade"),
+        db.Index("ix_venda_item_venda_id", "venda_id"),
+    )
@@ -1,6 +1,7 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import List, Optional
-from pydantic import BaseModel
+from flask_openapi3 import FileStorage
+from pydantic import BaseModel, Field
 
 class EstoqueSchema(BaseModel):
     id: Optional[int] = None
@@ -19,4 +20,36 @@ class ListagemEstoquesSchema(BaseModel):
 class EstoqueBuscaPorIDSchema(BaseModel):
     id: int     
 
+class EstoqueListagemQuerySchema(BaseModel):
+    produto_id: Optional[int] = None
+    data_inicio: Optional[datetime] = Field(None, description="Data de entrada mínima (inclusive).")
+    data_fim: Optional[datetime] = Field(None, description="Data de entrada máxima (inclusive).")
+    numero_nota_fiscal: Optional[str] = None
+    stream: bool = Field(False, description="Retorna as entradas em NDJSON, uma por linha, à medida que são lidas.")
+
+
+
+class EstoqueSaldoQuerySchema(BaseModel):
+    produto_id: int
+    data: date = Field(..., description="Dia (AAAA-MM-DD); o saldo é o do fim do dia.")
+
+class EstoqueSaldoSchema(BaseModel):
+    produto_id: int
+    data: date
+    saldo: int
+    checkpoint: Optional[date] = Field(None, description="Dia do checkpoint de saldo usado como ponto de partida.")
+
+class EstoqueImportacaoFormSchema(BaseModel):
+    arquivo: FileStorage = Field(..., description="CSV com as colunas produto_id, quantidade, data_entrada e numero_nota_fiscal.")
+    tamanho_lote: int = Field(500, ge=1, le=10000, description="Quantidade de linhas gravadas por transação.")
+
+class EstoqueImportacaoRejeicaoSchema(BaseModel):
+    linha: int
+    motivo: str
 
+class EstoqueImportacaoResultadoSchema(BaseModel):
+    importadas: int
+    rejeitadas: int
+    rejeicoes: List[EstoqueImportacaoRejeicaoSchema]
+    duracao_segundos: float
+    linhas_por_segundo: float
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 
 class ProdutoSchema(BaseModel):
@@ -12,8 +12,22 @@ class ProdutoSchema(BaseModel):
         from_attributes = True
 
 
+class ProdutoSaldoSchema(ProdutoSchema):
+    saldo: int = 0
+
+
 class ListagemProdutosSchema(BaseModel):
-    produtos: List[ProdutoSchema]
+    produtos: List[ProdutoSaldoSchema]
+    proximo_cursor: Optional[str] = None
+
+class ProdutoListagemQuerySchema(BaseModel):
+    limit: int = Field(100, ge=1, le=1000, description="Quantidade máxima de produtos por página.")
+    after: Optional[str] = Field(None, description="Cursor retornado em proximo_cursor pela página anterior.")
+
+class ProdutoBuscaTextualQuerySchema(BaseModel):
+    q: str = Field(..., min_length=1, max_length=200, description="Termos procurados no nome e na descrição; cada termo vale como prefixo e acentos são ignorados.")
+    limit: int = Field(20, ge=1, le=100, description="Quantidade máxima de produtos por página.")
+    after: Optional[str] = Field(None, description="Cursor retornado em proximo_cursor pela página anterior.")
 
 class ProdutoBuscaPorIDSchema(BaseModel):
     id: int
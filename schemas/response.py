@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel
 
 class ValorSchema(BaseModel):
@@ -5,3 +6,20 @@ class ValorSchema(BaseModel):
 
 class TotalSchema(BaseModel):
     total: int
+
+class DashboardSchema(BaseModel):
+    valor_total_vendas: float
+    total_produtos: int
+    total_estoque: int
+
+class CacheEstatisticasSchema(BaseModel):
+    # Processo (worker do gunicorn) que respondeu: sem cache compartilhado, as estatísticas são dele
+    processo: int
+    backend: str
+    tamanho: Optional[int] = None
+    tamanho_maximo: Optional[int] = None
+    ttl: float
+    acertos: int
+    falhas: int
+    despejos: Optional[int] = None
+    expiracoes: Optional[int] = None
@@ -1,10 +1,10 @@
-from datetime import datetime
-from typing import List, Optional
+from datetime import date, datetime
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field, field_validator
 
 class VendaItemSchema(BaseModel):
     produto_id: int
-    quantidade: int
+    quantidade: int = Field(..., gt=0)
     preco: float
 
     model_config = {
@@ -54,3 +54,61 @@ class VendaSchema(BaseModel):
         if isinstance(v, list):
             return [item if isinstance(item, dict) else VendaItemSchema.from_orm(item) for item in v]
         return v
+
+
+class VendaListagemQuerySchema(BaseModel):
+    limit: int = Field(100, ge=1, le=1000, description="Quantidade máxima de vendas por página.")
+    after: Optional[str] = Field(None, description="Cursor retornado em proximo_cursor pela página anterior.")
+    codigo: Optional[str] = None
+    data_inicio: Optional[datetime] = Field(None, description="Data da venda mínima (inclusive).")
+    data_fim: Optional[datetime] = Field(None, description="Data da venda máxima (inclusive).")
+    incluir_arquivadas: bool = Field(False, description="Inclui as vendas movidas para o banco de arquivo.")
+
+class ListagemVendasSchema(BaseModel):
+    vendas: List[VendaSchema]
+    proximo_cursor: Optional[str] = None
+
+class VendaBuscaQuerySchema(BaseModel):
+    id: Optional[int] = None
+    codigo: Optional[str] = None
+    incluir_arquivadas: bool = Field(False, description="Procura também no banco de arquivo.")
+
+
+class VendaLoteSchema(BaseModel):
+    vendas: List[VendaSchema]
+    tamanho_lote: int = Field(500, ge=1, le=5000, description="Quantidade de vendas gravadas por transação.")
+
+class VendaLoteItemResultadoSchema(BaseModel):
+    codigo: str
+    sucesso: bool
+    id: Optional[int] = None
+    mensagem: Optional[str] = None
+
+class VendaLoteResultadoSchema(BaseModel):
+    registradas: int
+    rejeitadas: int
+    resultados: List[VendaLoteItemResultadoSchema]
+
+class VendaPendenteSchema(BaseModel):
+    """Venda cujo resultado ainda não é conhecido (gravação em grupo em andamento)."""
+    codigo: str
+    message: str
+
+class RelatorioVendasQuerySchema(BaseModel):
+    de: date = Field(..., description="Primeiro dia do relatório (inclusive).")
+    ate: date = Field(..., description="Último dia do relatório (inclusive).")
+    granularidade: Literal["dia", "semana", "mes"] = Field("dia", description="Agrupamento dos totais; semanas começam na segunda-feira.")
+    produto_id: Optional[int] = Field(None, description="Restringe o relatório a um produto.")
+
+class RelatorioVendasPeriodoSchema(BaseModel):
+    inicio: date
+    quantidade: int
+    receita: float
+    vendas: int
+
+class RelatorioVendasSchema(BaseModel):
+    de: date
+    ate: date
+    granularidade: str
+    produto_id: Optional[int] = None
+    periodos: List[RelatorioVendasPeriodoSchema]
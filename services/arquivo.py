@@ -0,0 +1,143 @@
+from datetime import datetime, time
+
+from sqlalchemy import bindparam, delete, insert, select, update
+
+from database import db
+from models.arquivo import (ESQUEMA_ARQUIVO, metadata_arquivo, pagamento_arquivado, venda_arquivada,
+                            venda_item_arquivada)
+from models.pagamento import Pagamento
+from models.venda import Venda
+from models.vendaArquivada import Arquivamento, VendaArquivadaProduto
+from models.vendaItem import VendaItem
+
+
+def arquivo_disponivel(conexao):
+    """Indica se o banco de arquivo está anexado à conexão (DATABASE_ARQUIVO)."""
+    if conexao.dialect.name != "sqlite":
+        return False
+    # O ATTACH é feito ao abrir a conexão: o resultado vale por toda a vida dela
+    disponivel = conexao.info.get("arquivo_disponivel")
+    if disponivel is None:
+        disponivel = conexao.info["arquivo_disponivel"] = any(
+            nome == ESQUEMA_ARQUIVO for _, nome, _ in conexao.exec_driver_sql("PRAGMA database_list"))
+    return disponivel
+
+
+def criar_tabelas_arquivo(conexao):
+    """Cria as tabelas do banco de arquivo, se ele estiver anexado. Idempotente."""
+    if arquivo_disponivel(conexao):
+        metadata_arquivo.create_all(conexao)
+
+
+def codigos_arquivados(session, codigos):
+    """Códigos, dentre `codigos`, que pertencem a vendas já arquivadas.
+
+    As vendas arquivadas saem do índice único de venda.codigo; toda gravação
+    de venda deve consultar também o arquivo para não reutilizar um código.
+    """
+    if not codigos or not arquivo_disponivel(session.connection()):
+        return set()
+    return {codigo for (codigo,) in session.execute(
+        select(venda_arquivada.c.codigo).where(venda_arquivada.c.codigo.in_(list(codigos))))}
+
+
+def horizonte_arquivado(session):
+    """Data antes da qual as vendas foram movidas para o arquivo (None se nunca arquivadas)."""
+    return session.query(db.func.max(Arquivamento.horizonte)).scalar()
+
+
+def totais_arquivados(session):
+    """Totais por produto das vendas arquivadas: produto_id -> (quantidade, receita)."""
+    return {
+        produto_id: (quantidade, receita)
+        for produto_id, quantidade, receita in session.query(
+            VendaArquivadaProduto.produto_id, VendaArquivadaProduto.quantidade, VendaArquivadaProduto.receita)
+    }
+
+
+def arquivar_vendas(session, horizonte, tamanho_lote=1000):
+    """Move as vendas anteriores a `horizonte` (com itens e pagamentos) para o arquivo.
+
+    Cada lote é copiado para o arquivo, somado aos totais por produto de
+    venda_arquivada_produto e removido das tabelas de vendas em uma
+    transação. Com o banco principal em WAL, o commit não é atômico entre
+    os dois arquivos; a cópia usa INSERT OR IGNORE para que um lote
+    interrompido possa ser refeito. Os rollups diários não são alterados.
+    O horizonte é arredondado para a meia-noite do seu dia: um dia nunca fica
+    em parte no arquivo, e reconstruir_rollups pode refazer todos os dias a
+    partir dele. Retorna o registro de Arquivamento da execução.
+    """
+    if not arquivo_disponivel(session.connection()):
+        raise RuntimeError("Banco de arquivo não configurado (DATABASE_ARQUIVO).")
+    criar_tabelas_arquivo(session.connection())
+    horizonte = datetime.combine(horizonte.date(), time.min)
+
+    registro = Arquivamento(executado_em=datetime.utcnow(), horizonte=horizonte, vendas=0, itens=0, pagamentos=0)
+    session.add(registro)
+
+    # A venda mais recente permanece: o SQLite reutilizaria os ids de uma tabela esvaziada
+    ultimo_id = session.query(db.func.max(Venda.id)).scalar() or 0
+
+    while True:
+        vendas = session.query(Venda.id, Venda.codigo).filter(
+            Venda.data < horizonte, Venda.id < ultimo_id
+        ).order_by(Venda.id).limit(tamanho_lote).all()
+        if not vendas:
+            break
+
+        ids = [venda.id for venda in vendas]
+        codigos = [venda.codigo for venda in vendas]
+        _copiar(session, Venda.__table__, venda_arquivada, Venda.__table__.c.id.in_(ids))
+        itens = _copiar(session, VendaItem.__table__, venda_item_arquivada, VendaItem.__table__.c.venda_id.in_(ids))
+        pagamentos = _copiar(session, Pagamento.__table__, pagamento_arquivado,
+                             Pagamento.__table__.c.codigo_venda.in_(codigos))
+        _acumular_totais(session, ids)
+
+        session.execute(delete(Pagamento.__table__).where(Pagamento.__table__.c.codigo_venda.in_(codigos)))
+        session.execute(delete(VendaItem.__table__).where(VendaItem.__table__.c.venda_id.in_(ids)))
+        session.execute(delete(Venda.__table__).where(Venda.__table__.c.id.in_(ids)))
+
+        registro.vendas += len(ids)
+        registro.itens += itens
+        registro.pagamentos += pagamentos
+        session.commit()
+
+    session.commit()
+    return registro
+
+
+def _copiar(session, origem, destino, filtro):
+    colunas = [coluna.name for coluna in destino.columns]
+    return session.execute(insert(destino).prefix_with("OR IGNORE").from_select(
+        colunas, select(*[origem.c[nome] for nome in colunas]).where(filtro)
+    )).rowcount
+
+
+def _acumular_totais(session, ids):
+    """Soma quantidade e receita dos itens das vendas `ids` aos totais arquivados por produto."""
+    totais = session.query(
+        VendaItem.produto_id,
+        db.func.sum(VendaItem.quantidade),
+        db.func.sum(VendaItem.quantidade * VendaItem.preco),
+    ).filter(VendaItem.venda_id.in_(ids)).group_by(VendaItem.produto_id).all()
+    if not totais:
+        return
+
+    # Linhas ainda inexistentes são criadas zeradas antes do UPDATE em lote
+    tabela = VendaArquivadaProduto.__table__
+    existentes = {produto_id for (produto_id,) in session.execute(
+        select(tabela.c.produto_id).where(tabela.c.produto_id.in_([produto_id for produto_id, _, _ in totais]))
+    )}
+    novos = [{"produto_id": produto_id, "quantidade": 0, "receita": 0.0}
+             for produto_id, _, _ in totais if produto_id not in existentes]
+    if novos:
+        session.execute(insert(tabela), novos)
+
+    session.execute(
+        update(tabela).where(tabela.c.produto_id == bindparam("b_produto_id")).values(
+            quantidade=tabela.c.quantidade + bindparam("b_quantidade"),
+            receita=tabela.c.receita + bindparam("b_receita"),
+        ),
+        [{"b_produto_id": produto_id, "b_quantidade": quantidade, "b_receita": receita}
+         for produto_id, quantidade, receita in totais],
+    )
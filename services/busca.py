@@ -0,0 +1,136 @@
+import re
+
+from sqlalchemy import text
+
+from database import db
+from models.produto import Produto
+from models.saldoProduto import SaldoProduto
+
+# Índice FTS5 com conteúdo externo: os textos ficam apenas em produto e o
+# índice é mantido pelos gatilhos abaixo em qualquer escrita na tabela.
+# remove_diacritics 2 faz "algodao" encontrar "Algodão" (e vice-versa).
+DDL_BUSCA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS produto_busca USING fts5(
+        nome, descricao,
+        content='produto', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS produto_busca_ai AFTER INSERT ON produto BEGIN
+        INSERT INTO produto_busca (rowid, nome, descricao) VALUES (new.id, new.nome, new.descricao);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS produto_busca_ad AFTER DELETE ON produto BEGIN
+        INSERT INTO produto_busca (produto_busca, rowid, nome, descricao)
+        VALUES ('delete', old.id, old.nome, old.descricao);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS produto_busca_au AFTER UPDATE ON produto BEGIN
+        INSERT INTO produto_busca (produto_busca, rowid, nome, descricao)
+        VALUES ('delete', old.id, old.nome, old.descricao);
+        INSERT INTO produto_busca (rowid, nome, descricao) VALUES (new.id, new.nome, new.descricao);
+    END
+    """,
+    # Ocorrências no nome pesam mais que na descrição
+    "INSERT INTO produto_busca (produto_busca, rank) VALUES ('rank', 'bm25(10.0, 1.0)')",
+]
+
+TERMO = re.compile(r"\w+")
+
+
+def busca_textual_disponivel(conexao):
+    """O índice FTS5 só existe em bancos SQLite."""
+    return conexao.dialect.name == "sqlite"
+
+
+def criar_indice_busca(conexao):
+    """Cria (se necessário) o índice de busca e os gatilhos de sincronização.
+
+    Produtos cadastrados antes da existência do índice são indexados com o
+    comando 'rebuild' do FTS5.
+    """
+    if not busca_textual_disponivel(conexao):
+        return
+
+    existia = conexao.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'produto_busca'"
+    )).first() is not None
+
+    for comando in DDL_BUSCA:
+        conexao.execute(text(comando))
+
+    if not existia:
+        conexao.execute(text("INSERT INTO produto_busca (produto_busca) VALUES ('rebuild')"))
+
+
+def termos_da_busca(q):
+    """Separa o texto digitado em termos (letras e números)."""
+    return TERMO.findall(q)
+
+
+def expressao_fts(termos):
+    """Expressão MATCH em que todos os termos precisam aparecer, cada um como prefixo.
+
+    Os termos são sempre colocados entre aspas, então operadores do FTS5
+    digitados pelo usuário (AND, NEAR, *, ...) são tratados como texto.
+    """
+    return " ".join(f'"{termo}"*' for termo in termos)
+
+
+def buscar_produtos(session, q, limite, apos=None):
+    """Busca produtos por nome e descrição, do mais para o menos relevante.
+
+    Retorna até limite + 1 linhas (produto_id, nome, descricao, preco,
+    relevancia, saldo); a linha
+    excedente indica que há uma próxima página. apos é a chave
+    (relevancia, produto_id) da última linha da página anterior.
+    """
+    termos = termos_da_busca(q)
+    if not termos:
+        return []
+
+    conexao = session.connection()
+    if not busca_textual_disponivel(conexao):
+        return _buscar_produtos_sem_fts(session, termos, limite, apos)
+
+    filtro_pagina = ""
+    parametros = {"expressao": expressao_fts(termos), "limite": limite + 1}
+    if apos is not None:
+        filtro_pagina = ("AND (produto_busca.rank > :rank "
+                         "OR (produto_busca.rank = :rank AND produto_busca.rowid > :produto_id))")
+        parametros["rank"], parametros["produto_id"] = apos
+
+    return session.execute(text(f"""
+        SELECT produto_busca.rowid AS produto_id,
+               produto.nome, produto.descricao, produto.preco,
+               produto_busca.rank AS relevancia,
+               COALESCE(saldo_produto.total_entradas, 0) - COALESCE(saldo_produto.total_saidas, 0) AS saldo
+        FROM produto_busca
+        JOIN produto ON produto.id = produto_busca.rowid
+        LEFT OUTER JOIN saldo_produto ON saldo_produto.produto_id = produto_busca.rowid
+        WHERE produto_busca MATCH :expressao {filtro_pagina}
+        ORDER BY produto_busca.rank, produto_busca.rowid
+        LIMIT :limite
+    """), parametros).all()
+
+
+def _buscar_produtos_sem_fts(session, termos, limite, apos):
+    """Alternativa para bancos sem FTS5: LIKE por termo, ordenado por id, sem relevância."""
+    saldo = (db.func.coalesce(SaldoProduto.total_entradas, 0)
+             - db.func.coalesce(SaldoProduto.total_saidas, 0))
+    consulta = session.query(
+        Produto.id.label("produto_id"), Produto.nome, Produto.descricao, Produto.preco,
+        db.literal(0.0).label("relevancia"), saldo.label("saldo"),
+    ).outerjoin(
+        SaldoProduto, SaldoProduto.produto_id == Produto.id)
+    for termo in termos:
+        padrao = f"%{termo}%"
+        consulta = consulta.filter(db.or_(Produto.nome.ilike(padrao), Produto.descricao.ilike(padrao)))
+    if apos is not None:
+        consulta = consulta.filter(Produto.id > apos[1])
+    return consulta.order_by(Produto.id).limit(limite + 1).all()
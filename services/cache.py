@@ -0,0 +1,212 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """Cache local em memória, limitado por quantidade de entradas e com TTL.
+
+    Ao atingir o tamanho máximo, a entrada usada há mais tempo é descartada.
+    É seguro para uso entre threads, mas não é compartilhado entre processos.
+    """
+
+    def __init__(self, tamanho_maximo=1024, ttl=60.0):
+        self.tamanho_maximo = tamanho_maximo
+        self.ttl = ttl
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self._acertos = 0
+        self._falhas = 0
+        self._despejos = 0
+        self._expiracoes = 0
+
+    def obter(self, chave):
+        with self._lock:
+            return self._obter(chave, time.monotonic())
+
+    def obter_varios(self, chaves):
+        """Retorna um dicionário apenas com as chaves encontradas no cache."""
+        agora = time.monotonic()
+        encontrados = {}
+        with self._lock:
+            for chave in chaves:
+                valor = self._obter(chave, agora)
+                if valor is not None:
+                    encontrados[chave] = valor
+        return encontrados
+
+    def definir(self, chave, valor):
+        with self._lock:
+            self._entradas[chave] = (time.monotonic() + self.ttl, valor)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.tamanho_maximo:
+                self._entradas.popitem(last=False)
+                self._despejos += 1
+
+    def remover(self, chave):
+        with self._lock:
+            self._entradas.pop(chave, None)
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                "backend": "local",
+                "tamanho": len(self._entradas),
+                "tamanho_maximo": self.tamanho_maximo,
+                "ttl": self.ttl,
+                "acertos": self._acertos,
+                "falhas": self._falhas,
+                "despejos": self._despejos,
+                "expiracoes": self._expiracoes,
+            }
+
+    def _obter(self, chave, agora):
+        entrada = self._entradas.get(chave)
+        if entrada is None:
+            self._falhas += 1
+            return None
+
+        expira_em, valor = entrada
+        if expira_em <= agora:
+            del self._entradas[chave]
+            self._expiracoes += 1
+            self._falhas += 1
+            return None
+
+        self._entradas.move_to_end(chave)
+        self._acertos += 1
+        return valor
+
+
+class CacheCompartilhado:
+    """Cache sobre um servidor compartilhado entre processos (ex.: Redis).
+
+    O cliente precisa oferecer get, mget, set(ex=) e delete, como o cliente
+    do Redis. Os valores são armazenados em JSON. Tamanho máximo e despejos
+    ficam a cargo do servidor.
+    """
+
+    def __init__(self, cliente, ttl=60.0, prefixo="vestsoft:", backend="compartilhado"):
+        self.cliente = cliente
+        self.ttl = ttl
+        self.prefixo = prefixo
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._acertos = 0
+        self._falhas = 0
+
+    def obter(self, chave):
+        bruto = self.cliente.get(self.prefixo + chave)
+        self._contabilizar(1 if bruto is not None else 0, 1)
+        return json.loads(bruto) if bruto is not None else None
+
+    def obter_varios(self, chaves):
+        chaves = list(chaves)
+        if not chaves:
+            return {}
+        brutos = self.cliente.mget([self.prefixo + chave for chave in chaves])
+        encontrados = {chave: json.loads(bruto) for chave, bruto in zip(chaves, brutos) if bruto is not None}
+        self._contabilizar(len(encontrados), len(chaves))
+        return encontrados
+
+    def definir(self, chave, valor):
+        self.cliente.set(self.prefixo + chave, json.dumps(valor), ex=max(1, int(self.ttl)))
+
+    def remover(self, chave):
+        self.cliente.delete(self.prefixo + chave)
+
+    def limpar(self):
+        # Remove apenas as chaves desta aplicação
+        chaves = list(self.cliente.scan_iter(self.prefixo + "*"))
+        if chaves:
+            self.cliente.delete(*chaves)
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "tamanho": None,
+                "tamanho_maximo": None,
+                "ttl": self.ttl,
+                "acertos": self._acertos,
+                "falhas": self._falhas,
+                "despejos": None,
+                "expiracoes": None,
+            }
+
+    def _contabilizar(self, acertos, consultas):
+        with self._lock:
+            self._acertos += acertos
+            self._falhas += consultas - acertos
+
+
+class ClienteCacheMemoria:
+    """Substituto local do cliente Redis, para desenvolvimento e testes.
+
+    Implementa o subconjunto usado por CacheCompartilhado (get, mget, set com
+    ex, delete e scan_iter), guardando os valores em um dicionário.
+    """
+
+    def __init__(self):
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def get(self, nome):
+        with self._lock:
+            return self._get(nome, time.monotonic())
+
+    def mget(self, nomes):
+        agora = time.monotonic()
+        with self._lock:
+            return [self._get(nome, agora) for nome in nomes]
+
+    def set(self, nome, valor, ex=None):
+        with self._lock:
+            self._valores[nome] = (time.monotonic() + ex if ex else None, valor)
+
+    def delete(self, *nomes):
+        with self._lock:
+            return sum(1 for nome in nomes if self._valores.pop(nome, None) is not None)
+
+    def scan_iter(self, padrao="*"):
+        prefixo = padrao.rstrip("*")
+        with self._lock:
+            return [nome for nome in self._valores if nome.startswith(prefixo)]
+
+    def _get(self, nome, agora):
+        entrada = self._valores.get(nome)
+        if entrada is None:
+            return None
+        expira_em, valor = entrada
+        if expira_em is not None and expira_em <= agora:
+            del self._valores[nome]
+            return None
+        return valor
+
+
+def criar_cache(url=None, tamanho_maximo=1024, ttl=60.0):
+    """Cria o cache conforme a URL configurada.
+
+    Sem URL usa o CacheLRU local; "memoria://" usa o CacheCompartilhado com o
+    substituto em memória; "redis://..." usa o servidor Redis (requer o
+    pacote redis instalado).
+    """
+    if not url:
+        return CacheLRU(tamanho_maximo=tamanho_maximo, ttl=ttl)
+
+    if url.startswith("memoria://"):
+        return CacheCompartilhado(ClienteCacheMemoria(), ttl=ttl, backend="memoria")
+
+    if url.startswith(("redis://", "rediss://")):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("O cache compartilhado requer o pacote redis (pip install redis).") from e
+        return CacheCompartilhado(redis.Redis.from_url(url), ttl=ttl, backend="redis")
+
+    raise ValueError(f"URL de cache não suportada: {url}")
@@ -0,0 +1,85 @@
+from database import db
+from models.contador import Contador
+from models.estoque import Estoque
+from models.produto import Produto
+from models.vendaItem import VendaItem
+from services.arquivo import totais_arquivados
+
+# Nomes dos contadores mantidos na tabela contador
+VALOR_TOTAL_VENDAS = "valor_total_vendas"
+TOTAL_PRODUTOS = "total_produtos"
+TOTAL_ENTRADAS_ESTOQUE = "total_entradas_estoque"
+TOTAL_SAIDAS_ESTOQUE = "total_saidas_estoque"
+
+# Versões das listagens, incrementadas a cada escrita que altera o seu conteúdo (ETag)
+VERSAO_PRODUTOS = "versao_produtos"
+VERSAO_ESTOQUES = "versao_estoques"
+
+
+def incrementar_contador(session, nome, delta):
+    """Soma delta ao contador na transação corrente, criando-o se necessário."""
+    if not delta:
+        return
+
+    atualizados = session.query(Contador).filter(Contador.nome == nome).update(
+        {Contador.valor: Contador.valor + delta}, synchronize_session=False
+    )
+    if not atualizados:
+        session.add(Contador(nome=nome, valor=delta))
+        session.flush()
+
+
+def ler_contador(session, nome):
+    """Retorna o valor de um contador (0 se ainda não existir)."""
+    return session.query(Contador.valor).filter(Contador.nome == nome).scalar() or 0
+
+
+def ler_contadores(session):
+    """Retorna todos os contadores em um dicionário nome -> valor (uma consulta)."""
+    return dict(session.query(Contador.nome, Contador.valor).all())
+
+
+def calcular_contadores(session):
+    """Calcula os contadores a partir das tabelas de origem (varredura completa).
+
+    As vendas já arquivadas entram pelos totais de venda_arquivada_produto.
+    """
+    arquivados = totais_arquivados(session).values()
+    return {
+        VALOR_TOTAL_VENDAS: (session.query(
+            db.func.sum(VendaItem.quantidade * VendaItem.preco)
+        ).scalar() or 0.0) + sum(receita for _, receita in arquivados),
+        TOTAL_PRODUTOS: session.query(db.func.count(Produto.id)).scalar() or 0,
+        TOTAL_ENTRADAS_ESTOQUE: session.query(db.func.sum(Estoque.quantidade)).scalar() or 0,
+        TOTAL_SAIDAS_ESTOQUE: (session.query(db.func.sum(VendaItem.quantidade)).scalar() or 0)
+        + sum(quantidade for quantidade, _ in arquivados),
+    }
+
+
+def reconciliar_contadores(session, corrigir=True):
+    """Compara os contadores mantidos com os valores calculados.
+
+    Retorna a lista de divergências (nome, valor_mantido, valor_calculado).
+    Com corrigir=True os contadores divergentes são sobrescritos.
+    """
+    atuais = {contador.nome: contador for contador in session.query(Contador).all()}
+
+    divergencias = []
+    for nome, calculado in calcular_contadores(session).items():
+        atual = atuais.get(nome)
+        # Contador ainda não criado equivale a 0 (incrementar_contador só cria a linha no primeiro delta).
+        # Tolerância para o arredondamento acumulado nas somas de preço
+        if abs((atual.valor if atual else 0) - calculado) < 1e-6:
+            continue
+
+        divergencias.append((nome, atual.valor if atual else None, calculado))
+        if corrigir:
+            if atual:
+                atual.valor = calculado
+            else:
+                session.add(Contador(nome=nome, valor=calculado))
+
+    if corrigir:
+        session.commit()
+
+    return divergencias
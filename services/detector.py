@@ -0,0 +1,140 @@
+import logging
+import os
+import re
+import time
+import traceback
+from collections import Counter, deque
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+RAIZ_PROJETO = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+_LITERAIS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LISTAS_IN = re.compile(r"IN\s*\((?:\s*(?:\?|%\(\w+\)s|:\w+)\s*,?)+\)", re.IGNORECASE)
+_ESPACOS = re.compile(r"\s+")
+
+
+class ProblemaDesempenhoError(Exception):
+    """Lançada no modo "erro" quando uma requisição viola os limites do detector."""
+
+
+def normalizar_sql(statement):
+    """Normaliza o SQL para agrupar comandos que só diferem nos valores."""
+    normalizado = _LITERAIS.sub("?", statement)
+    normalizado = _LISTAS_IN.sub("IN (...)", normalizado)
+    return _ESPACOS.sub(" ", normalizado).strip()
+
+
+def pilha_do_projeto():
+    """Trecho da pilha atual restrito aos arquivos do projeto."""
+    quadros = [
+        quadro for quadro in traceback.extract_stack()[:-2]
+        if quadro.filename.startswith(RAIZ_PROJETO)
+        and "site-packages" not in quadro.filename
+        and not quadro.filename.endswith(os.path.join("services", "detector.py"))
+    ]
+    return "".join(traceback.format_list(quadros))
+
+
+class DetectorDesempenho:
+    """Detecta N+1 (o mesmo SQL normalizado repetido) e comandos lentos por requisição.
+
+    No modo "log" os problemas são apenas registrados no log; no modo "erro"
+    a requisição também falha com ProblemaDesempenhoError, para quebrar testes
+    e benchmarks. Os problemas encontrados ficam em self.problemas, que guarda
+    apenas os `max_problemas` mais recentes.
+    """
+
+    def __init__(self, limite_repeticoes=10, orcamento_ms=100.0, modo="log", max_problemas=1000):
+        self.limite_repeticoes = limite_repeticoes
+        self.orcamento_ms = orcamento_ms
+        self.modo = modo
+        self.problemas = deque(maxlen=max_problemas)
+
+    def instrumentar(self, app, engines):
+        @app.before_request
+        def _iniciar():
+            g.detector_comandos = Counter()
+            g.detector_pilhas = {}
+            g.detector_lentos = []
+
+        @app.after_request
+        def _avaliar(resposta):
+            problemas = self._avaliar_requisicao()
+            if problemas and self.modo == "erro":
+                raise ProblemaDesempenhoError("; ".join(problema["descricao"] for problema in problemas))
+            return resposta
+
+        for engine in engines:
+            @event.listens_for(engine, "before_cursor_execute")
+            def _antes(conexao, cursor, statement, parameters, context, executemany):
+                conexao.info.setdefault("detector_inicio", []).append(time.perf_counter())
+
+            @event.listens_for(engine, "after_cursor_execute")
+            def _depois(conexao, cursor, statement, parameters, context, executemany):
+                duracao_ms = (time.perf_counter() - conexao.info["detector_inicio"].pop()) * 1000
+                if not has_request_context() or "detector_comandos" not in g:
+                    return
+
+                normalizado = normalizar_sql(statement)
+                g.detector_comandos[normalizado] += 1
+                # A pilha é capturada apenas quando o limite é ultrapassado pela primeira vez
+                if g.detector_comandos[normalizado] == self.limite_repeticoes + 1:
+                    g.detector_pilhas[normalizado] = pilha_do_projeto()
+                if duracao_ms > self.orcamento_ms:
+                    g.detector_lentos.append((normalizado, duracao_ms, pilha_do_projeto()))
+
+    def _avaliar_requisicao(self):
+        if "detector_comandos" not in g:
+            return []
+
+        rota = f"{request.method} {request.url_rule.rule if request.url_rule else request.path}"
+        problemas = []
+        for normalizado, quantidade in g.detector_comandos.items():
+            if quantidade > self.limite_repeticoes:
+                problemas.append({
+                    "tipo": "n+1",
+                    "rota": rota,
+                    "sql": normalizado,
+                    "descricao": f"{rota}: SQL repetido {quantidade}x (limite {self.limite_repeticoes}): {normalizado}",
+                    "pilha": g.detector_pilhas.get(normalizado, ""),
+                })
+        for normalizado, duracao_ms, pilha in g.detector_lentos:
+            problemas.append({
+                "tipo": "lento",
+                "rota": rota,
+                "sql": normalizado,
+                "descricao": f"{rota}: SQL levou {duracao_ms:.1f}ms (orçamento {self.orcamento_ms}ms): {normalizado}",
+                "pilha": pilha,
+            })
+
+        for problema in problemas:
+            logger.warning("Problema de desempenho em %s\n%s", problema["descricao"], problema["pilha"])
+        self.problemas.extend(problemas)
+        return problemas
+
+
+def configurar_detector(app, db):
+    """Habilita o detector com DETECTOR_DESEMPENHO=log ou DETECTOR_DESEMPENHO=erro.
+
+    Os limites vêm de DETECTOR_LIMITE_REPETICOES e DETECTOR_ORCAMENTO_MS; a
+    quantidade de problemas mantidos em memória, de DETECTOR_MAX_PROBLEMAS.
+    Destinado a desenvolvimento e integração contínua; desabilitado por padrão.
+    """
+    modo = os.getenv("DETECTOR_DESEMPENHO", "").lower()
+    if modo not in ("log", "erro"):
+        return None
+
+    detector = DetectorDesempenho(
+        limite_repeticoes=int(os.getenv("DETECTOR_LIMITE_REPETICOES", "10")),
+        orcamento_ms=float(os.getenv("DETECTOR_ORCAMENTO_MS", "100")),
+        modo=modo,
+        max_problemas=int(os.getenv("DETECTOR_MAX_PROBLEMAS", "1000")),
+    )
+    with app.app_context():
+        detector.instrumentar(app, db.engines.values())
+    app.extensions["detector_desempenho"] = detector
+    return detector
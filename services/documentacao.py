@@ -0,0 +1,94 @@
+import json
+import logging
+import os
+import sys
+import threading
+from importlib import import_module
+
+from flask import Blueprint, Flask, Response, render_template_string, request
+from flask_openapi3 import OpenAPI
+from flask_openapi3.templates import openapi_html_string
+
+if sys.version_info >= (3, 10):
+    from importlib.metadata import entry_points
+else:  # pragma: no cover
+    from importlib_metadata import entry_points  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+
+class API(OpenAPI):
+    """OpenAPI com especificação pré-gerada e documentação carregada sob demanda.
+
+    - docs=False não registra /openapi nem coleta a especificação das rotas.
+    - Com arquivo_spec (gerado no build por `flask openapi -o openapi.json`),
+      a especificação é lida do arquivo e as rotas deixam de ser
+      inspecionadas na importação.
+    - As interfaces (Swagger, Redoc, ...) só são importadas e registradas no
+      primeiro acesso a /openapi.
+    """
+
+    def __init__(self, import_name, docs=True, arquivo_spec=None, **kwargs):
+        self.docs = docs
+        self._app_docs = None
+        self._lock_docs = threading.Lock()
+        super().__init__(import_name, doc_ui=docs, **kwargs)
+
+        if docs and arquivo_spec:
+            if os.path.exists(arquivo_spec):
+                with open(arquivo_spec, encoding="utf-8") as arquivo:
+                    self.spec_json = json.load(arquivo)
+            else:
+                logger.warning("Especificação OpenAPI %s não encontrada; será gerada a partir das rotas.",
+                               arquivo_spec)
+
+    def _collect_openapi_info(self, rule, func, **kwargs):
+        # Sem documentação, ou com a especificação já carregada, só os parâmetros de validação importam
+        if not self.docs or self.spec_json:
+            kwargs["doc_ui"] = False
+        return super()._collect_openapi_info(rule, func, **kwargs)
+
+    def _init_doc(self):
+        """Registra apenas um encaminhamento de /openapi para a aplicação de documentação."""
+        blueprint = Blueprint("openapi", __name__, url_prefix=self.doc_prefix)
+        blueprint.add_url_rule(self.doc_url, "doc_url", lambda: self.api_doc)
+        blueprint.add_url_rule("/", "openapi", self._encaminhar_docs)
+        blueprint.add_url_rule("/<path:caminho>", "interfaces", self._encaminhar_docs)
+        self.register_blueprint(blueprint)
+
+    def _encaminhar_docs(self, caminho=None):
+        return Response.from_app(self._carregar_app_docs(), request.environ)
+
+    def _carregar_app_docs(self):
+        """Monta, no primeiro acesso, uma aplicação com as interfaces instaladas."""
+        with self._lock_docs:
+            if self._app_docs is None:
+                self._app_docs = criar_app_docs(self)
+        return self._app_docs
+
+
+def criar_app_docs(api):
+    """Aplicação Flask com a página inicial e os plugins de interface do flask-openapi3."""
+    app_docs = Flask(__name__)
+    app_docs.config.update(api.config)
+
+    interfaces = []
+    for entry_point in entry_points(group="flask_openapi3.plugins"):
+        try:
+            # Os plugins declaram "modulo.Classe" (e não "modulo:Classe") no entry point
+            nome_modulo, nome_classe = entry_point.value.rsplit(".", 1)
+            plugin = getattr(import_module(nome_modulo), nome_classe)
+            app_docs.register_blueprint(plugin.register(doc_url=api.doc_url.lstrip("/")), url_prefix=api.doc_prefix)
+            interfaces.append({"name": plugin.name, "display_name": plugin.display_name})
+        except (ModuleNotFoundError, AttributeError):
+            logger.exception("Falha ao registrar o plugin de documentação %s.", entry_point.value)
+
+    app_docs.add_url_rule(f"{api.doc_prefix}/", "openapi", lambda: render_template_string(
+        app_docs.config.get("OPENAPI_HTML_STRING") or openapi_html_string, ui_templates=interfaces))
+    return app_docs
+
+
+def configuracao_docs():
+    """Lê OPENAPI_DOCS e OPENAPI_ARQUIVO (argumentos docs e arquivo_spec de API)."""
+    docs = os.getenv("OPENAPI_DOCS", "1").lower() in ("1", "true", "sim")
+    return {"docs": docs, "arquivo_spec": os.getenv("OPENAPI_ARQUIVO") or None}
@@ -0,0 +1,162 @@
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from services.venda import registrar_vendas_em_lote
+
+logger = logging.getLogger(__name__)
+
+
+class TempoEsgotadoError(TimeoutError):
+    """O prazo esgotou com a venda ainda na fila: ela foi retirada e não será gravada."""
+
+
+class ResultadoDesconhecidoError(TimeoutError):
+    """O prazo esgotou com o grupo da venda já em gravação: ela pode ou não ter sido registrada."""
+
+
+class PedidoVenda:
+    """Venda aguardando gravação na fila; a thread da requisição espera o resultado.
+
+    O pedido sai da fila de uma única forma: cancelado pela requisição (prazo
+    esgotado) ou tomado pela thread escritora para gravação, nunca ambos.
+    """
+
+    def __init__(self, venda):
+        self.venda = venda
+        self.resultado = None
+        self.data = None
+        self._concluido = threading.Event()
+        self._lock = threading.Lock()
+        self._estado = "pendente"
+
+    def cancelar(self):
+        """Retira o pedido da fila se ele ainda não foi tomado para gravação."""
+        with self._lock:
+            if self._estado == "pendente":
+                self._estado = "cancelado"
+            return self._estado == "cancelado"
+
+    def iniciar_gravacao(self):
+        """Marca o pedido como em gravação, a menos que já tenha sido cancelado."""
+        with self._lock:
+            if self._estado == "pendente":
+                self._estado = "gravando"
+            return self._estado == "gravando"
+
+    def concluir(self, resultado, data):
+        self.resultado = resultado
+        self.data = data
+        self._concluido.set()
+
+    def aguardar(self, timeout):
+        return self._concluido.wait(timeout)
+
+
+class FilaEscritaVendas:
+    """Agrupa as vendas de requisições concorrentes em commits coletivos.
+
+    Cada requisição coloca a venda na fila e aguarda. Uma thread escritora
+    retira até tamanho_grupo vendas, esperando no máximo espera_ms pela
+    chegada de mais vendas depois da primeira, e grava o grupo em uma única
+    transação com registrar_vendas_em_lote. Cada requisição recebe o seu
+    próprio resultado, inclusive a rejeição por código duplicado.
+
+    Se o prazo (timeout) esgotar, a venda ainda na fila é cancelada
+    (TempoEsgotadoError: pode ser reenviada); se o seu grupo já estiver em
+    gravação, o resultado é desconhecido (ResultadoDesconhecidoError) e deve
+    ser conferido pelo código da venda.
+    """
+
+    def __init__(self, app, db, tamanho_grupo=50, espera_ms=5.0, timeout=30.0, validar_estoque=False):
+        self.app = app
+        self.db = db
+        self.validar_estoque = validar_estoque
+        self.tamanho_grupo = tamanho_grupo
+        self.espera = espera_ms / 1000
+        self.timeout = timeout
+        self._fila = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def registrar(self, venda):
+        """Enfileira a venda e bloqueia até o commit do grupo em que ela entrou."""
+        self._garantir_escritor()
+        pedido = PedidoVenda(venda)
+        self._fila.put(pedido)
+        if not pedido.aguardar(self.timeout):
+            if pedido.cancelar():
+                raise TempoEsgotadoError("Tempo esgotado aguardando a gravação da venda; ela não foi registrada.")
+            # A gravação pode ter terminado entre o fim da espera e o cancelamento
+            if not pedido.aguardar(0):
+                raise ResultadoDesconhecidoError(
+                    "Tempo esgotado durante a gravação da venda; consulte-a pelo código antes de reenviá-la.")
+        return pedido
+
+    def _garantir_escritor(self):
+        # A thread é criada no primeiro uso de cada processo (threads não sobrevivem ao fork)
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid != os.getpid() or not self._thread.is_alive():
+                self._fila = queue.Queue()
+                self._thread = threading.Thread(target=self._executar, name="fila-vendas", daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def _executar(self):
+        while True:
+            grupo = [self._fila.get()]
+            limite = time.monotonic() + self.espera
+            while len(grupo) < self.tamanho_grupo:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    grupo.append(self._fila.get(timeout=restante))
+                except queue.Empty:
+                    break
+            # Pedidos cancelados por prazo esgotado não são gravados
+            grupo = [pedido for pedido in grupo if pedido.iniciar_gravacao()]
+            if grupo:
+                self._gravar(grupo)
+
+    def _gravar(self, grupo):
+        data = datetime.utcnow()
+        with self.app.app_context():
+            session = self.db.session
+            try:
+                resultados = registrar_vendas_em_lote(session, [pedido.venda for pedido in grupo], data,
+                                                      tamanho_lote=len(grupo),
+                                                      validar_estoque=self.validar_estoque)
+            except Exception as e:
+                session.rollback()
+                logger.exception("Erro ao gravar o grupo de vendas:")
+                resultados = [{"codigo": pedido.venda.codigo, "sucesso": False, "id": None,
+                               "mensagem": f"Erro ao registrar a venda: {e}"} for pedido in grupo]
+            finally:
+                self.db.session.remove()
+
+        for pedido, resultado in zip(grupo, resultados):
+            pedido.concluir(resultado, data)
+
+
+def configurar_fila_vendas(app, db, validar_estoque=False):
+    """Habilita o commit em grupo de POST /vendas com VENDAS_COMMIT_EM_GRUPO=1.
+
+    O tamanho máximo do grupo e a espera vêm de VENDAS_GRUPO_TAMANHO e
+    VENDAS_GRUPO_ESPERA_MS.
+    """
+    if os.getenv("VENDAS_COMMIT_EM_GRUPO", "0").lower() not in ("1", "true", "sim"):
+        return None
+
+    return FilaEscritaVendas(
+        app, db,
+        tamanho_grupo=int(os.getenv("VENDAS_GRUPO_TAMANHO", "50")),
+        espera_ms=float(os.getenv("VENDAS_GRUPO_ESPERA_MS", "5")),
+        validar_estoque=validar_estoque,
+    )
@@ -0,0 +1,122 @@
+import csv
+import time
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from models.estoque import Estoque
+from models.produto import Produto
+from services.contadores import VERSAO_ESTOQUES, incrementar_contador
+from services.saldo import ajustar_saldos
+from services.saldo_historico import invalidar_checkpoints
+
+COLUNAS_ESTOQUE = ("produto_id", "quantidade", "data_entrada", "numero_nota_fiscal")
+
+# Limite de linhas rejeitadas detalhadas no relatório (o total é sempre informado)
+MAX_REJEICOES_DETALHADAS = 100
+
+
+def importar_estoques_csv(session, arquivo, tamanho_lote=500):
+    """Importa entradas de estoque de um CSV lido em streaming.
+
+    O arquivo (objeto texto) é lido linha a linha e processado em blocos de
+    tamanho_lote linhas: cada bloco valida os produtos com uma única consulta,
+    grava as entradas com um INSERT em massa, ajusta os saldos e faz commit.
+    O uso de memória independe do tamanho do arquivo.
+
+    Retorna um relatório com as linhas importadas, as rejeitadas e a vazão.
+    """
+    inicio = time.perf_counter()
+    relatorio = {"importadas": 0, "rejeitadas": 0, "rejeicoes": []}
+
+    leitor = csv.DictReader(arquivo)
+    faltantes = [coluna for coluna in COLUNAS_ESTOQUE if coluna not in (leitor.fieldnames or [])]
+    if faltantes:
+        raise ValueError(f"Colunas obrigatórias ausentes no CSV: {', '.join(faltantes)}.")
+
+    bloco = []
+    # A linha 1 é o cabeçalho
+    for numero_linha, linha in enumerate(leitor, start=2):
+        bloco.append((numero_linha, linha))
+        if len(bloco) >= tamanho_lote:
+            _importar_bloco(session, bloco, relatorio)
+            bloco = []
+    if bloco:
+        _importar_bloco(session, bloco, relatorio)
+
+    relatorio["rejeicoes"].sort(key=lambda rejeicao: rejeicao["linha"])
+    duracao = time.perf_counter() - inicio
+    relatorio["duracao_segundos"] = round(duracao, 3)
+    relatorio["linhas_por_segundo"] = round(relatorio["importadas"] / duracao, 1) if duracao else 0.0
+    return relatorio
+
+
+def _importar_bloco(session, bloco, relatorio):
+    """Valida e grava um bloco de linhas do CSV em uma única transação."""
+    validas = []
+    for numero_linha, linha in bloco:
+        try:
+            validas.append((numero_linha, _converter_linha(linha)))
+        except ValueError as e:
+            _rejeitar(relatorio, numero_linha, str(e))
+
+    produtos = {estoque["produto_id"] for _, estoque in validas}
+    existentes = {produto_id for (produto_id,) in session.query(Produto.id).filter(Produto.id.in_(produtos))}
+
+    estoques, entradas = [], Counter()
+    for numero_linha, estoque in validas:
+        if estoque["produto_id"] not in existentes:
+            _rejeitar(relatorio, numero_linha, f"Produto com ID {estoque['produto_id']} não encontrado.")
+            continue
+        estoques.append(estoque)
+        entradas[estoque["produto_id"]] += estoque["quantidade"]
+
+    if not estoques:
+        return
+
+    ajustar_saldos(session, entradas=entradas)
+    session.execute(insert(Estoque), estoques)
+    # .date(): o CSV pode misturar datas com e sem fuso horário, que não se comparam
+    invalidar_checkpoints(session, min(estoque["data_entrada"].date() for estoque in estoques), entradas)
+    incrementar_contador(session, VERSAO_ESTOQUES, 1)
+    session.commit()
+
+    relatorio["importadas"] += len(estoques)
+
+
+def _converter_linha(linha):
+    """Converte uma linha do CSV nas colunas de Estoque, lançando ValueError se inválida."""
+    try:
+        produto_id = int(linha["produto_id"])
+        quantidade = int(linha["quantidade"])
+    except (TypeError, ValueError):
+        raise ValueError("produto_id e quantidade devem ser números inteiros.")
+
+    if quantidade <= 0:
+        raise ValueError("quantidade deve ser maior que zero.")
+
+    data_entrada = (linha["data_entrada"] or "").strip()
+    try:
+        data_entrada = datetime.fromisoformat(data_entrada) if data_entrada else datetime.utcnow()
+    except ValueError:
+        raise ValueError(f"data_entrada inválida: {data_entrada}.")
+
+    numero_nota_fiscal = (linha["numero_nota_fiscal"] or "").strip()
+    if not numero_nota_fiscal:
+        raise ValueError("numero_nota_fiscal é obrigatório.")
+    if len(numero_nota_fiscal) > 50:
+        raise ValueError("numero_nota_fiscal deve ter no máximo 50 caracteres.")
+
+    return {
+        "produto_id": produto_id,
+        "quantidade": quantidade,
+        "data_entrada": data_entrada,
+        "numero_nota_fiscal": numero_nota_fiscal,
+    }
+
+
+def _rejeitar(relatorio, numero_linha, motivo):
+    relatorio["rejeitadas"] += 1
+    if len(relatorio["rejeicoes"]) < MAX_REJEICOES_DETALHADAS:
+        relatorio["rejeicoes"].append({"linha": numero_linha, "motivo": motivo})
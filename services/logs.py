@@ -0,0 +1,154 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, has_request_context, request
+
+# Atributos padrão de um LogRecord; o restante (extra=...) vai para o JSON
+ATRIBUTOS_PADRAO = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+CABECALHO_REQUEST_ID = "X-Request-ID"
+
+
+class FormatadorJSON(logging.Formatter):
+    """Formata cada registro como uma linha JSON."""
+
+    def format(self, record):
+        dados = {
+            "momento": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensagem": record.getMessage(),
+        }
+        for chave, valor in vars(record).items():
+            if chave not in ATRIBUTOS_PADRAO and not (chave == "request_id" and valor is None):
+                dados[chave] = valor
+        if record.exc_info:
+            dados["excecao"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            dados["excecao"] = record.exc_text
+        if record.stack_info:
+            dados["pilha"] = self.formatStack(record.stack_info)
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+class FiltroRequisicao(logging.Filter):
+    """Anexa o id da requisição ao registro, ainda na thread que atende a requisição."""
+
+    def filter(self, record):
+        if not hasattr(record, "request_id"):
+            record.request_id = g.get("request_id") if has_request_context() else None
+        return True
+
+
+class HandlerFila(QueueHandler):
+    """QueueHandler que não formata nem bloqueia a thread da requisição.
+
+    Apenas a mensagem é montada (msg % args) antes de enfileirar; a formatação
+    JSON, o traceback das exceções e a escrita ficam com a thread do listener.
+    Com a fila cheia o registro é descartado e contado, em vez de bloquear.
+    """
+
+    def __init__(self, fila):
+        super().__init__(fila)
+        self.descartados = 0
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+
+
+class Logs:
+    """Fila de registros e a thread (QueueListener) que os escreve."""
+
+    def __init__(self, nivel, formatador, tamanho_fila):
+        self.tamanho_fila = tamanho_fila
+        self.destino = logging.StreamHandler(sys.stderr)
+        self.destino.setFormatter(formatador)
+        self.handler = HandlerFila(queue.Queue(tamanho_fila))
+        self.handler.addFilter(FiltroRequisicao())
+        self.listener = None
+
+        raiz = logging.getLogger()
+        for handler in list(raiz.handlers):
+            raiz.removeHandler(handler)
+        raiz.addHandler(self.handler)
+        raiz.setLevel(nivel)
+
+    def iniciar(self):
+        self.listener = QueueListener(self.handler.queue, self.destino, respect_handler_level=True)
+        self.listener.start()
+
+    def parar(self):
+        """Escreve os registros pendentes e encerra a thread do listener."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def apos_fork(self):
+        """Recria a fila e a thread no processo filho (threads não sobrevivem ao fork)."""
+        self.listener = None
+        self.handler.queue = queue.Queue(self.tamanho_fila)
+        self.iniciar()
+
+
+def configurar_logs(app):
+    """Configura o log estruturado, escrito fora da thread da requisição.
+
+    LOG_LEVEL define o nível (padrão INFO), LOG_FORMATO json (padrão) ou texto,
+    LOG_SQL=1 registra cada comando SQL e LOG_FILA_TAMANHO limita os registros
+    pendentes. Cada requisição recebe um id (do cabeçalho X-Request-ID ou
+    gerado), devolvido na resposta e presente em todos os seus registros, e é
+    registrada com método, rota, status e duração.
+    """
+    nivel = os.getenv("LOG_LEVEL", "INFO").upper()
+    if os.getenv("LOG_FORMATO", "json").lower() == "texto":
+        formatador = logging.Formatter("%(asctime)s %(levelname)s [%(name)s] [%(request_id)s] %(message)s")
+    else:
+        formatador = FormatadorJSON()
+
+    logs = Logs(nivel, formatador, int(os.getenv("LOG_FILA_TAMANHO", "10000")))
+    logs.iniciar()
+    atexit.register(logs.parar)
+
+    # Com a raiz em INFO/DEBUG o SQLAlchemy registraria cada comando executado
+    sql = os.getenv("LOG_SQL", "0").lower() in ("1", "true", "sim")
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO if sql else logging.WARNING)
+
+    logger = logging.getLogger("requisicao")
+
+    @app.before_request
+    def iniciar_requisicao():
+        g.request_id = request.headers.get(CABECALHO_REQUEST_ID) or uuid.uuid4().hex
+        g.inicio_requisicao = time.perf_counter()
+
+    @app.after_request
+    def registrar_requisicao(response):
+        inicio = g.pop("inicio_requisicao", None)
+        if inicio is not None:
+            response.headers[CABECALHO_REQUEST_ID] = g.request_id
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("%s %s %s", request.method, request.path, response.status_code, extra={
+                    "metodo": request.method,
+                    "rota": request.url_rule.rule if request.url_rule else request.path,
+                    "status": response.status_code,
+                    "duracao_ms": round((time.perf_counter() - inicio) * 1000, 3),
+                })
+        return response
+
+    app.extensions["logs"] = logs
+    return logs
@@ -0,0 +1,254 @@
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+
+# Limites (segundos) dos buckets do histograma de latência
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE_PROMETHEUS = "text/plain; version=0.0.4; charset=utf-8"
+
+# Arquivos do modo multiprocesso (METRICAS_DIRETORIO): um por worker e um com os workers encerrados
+ARQUIVO_PROCESSO = "metricas_{pid}.json"
+ARQUIVO_ENCERRADOS = "metricas_encerrados.json"
+
+
+class RegistroMetricas:
+    """Acumula as métricas por rota (método + regra da URL) entre threads.
+
+    Com `diretorio`, cada processo grava o seu acumulado em um arquivo desse
+    diretório (por uma thread, a cada `intervalo_gravacao` segundos com
+    alterações, e ao encerrar) e exportar() soma os arquivos de todos os
+    processos: com vários workers do gunicorn, /metrics não depende de qual
+    worker atendeu a coleta.
+    """
+
+    def __init__(self, buckets=BUCKETS_LATENCIA, diretorio=None, intervalo_gravacao=1.0):
+        self.buckets = buckets
+        self.diretorio = diretorio
+        self.intervalo_gravacao = intervalo_gravacao
+        self._rotas = {}
+        self._lock = threading.Lock()
+        self._lock_gravacao = threading.Lock()
+        self._alterado = False
+        # Threads não sobrevivem ao fork: a gravadora é iniciada em cada processo
+        self._pid_gravadora = None
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+            atexit.register(self.gravar)
+
+    def registrar(self, metodo, rota, status, duracao, comandos_sql, duracao_sql):
+        chave = (metodo, rota)
+        with self._lock:
+            metricas = self._rotas.get(chave)
+            if metricas is None:
+                metricas = self._rotas[chave] = {
+                    "buckets": [0] * len(self.buckets),
+                    "contagem": 0,
+                    "soma": 0.0,
+                    "erros": 0,
+                    "comandos_sql": 0,
+                    "duracao_sql": 0.0,
+                }
+            indice = bisect_left(self.buckets, duracao)
+            if indice < len(self.buckets):
+                metricas["buckets"][indice] += 1
+            metricas["contagem"] += 1
+            metricas["soma"] += duracao
+            metricas["erros"] += 1 if status >= 500 else 0
+            metricas["comandos_sql"] += comandos_sql
+            metricas["duracao_sql"] += duracao_sql
+            self._alterado = True
+            if self.diretorio and self._pid_gravadora != os.getpid():
+                self._pid_gravadora = os.getpid()
+                threading.Thread(target=self._gravar_periodicamente, name="metricas-gravadora",
+                                 daemon=True).start()
+
+    def _gravar_periodicamente(self):
+        while True:
+            time.sleep(self.intervalo_gravacao)
+            if self._alterado:
+                self.gravar()
+
+    def gravar(self):
+        """Grava o acumulado deste processo no diretório compartilhado (troca atômica do arquivo)."""
+        if not self.diretorio:
+            return
+        with self._lock:
+            rotas = self._copiar_rotas()
+            self._alterado = False
+        if not rotas:
+            return
+        caminho = os.path.join(self.diretorio, ARQUIVO_PROCESSO.format(pid=os.getpid()))
+        with self._lock_gravacao:
+            _gravar_arquivo(caminho, rotas)
+
+    def exportar(self):
+        """Gera as métricas no formato texto de exposição do Prometheus."""
+        if self.diretorio:
+            self.gravar()
+            rotas = {}
+            with _lock_diretorio(self.diretorio):
+                for caminho in glob.glob(os.path.join(self.diretorio, "metricas_*.json")):
+                    _somar_rotas(rotas, _ler_arquivo(caminho))
+        else:
+            with self._lock:
+                rotas = self._copiar_rotas()
+
+        linhas = [
+            "# HELP http_requisicao_duracao_segundos Latência das requisições por rota.",
+            "# TYPE http_requisicao_duracao_segundos histogram",
+        ]
+        for (metodo, rota), metricas in sorted(rotas.items()):
+            rotulos = f'metodo="{metodo}",rota="{rota}"'
+            acumulado = 0
+            for limite, quantidade in zip(self.buckets, metricas["buckets"]):
+                acumulado += quantidade
+                linhas.append(f'http_requisicao_duracao_segundos_bucket{{{rotulos},le="{limite}"}} {acumulado}')
+            linhas.append(f'http_requisicao_duracao_segundos_bucket{{{rotulos},le="+Inf"}} {metricas["contagem"]}')
+            linhas.append(f"http_requisicao_duracao_segundos_sum{{{rotulos}}} {metricas['soma']:.6f}")
+            linhas.append(f"http_requisicao_duracao_segundos_count{{{rotulos}}} {metricas['contagem']}")
+
+        for nome, chave, tipo, ajuda in (
+            ("http_requisicao_erros_total", "erros", "{:d}", "Requisições com status 5xx por rota."),
+            ("sql_comandos_total", "comandos_sql", "{:d}", "Comandos SQL executados por rota."),
+            ("sql_duracao_segundos_total", "duracao_sql", "{:.6f}", "Tempo total no banco por rota."),
+        ):
+            linhas.append(f"# HELP {nome} {ajuda}")
+            linhas.append(f"# TYPE {nome} counter")
+            for (metodo, rota), metricas in sorted(rotas.items()):
+                linhas.append(f'{nome}{{metodo="{metodo}",rota="{rota}"}} {tipo.format(metricas[chave])}')
+
+        return "\n".join(linhas) + "\n"
+
+    def _copiar_rotas(self):
+        return {chave: dict(valor, buckets=list(valor["buckets"])) for chave, valor in self._rotas.items()}
+
+
+def encerrar_processo(diretorio, pid):
+    """Soma o arquivo de um worker encerrado ao dos encerrados e o remove.
+
+    Chamada pelo mestre do gunicorn (child_exit): os contadores do worker
+    continuam no total exportado e o diretório não cresce com a reciclagem
+    dos workers (max_requests).
+    """
+    caminho = os.path.join(diretorio, ARQUIVO_PROCESSO.format(pid=pid))
+    if not os.path.exists(caminho):
+        return
+    with _lock_diretorio(diretorio):
+        caminho_encerrados = os.path.join(diretorio, ARQUIVO_ENCERRADOS)
+        rotas = _ler_arquivo(caminho_encerrados) if os.path.exists(caminho_encerrados) else {}
+        _somar_rotas(rotas, _ler_arquivo(caminho))
+        _gravar_arquivo(caminho_encerrados, rotas)
+        os.remove(caminho)
+
+
+def limpar_diretorio(diretorio):
+    """Remove os arquivos de métricas de uma execução anterior (início do gunicorn)."""
+    for caminho in glob.glob(os.path.join(diretorio, "metricas_*.json")):
+        os.remove(caminho)
+
+
+def diretorio_metricas():
+    """Diretório compartilhado entre os workers (METRICAS_DIRETORIO), ou None."""
+    if os.getenv("METRICAS_HABILITADAS", "0").lower() not in ("1", "true", "sim"):
+        return None
+    return os.getenv("METRICAS_DIRETORIO") or None
+
+
+@contextmanager
+def _lock_diretorio(diretorio):
+    # Exclusivo entre a leitura dos arquivos e a consolidação de um worker encerrado
+    import fcntl
+
+    with open(os.path.join(diretorio, ".lock"), "a") as arquivo:
+        fcntl.flock(arquivo, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(arquivo, fcntl.LOCK_UN)
+
+
+def _gravar_arquivo(caminho, rotas):
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w") as arquivo:
+        json.dump([[metodo, rota, metricas] for (metodo, rota), metricas in rotas.items()], arquivo)
+    os.replace(temporario, caminho)
+
+
+def _ler_arquivo(caminho):
+    try:
+        with open(caminho) as arquivo:
+            return {(metodo, rota): metricas for metodo, rota, metricas in json.load(arquivo)}
+    except (OSError, ValueError):
+        # Worker consolidado entre o glob e a leitura
+        return {}
+
+
+def _somar_rotas(destino, origem):
+    for chave, metricas in origem.items():
+        atual = destino.get(chave)
+        if atual is None:
+            destino[chave] = dict(metricas, buckets=list(metricas["buckets"]))
+            continue
+        atual["buckets"] = [a + b for a, b in zip(atual["buckets"], metricas["buckets"])]
+        for campo in ("contagem", "soma", "erros", "comandos_sql", "duracao_sql"):
+            atual[campo] += metricas[campo]
+
+
+def instrumentar(app, engines, registro):
+    """Registra os ganchos de requisição e de SQL que alimentam o registro."""
+
+    @app.before_request
+    def _iniciar_medicao():
+        g.metricas_inicio = time.perf_counter()
+        g.metricas_comandos_sql = 0
+        g.metricas_duracao_sql = 0.0
+
+    @app.after_request
+    def _registrar_medicao(resposta):
+        inicio = g.pop("metricas_inicio", None)
+        if inicio is not None:
+            rota = request.url_rule.rule if request.url_rule else "desconhecida"
+            registro.registrar(request.method, rota, resposta.status_code, time.perf_counter() - inicio,
+                               g.pop("metricas_comandos_sql", 0), g.pop("metricas_duracao_sql", 0.0))
+        return resposta
+
+    for engine in engines:
+        @event.listens_for(engine, "before_cursor_execute")
+        def _antes_do_comando(conexao, cursor, statement, parameters, context, executemany):
+            conexao.info.setdefault("metricas_inicio_comando", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _depois_do_comando(conexao, cursor, statement, parameters, context, executemany):
+            inicio = conexao.info["metricas_inicio_comando"].pop()
+            if has_request_context() and "metricas_inicio" in g:
+                g.metricas_comandos_sql += 1
+                g.metricas_duracao_sql += time.perf_counter() - inicio
+
+
+def configurar_metricas(app, db):
+    """Habilita a instrumentação e o endpoint /metrics quando METRICAS_HABILITADAS=1.
+
+    Desabilitada (padrão), nenhum gancho é registrado e não há custo por requisição.
+    Com METRICAS_DIRETORIO, as métricas de todos os workers são somadas.
+    """
+    if os.getenv("METRICAS_HABILITADAS", "0").lower() not in ("1", "true", "sim"):
+        return None
+
+    registro = RegistroMetricas(diretorio=diretorio_metricas())
+    with app.app_context():
+        instrumentar(app, db.engines.values(), registro)
+
+    def metrics():
+        return Response(registro.exportar(), mimetype=None, content_type=CONTENT_TYPE_PROMETHEUS)
+
+    app.add_url_rule("/metrics", "metrics", metrics, methods=["GET"])
+    return registro
@@ -0,0 +1,24 @@
+import base64
+import json
+
+
+def codificar_cursor(**chave):
+    """Gera um cursor opaco a partir da chave da última linha da página."""
+    bruto = json.dumps(chave, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(bruto).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor):
+    """Recupera a chave codificada em um cursor gerado por codificar_cursor.
+
+    Lança ValueError se o cursor não for válido.
+    """
+    try:
+        preenchimento = "=" * (-len(cursor) % 4)
+        chave = json.loads(base64.urlsafe_b64decode(cursor + preenchimento))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Cursor inválido.") from e
+
+    if not isinstance(chave, dict):
+        raise ValueError("Cursor inválido.")
+    return chave
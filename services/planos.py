@@ -0,0 +1,163 @@
+import re
+from contextlib import contextmanager
+from datetime import timedelta
+
+from sqlalchemy import event
+
+from models.estoque import Estoque
+from models.produto import Produto
+from models.venda import Venda
+
+# Linha do EXPLAIN QUERY PLAN que indica leitura completa da tabela, sem índice
+VARREDURA_COMPLETA = re.compile(r"^SCAN (TABLE )?(?P<tabela>\w+)( AS \w+)?$")
+
+# Subconsultas materializadas pelo SQLite: o SCAN delas não lê uma tabela
+SUBCONSULTA_MATERIALIZADA = re.compile(r"^MATERIALIZE (?P<nome>\w+)$")
+
+# Tabelas lidas inteiras por definição: contador tem uma linha por totalizador (GET /dashboard)
+VARREDURAS_PERMITIDAS = {"contador"}
+
+# Comandos que acessam tabelas e têm o plano verificado (PRAGMA, BEGIN, SAVEPOINT... não)
+COMANDOS_VERIFICADOS = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+def amostra_do_banco(session):
+    """Ids e valores existentes no banco usados como parâmetros das requisições monitoradas."""
+    produto = session.query(Produto.id, Produto.nome).order_by(Produto.id).first()
+    estoque = session.query(Estoque.id, Estoque.data_entrada, Estoque.numero_nota_fiscal).order_by(Estoque.id).first()
+    venda = session.query(Venda.id, Venda.codigo, Venda.data).order_by(Venda.id.desc()).first()
+    if not (produto and estoque and venda):
+        raise RuntimeError("A verificação de planos requer ao menos um produto, uma entrada de estoque e uma venda.")
+
+    return {
+        "produto_id": produto.id,
+        "termo": produto.nome.split()[0],
+        "estoque_id": estoque.id,
+        "data_entrada": estoque.data_entrada,
+        "numero_nota_fiscal": estoque.numero_nota_fiscal,
+        "venda_id": venda.id,
+        "codigo": venda.codigo,
+        "data_venda": venda.data,
+    }
+
+
+def requisicoes_monitoradas(amostra, escrita=False):
+    """Requisições dos endpoints cujas consultas não podem varrer tabelas.
+
+    As listagens sem filtro de GET /estoques e as verificações completas
+    (recalcular-saldos, reconciliar-contadores) leem a tabela inteira por
+    definição e não entram nesta lista. As requisições de escrita alteram o
+    banco e só são incluídas com escrita=True (bancos descartáveis, testes).
+    Retorna uma lista de (nome, método, url, corpo JSON).
+    """
+    produto_id = amostra["produto_id"]
+    entrada = amostra["data_entrada"]
+    dia = amostra["data_venda"].date()
+    periodo = f"data_inicio={entrada.isoformat()}&data_fim={(entrada + timedelta(days=1)).isoformat()}"
+
+    requisicoes = [
+        ("GET /produto", "GET", f"/produto?id={produto_id}", None),
+        ("GET /produtos", "GET", "/produtos?limit=20", None),
+        ("GET /produtos/busca", "GET", f"/produtos/busca?q={amostra['termo']}", None),
+        ("GET /estoques?produto_id", "GET", f"/estoques?produto_id={produto_id}", None),
+        ("GET /estoques?data_inicio&data_fim", "GET", f"/estoques?{periodo}", None),
+        ("GET /estoques?numero_nota_fiscal", "GET", f"/estoques?numero_nota_fiscal={amostra['numero_nota_fiscal']}",
+         None),
+        ("GET /estoque/saldo", "GET", f"/estoque/saldo?produto_id={produto_id}&data={entrada.date()}", None),
+        ("GET /vendas", "GET", "/vendas?limit=20", None),
+        ("GET /vendas?codigo", "GET", f"/vendas?codigo={amostra['codigo']}", None),
+        ("GET /venda?id", "GET", f"/venda?id={amostra['venda_id']}", None),
+        ("GET /venda?codigo", "GET", f"/venda?codigo={amostra['codigo']}", None),
+        ("GET /vendas/relatorio", "GET", f"/vendas/relatorio?de={dia}&ate={dia}", None),
+        ("GET /vendas/relatorio?produto_id", "GET",
+         f"/vendas/relatorio?de={dia}&ate={dia}&produto_id={produto_id}", None),
+        ("GET /dashboard", "GET", "/dashboard", None),
+    ]
+    if not escrita:
+        return requisicoes
+
+    estoque = {"produto_id": produto_id, "quantidade": 5, "data_entrada": entrada.isoformat(),
+               "numero_nota_fiscal": amostra["numero_nota_fiscal"]}
+    return requisicoes + [
+        ("POST /produtos", "POST", "/produtos", {"nome": "Plano", "descricao": "verificação", "preco": 1.0}),
+        ("PUT /produto", "PUT", "/produto",
+         {"id": produto_id, "nome": "Plano alterado", "descricao": "verificação", "preco": 2.0}),
+        ("POST /estoques", "POST", "/estoques", estoque),
+        ("PUT /estoque", "PUT", "/estoque", dict(estoque, id=amostra["estoque_id"])),
+        ("POST /vendas", "POST", "/vendas", {
+            "codigo": "plano-venda", "itens": [{"produto_id": produto_id, "quantidade": 1, "preco": 2.0}],
+            "pagamentos": [{"forma": "pix", "valor": 2.0}]}),
+        ("POST /vendas/lote", "POST", "/vendas/lote", {"vendas": [
+            {"codigo": f"plano-lote-{i}", "itens": [{"produto_id": produto_id, "quantidade": 1, "preco": 2.0}]}
+            for i in range(3)]}),
+        ("DELETE /estoque", "DELETE", f"/estoque?id={amostra['estoque_id']}", None),
+    ]
+
+
+@contextmanager
+def capturar_comandos(engines):
+    """Registra (engine, SQL, parâmetros) de cada comando executado nos engines dentro do bloco."""
+    comandos = []
+
+    def _capturar(conexao, cursor, statement, parameters, context, executemany):
+        palavras = statement.split(None, 1)
+        if palavras and palavras[0].upper() in COMANDOS_VERIFICADOS:
+            comandos.append((conexao.engine, statement, parameters[0] if executemany else parameters))
+
+    engines = list(engines)
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", _capturar)
+    try:
+        yield comandos
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", _capturar)
+
+
+def plano_de_execucao(engine, statement, parametros):
+    """Executa EXPLAIN QUERY PLAN para o comando e retorna as linhas de detalhe."""
+    with engine.connect() as conexao:
+        return [linha[-1] for linha in conexao.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parametros)]
+
+
+def varredura_completa(plano):
+    """Indica se o plano lê alguma tabela inteira (exceto as de VARREDURAS_PERMITIDAS)."""
+    ignoradas = VARREDURAS_PERMITIDAS | {
+        materializada.group("nome") for materializada in map(SUBCONSULTA_MATERIALIZADA.match, plano) if materializada}
+    return any(varredura.group("tabela") not in ignoradas
+               for varredura in map(VARREDURA_COMPLETA.match, plano) if varredura)
+
+
+def planos_dos_endpoints(app, engines, requisicoes):
+    """Executa as requisições pelo cliente de testes e obtém o plano de cada comando SQL executado.
+
+    Os comandos são os emitidos de fato pelos endpoints (capturados em
+    before_cursor_execute), com os parâmetros usados. Retorna a lista de
+    (nome da requisição, SQL, plano). Disponível apenas para SQLite, que é o
+    banco em que EXPLAIN QUERY PLAN é suportado.
+    """
+    engines = list(engines)
+    if any(engine.dialect.name != "sqlite" for engine in engines):
+        raise RuntimeError("A verificação de planos de execução requer SQLite.")
+
+    cliente = app.test_client()
+    planos = []
+    for nome, metodo, url, corpo in requisicoes:
+        with capturar_comandos(engines) as comandos:
+            resposta = cliente.open(url, method=metodo, json=corpo)
+            resposta.get_data()  # consome respostas em streaming
+        if resposta.status_code >= 400:
+            raise RuntimeError(f"{nome} respondeu {resposta.status_code}: {resposta.get_data(as_text=True)}")
+
+        vistos = set()
+        for engine, statement, parametros in comandos:
+            if statement not in vistos:
+                vistos.add(statement)
+                planos.append((nome, statement, plano_de_execucao(engine, statement, parametros)))
+    return planos
+
+
+def verificar_planos(app, engines, requisicoes):
+    """Retorna os (nome, SQL, plano) dos comandos dos endpoints que recorrem a varredura completa."""
+    return [(nome, statement, plano) for nome, statement, plano in planos_dos_endpoints(app, engines, requisicoes)
+            if varredura_completa(plano)]
@@ -0,0 +1,179 @@
+from collections import defaultdict
+from datetime import date, timedelta
+
+from sqlalchemy import bindparam, distinct, insert, select, update
+
+from database import db
+from models.venda import Venda
+from models.vendaDiaria import VendaDiaria, VendaProdutoDiaria
+from models.vendaItem import VendaItem
+from services.arquivo import horizonte_arquivado
+from services.saldo_historico import invalidar_checkpoints
+
+GRANULARIDADES = ("dia", "semana", "mes")
+
+
+def acumular_rollups(session, data, vendas):
+    """Soma as vendas (VendaSchema) gravadas em `data` aos rollups diários.
+
+    Deve ser chamado na mesma transação em que as vendas são inseridas.
+    """
+    dia = data.date()
+    total = {"quantidade": 0, "receita": 0.0, "vendas": 0}
+    por_produto = defaultdict(lambda: {"quantidade": 0, "receita": 0.0, "vendas": 0})
+
+    for venda in vendas:
+        total["vendas"] += 1
+        produtos = set()
+        for item in venda.itens or []:
+            receita = item.quantidade * item.preco
+            total["quantidade"] += item.quantidade
+            total["receita"] += receita
+            por_produto[item.produto_id]["quantidade"] += item.quantidade
+            por_produto[item.produto_id]["receita"] += receita
+            produtos.add(item.produto_id)
+        for produto_id in produtos:
+            por_produto[produto_id]["vendas"] += 1
+
+    if not total["vendas"]:
+        return
+
+    diaria = VendaDiaria.__table__
+    atualizados = session.execute(update(diaria).where(diaria.c.dia == dia).values(
+        quantidade=diaria.c.quantidade + total["quantidade"],
+        receita=diaria.c.receita + total["receita"],
+        vendas=diaria.c.vendas + total["vendas"],
+    )).rowcount
+    if not atualizados:
+        session.execute(insert(diaria).values(dia=dia, **total))
+
+    if not por_produto:
+        return
+
+    # Linhas do dia ainda inexistentes são criadas zeradas antes do UPDATE em lote
+    produto_diaria = VendaProdutoDiaria.__table__
+    existentes = {produto_id for (produto_id,) in session.execute(
+        select(produto_diaria.c.produto_id).where(
+            produto_diaria.c.dia == dia, produto_diaria.c.produto_id.in_(list(por_produto)))
+    )}
+    novos = [{"dia": dia, "produto_id": produto_id, "quantidade": 0, "receita": 0.0, "vendas": 0}
+             for produto_id in por_produto if produto_id not in existentes]
+    if novos:
+        session.execute(insert(produto_diaria), novos)
+
+    session.execute(
+        update(produto_diaria).where(
+            produto_diaria.c.dia == bindparam("b_dia"),
+            produto_diaria.c.produto_id == bindparam("b_produto_id"),
+        ).values(
+            quantidade=produto_diaria.c.quantidade + bindparam("b_quantidade"),
+            receita=produto_diaria.c.receita + bindparam("b_receita"),
+            vendas=produto_diaria.c.vendas + bindparam("b_vendas"),
+        ),
+        [{"b_dia": dia, "b_produto_id": produto_id, "b_quantidade": valores["quantidade"],
+          "b_receita": valores["receita"], "b_vendas": valores["vendas"]}
+         for produto_id, valores in por_produto.items()],
+    )
+
+
+def reconstruir_rollups(session, de=None, ate=None):
+    """Recalcula os rollups a partir de Venda e VendaItem (backfill).
+
+    Sem período, reconstrói todo o histórico. Os dias cujas vendas já foram
+    arquivadas são mantidos como estão. Retorna a quantidade de dias
+    reconstruídos.
+    """
+    horizonte = horizonte_arquivado(session)
+    if horizonte is not None:
+        de = max(de, horizonte.date()) if de is not None else horizonte.date()
+        if ate is not None and ate < de:
+            return 0
+
+    dia_venda = db.func.date(Venda.data)
+    filtros = []
+    if de is not None:
+        filtros.append(Venda.data >= de)
+    if ate is not None:
+        filtros.append(Venda.data < ate + timedelta(days=1))
+
+    consulta_diaria = session.query(VendaDiaria)
+    consulta_produto = session.query(VendaProdutoDiaria)
+    if de is not None:
+        consulta_diaria = consulta_diaria.filter(VendaDiaria.dia >= de)
+        consulta_produto = consulta_produto.filter(VendaProdutoDiaria.dia >= de)
+    if ate is not None:
+        consulta_diaria = consulta_diaria.filter(VendaDiaria.dia <= ate)
+        consulta_produto = consulta_produto.filter(VendaProdutoDiaria.dia <= ate)
+    consulta_diaria.delete(synchronize_session=False)
+    consulta_produto.delete(synchronize_session=False)
+
+    # As saídas dos checkpoints de saldo vêm de venda_produto_diaria
+    invalidar_checkpoints(session, de or date.min)
+
+    session.execute(insert(VendaDiaria).from_select(
+        ["dia", "quantidade", "receita", "vendas"],
+        select(
+            dia_venda,
+            db.func.coalesce(db.func.sum(VendaItem.quantidade), 0),
+            db.func.coalesce(db.func.sum(VendaItem.quantidade * VendaItem.preco), 0.0),
+            db.func.count(distinct(Venda.id)),
+        ).select_from(Venda).outerjoin(VendaItem, VendaItem.venda_id == Venda.id)
+        .where(*filtros).group_by(dia_venda)
+    ))
+    session.execute(insert(VendaProdutoDiaria).from_select(
+        ["dia", "produto_id", "quantidade", "receita", "vendas"],
+        select(
+            dia_venda,
+            VendaItem.produto_id,
+            db.func.sum(VendaItem.quantidade),
+            db.func.sum(VendaItem.quantidade * VendaItem.preco),
+            db.func.count(distinct(Venda.id)),
+        ).select_from(Venda).join(VendaItem, VendaItem.venda_id == Venda.id)
+        .where(*filtros).group_by(dia_venda, VendaItem.produto_id)
+    ))
+    session.commit()
+
+    consulta = session.query(db.func.count(VendaDiaria.dia))
+    if de is not None:
+        consulta = consulta.filter(VendaDiaria.dia >= de)
+    if ate is not None:
+        consulta = consulta.filter(VendaDiaria.dia <= ate)
+    return consulta.scalar()
+
+
+def inicio_do_periodo(dia, granularidade):
+    """Primeiro dia do período (semana começa na segunda-feira)."""
+    if granularidade == "semana":
+        return dia - timedelta(days=dia.weekday())
+    if granularidade == "mes":
+        return dia.replace(day=1)
+    return dia
+
+
+def relatorio_vendas(session, de, ate, granularidade="dia", produto_id=None):
+    """Totais de vendas por período lidos apenas dos rollups diários.
+
+    A consulta lê no máximo uma linha por dia do intervalo; a consolidação em
+    semanas ou meses é feita sobre essas linhas.
+    """
+    if produto_id is None:
+        modelo = VendaDiaria
+        consulta = session.query(modelo.dia, modelo.quantidade, modelo.receita, modelo.vendas)
+    else:
+        modelo = VendaProdutoDiaria
+        consulta = session.query(modelo.dia, modelo.quantidade, modelo.receita, modelo.vendas).filter(
+            modelo.produto_id == produto_id)
+
+    linhas = consulta.filter(modelo.dia >= de, modelo.dia <= ate).order_by(modelo.dia).all()
+
+    periodos = {}
+    for dia, quantidade, receita, vendas in linhas:
+        inicio = inicio_do_periodo(dia, granularidade)
+        periodo = periodos.setdefault(inicio, {"inicio": inicio, "quantidade": 0, "receita": 0.0, "vendas": 0})
+        periodo["quantidade"] += quantidade
+        periodo["receita"] += receita
+        periodo["vendas"] += vendas
+
+    for periodo in periodos.values():
+        periodo["receita"] = round(periodo["receita"], 2)
+    return list(periodos.values())
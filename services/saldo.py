@@ -0,0 +1,240 @@
+from sqlalchemy import bindparam, insert, update
+
+from database import db
+from models.estoque import Estoque
+from models.produto import Produto
+from models.saldoProduto import SaldoProduto
+from models.vendaItem import VendaItem
+from services.arquivo import totais_arquivados
+from services.contadores import (TOTAL_ENTRADAS_ESTOQUE, TOTAL_SAIDAS_ESTOQUE, VERSAO_PRODUTOS,
+                                 incrementar_contador)
+
+
+class EstoqueInsuficienteError(Exception):
+    """O saldo do produto não cobre a quantidade pedida na venda."""
+
+    def __init__(self, produto_id):
+        super().__init__(f"Estoque insuficiente para o produto com ID {produto_id}.")
+        self.produto_id = produto_id
+
+
+class ProdutoInexistenteError(Exception):
+    """A entrada de estoque ou a venda referencia um produto não cadastrado."""
+
+    def __init__(self, produto_ids):
+        super().__init__(f"Produto(s) com ID {', '.join(map(str, produto_ids))} não encontrado(s).")
+        self.produto_ids = produto_ids
+
+
+def produtos_inexistentes(session, produto_ids):
+    """Ids, dentre produto_ids, que não correspondem a produtos cadastrados (ordenados)."""
+    produto_ids = set(produto_ids)
+    if not produto_ids:
+        return []
+    cadastrados = {produto_id for (produto_id,) in session.query(Produto.id).filter(Produto.id.in_(produto_ids))}
+    return sorted(produto_ids - cadastrados)
+
+
+def criar_saldo_produto(session, produto_id):
+    """Cria a linha de saldo zerada de um produto recém-cadastrado, se ela ainda não existir.
+
+    Uma linha já existente (ex.: gravada antes da validação dos produtos nas
+    entradas e vendas) é mantida: ela reflete o histórico com esse produto_id.
+    """
+    existe = session.query(SaldoProduto.produto_id).filter(SaldoProduto.produto_id == produto_id).first()
+    if not existe:
+        session.add(SaldoProduto(produto_id=produto_id, total_entradas=0, total_saidas=0))
+
+
+def ajustar_saldo(session, produto_id, entradas=0, saidas=0):
+    """Aplica um delta de entradas/saídas ao saldo materializado do produto.
+
+    Deve ser chamado dentro da mesma transação que altera Estoque ou VendaItem,
+    antes que a alteração seja gravada no banco (objetos ainda pendentes na
+    sessão ou comandos ainda não executados), para que o saldo nunca fique
+    divergente das tabelas de origem. Os contadores globais de entradas e
+    saídas acompanham o mesmo delta, e a versão da listagem de produtos (que
+    exibe o saldo) é incrementada. Lança ProdutoInexistenteError para um
+    produto não cadastrado.
+    """
+    if not entradas and not saidas:
+        return
+
+    def _aplicar():
+        return session.query(SaldoProduto).filter(
+            SaldoProduto.produto_id == produto_id
+        ).update({
+            SaldoProduto.total_entradas: SaldoProduto.total_entradas + entradas,
+            SaldoProduto.total_saidas: SaldoProduto.total_saidas + saidas,
+        }, synchronize_session=False)
+
+    with session.no_autoflush:
+        if not _aplicar():
+            # Produto sem linha de saldo: parte do histórico já gravado, sem a alteração pendente
+            criar_saldos_ausentes(session, [produto_id])
+            _aplicar()
+
+    incrementar_contador(session, TOTAL_ENTRADAS_ESTOQUE, entradas)
+    incrementar_contador(session, TOTAL_SAIDAS_ESTOQUE, saidas)
+    incrementar_contador(session, VERSAO_PRODUTOS, 1)
+
+
+def ajustar_saldos(session, entradas=None, saidas=None):
+    """Versão em lote de ajustar_saldo para vários produtos.
+
+    Recebe dicionários produto_id -> quantidade e aplica todos os deltas com
+    um único UPDATE executemany, além de uma única atualização por contador,
+    em vez de uma sequência de comandos por produto. Assim como ajustar_saldo,
+    deve ser chamada antes de gravar as linhas de Estoque/VendaItem.
+    """
+    entradas, saidas = entradas or {}, saidas or {}
+    deltas = [
+        {"b_produto_id": produto_id, "b_entradas": entradas.get(produto_id, 0), "b_saidas": saidas.get(produto_id, 0)}
+        for produto_id in set(entradas) | set(saidas)
+        if entradas.get(produto_id, 0) or saidas.get(produto_id, 0)
+    ]
+    if not deltas:
+        return
+
+    saldo = SaldoProduto.__table__
+    with session.no_autoflush:
+        # Produtos sem linha de saldo a recebem, calculada do histórico, antes do UPDATE
+        criar_saldos_ausentes(session, [delta["b_produto_id"] for delta in deltas])
+        session.execute(
+            update(saldo).where(saldo.c.produto_id == bindparam("b_produto_id")).values(
+                total_entradas=saldo.c.total_entradas + bindparam("b_entradas"),
+                total_saidas=saldo.c.total_saidas + bindparam("b_saidas"),
+            ),
+            deltas,
+        )
+
+    incrementar_contador(session, TOTAL_ENTRADAS_ESTOQUE, sum(entradas.values()))
+    incrementar_contador(session, TOTAL_SAIDAS_ESTOQUE, sum(saidas.values()))
+    incrementar_contador(session, VERSAO_PRODUTOS, 1)
+
+
+def reservar_estoque(session, saidas):
+    """Debita as saídas de uma venda somente se houver saldo para todos os itens.
+
+    Cada produto é debitado por um UPDATE condicional (saldo >= quantidade),
+    atômico no banco, sem ler o saldo antes. Se algum produto não tiver saldo,
+    os débitos já aplicados nesta chamada são estornados e
+    EstoqueInsuficienteError é lançada; a transação continua utilizável.
+    Os produtos são debitados em ordem de id para manter a ordem dos locks.
+    Quantidades menores ou iguais a zero lançam ValueError antes de qualquer
+    débito, pois um débito negativo aumentaria o saldo sem passar pela condição.
+    """
+    invalidas = sorted(produto_id for produto_id, quantidade in saidas.items() if quantidade <= 0)
+    if invalidas:
+        raise ValueError(f"Quantidade de saída deve ser maior que zero (produtos {invalidas}).")
+
+    saldo = SaldoProduto.__table__
+    aplicadas = []
+    for produto_id in sorted(saidas):
+        quantidade = saidas[produto_id]
+        debito = update(saldo).where(
+            saldo.c.produto_id == produto_id,
+            saldo.c.total_entradas - saldo.c.total_saidas >= quantidade,
+        ).values(total_saidas=saldo.c.total_saidas + quantidade)
+        with session.no_autoflush:
+            debitado = session.execute(debito).rowcount
+            if not debitado and criar_saldos_ausentes(session, [produto_id]):
+                debitado = session.execute(debito).rowcount
+        if not debitado:
+            for aplicado, quantidade_aplicada in aplicadas:
+                session.execute(update(saldo).where(saldo.c.produto_id == aplicado).values(
+                    total_saidas=saldo.c.total_saidas - quantidade_aplicada))
+            raise EstoqueInsuficienteError(produto_id)
+        aplicadas.append((produto_id, quantidade))
+
+    if aplicadas:
+        incrementar_contador(session, TOTAL_SAIDAS_ESTOQUE, sum(quantidade for _, quantidade in aplicadas))
+        incrementar_contador(session, VERSAO_PRODUTOS, 1)
+
+
+def criar_saldos_ausentes(session, produto_ids):
+    """Cria as linhas de saldo que faltam para produto_ids a partir do histórico gravado.
+
+    Os totais são as somas de Estoque e VendaItem (mais as saídas arquivadas)
+    já gravadas no banco; chamadas pelos ajustes com autoflush desligado, não
+    incluem a alteração pendente que o ajuste vai aplicar. Retorna os ids
+    das linhas criadas. Um produto não cadastrado não tem linha de saldo:
+    lança ProdutoInexistenteError antes de gravar qualquer linha.
+    """
+    produto_ids = set(produto_ids)
+    existentes = {produto_id for (produto_id,) in session.query(SaldoProduto.produto_id).filter(
+        SaldoProduto.produto_id.in_(produto_ids))}
+    ausentes = sorted(produto_ids - existentes)
+    if not ausentes:
+        return []
+
+    inexistentes = produtos_inexistentes(session, ausentes)
+    if inexistentes:
+        raise ProdutoInexistenteError(inexistentes)
+
+    entradas = dict(session.query(Estoque.produto_id, db.func.sum(Estoque.quantidade)).filter(
+        Estoque.produto_id.in_(ausentes)).group_by(Estoque.produto_id))
+    saidas = dict(session.query(VendaItem.produto_id, db.func.sum(VendaItem.quantidade)).filter(
+        VendaItem.produto_id.in_(ausentes)).group_by(VendaItem.produto_id))
+    arquivadas = totais_arquivados(session)
+
+    session.execute(insert(SaldoProduto.__table__), [{
+        "produto_id": produto_id,
+        "total_entradas": entradas.get(produto_id) or 0,
+        "total_saidas": (saidas.get(produto_id) or 0) + arquivadas.get(produto_id, (0, 0))[0],
+    } for produto_id in ausentes])
+    return ausentes
+
+
+def preencher_saldos_ausentes(session):
+    """Cria, a partir do histórico, a linha de saldo dos produtos que ainda não a têm."""
+    ausentes = [produto_id for (produto_id,) in session.query(Produto.id).outerjoin(
+        SaldoProduto, SaldoProduto.produto_id == Produto.id
+    ).filter(SaldoProduto.produto_id.is_(None))]
+    criados = criar_saldos_ausentes(session, ausentes) if ausentes else []
+    session.commit()
+    return len(criados)
+
+
+def recalcular_saldos(session, corrigir=True):
+    """Recalcula os saldos a partir de Estoque e VendaItem (mais as saídas arquivadas).
+
+    Retorna a lista de divergências encontradas no formato
+    (produto_id, saldo_materializado, saldo_calculado). Com corrigir=False
+    apenas verifica, sem alterar a tabela de saldos.
+    """
+    entradas = dict(session.query(
+        Estoque.produto_id, db.func.sum(Estoque.quantidade)
+    ).group_by(Estoque.produto_id).all())
+    saidas = dict(session.query(
+        VendaItem.produto_id, db.func.sum(VendaItem.quantidade)
+    ).group_by(VendaItem.produto_id).all())
+    arquivadas = totais_arquivados(session)
+    atuais = {saldo.produto_id: saldo for saldo in session.query(SaldoProduto).all()}
+
+    divergencias = []
+    for (produto_id,) in session.query(Produto.id).all():
+        total_entradas = entradas.get(produto_id) or 0
+        total_saidas = (saidas.get(produto_id) or 0) + arquivadas.get(produto_id, (0, 0))[0]
+        atual = atuais.get(produto_id)
+
+        if atual and atual.total_entradas == total_entradas and atual.total_saidas == total_saidas:
+            continue
+
+        divergencias.append((produto_id, atual.saldo if atual else None, total_entradas - total_saidas))
+        if corrigir:
+            if atual:
+                atual.total_entradas = total_entradas
+                atual.total_saidas = total_saidas
+            else:
+                session.add(SaldoProduto(produto_id=produto_id,
+                                         total_entradas=total_entradas,
+                                         total_saidas=total_saidas))
+
+    if corrigir:
+        if divergencias:
+            # Os saldos corrigidos entram na listagem de produtos: invalida a ETag
+            incrementar_contador(session, VERSAO_PRODUTOS, 1)
+        session.commit()
+
+    return divergencias
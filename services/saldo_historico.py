@@ -0,0 +1,140 @@
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import insert
+
+from database import db
+from models.estoque import Estoque
+from models.saldoProdutoDiario import SaldoProdutoDiario
+from models.vendaDiaria import VendaProdutoDiaria
+
+
+def _como_data(valor):
+    # date() do SQLite retorna texto (AAAA-MM-DD); outros bancos retornam date
+    return valor if isinstance(valor, date) else date.fromisoformat(valor)
+
+
+def invalidar_checkpoints(session, desde, produto_ids=None):
+    """Refaz os checkpoints a partir do dia de `desde` (date ou datetime).
+
+    Deve ser chamada, na mesma transação e após a escrita, por toda escrita
+    que altere a movimentação de um dia passado (entrada de estoque
+    retroativa, alteração ou exclusão de entrada, reconstrução dos rollups).
+    Sem produto_ids os checkpoints são removidos para todos os produtos. Com
+    produto_ids, apenas os desses produtos são removidos e regerados até o
+    último dia com checkpoint, que continua valendo como marca d'água para
+    gerar_checkpoints.
+    """
+    if isinstance(desde, datetime):
+        desde = desde.date()
+    consulta = session.query(SaldoProdutoDiario).filter(SaldoProdutoDiario.dia >= desde)
+    if produto_ids is None:
+        consulta.delete(synchronize_session=False)
+        return
+
+    produto_ids = set(produto_ids)
+    # A marca d'água é lida antes da remoção, que pode levar os únicos checkpoints do último dia
+    ultimo_dia = session.query(db.func.max(SaldoProdutoDiario.dia)).scalar()
+    consulta.filter(SaldoProdutoDiario.produto_id.in_(produto_ids)).delete(synchronize_session=False)
+    if ultimo_dia is None or ultimo_dia < desde:
+        return
+    # Todo dia com movimentação até a marca d'água tem checkpoint: os restantes,
+    # anteriores a `desde`, são o saldo inicial de cada produto
+    session.flush()
+    checkpoints = _checkpoints(session, desde, ultimo_dia, _saldos_iniciais(session, produto_ids), produto_ids)
+    if checkpoints:
+        session.execute(insert(SaldoProdutoDiario), checkpoints)
+
+
+def gerar_checkpoints(session, ate=None, reconstruir=False):
+    """Gera os checkpoints de saldo dos dias após o último já gerado, até `ate`.
+
+    `ate` é limitado a ontem (UTC), pois só dias encerrados recebem
+    checkpoint. As entradas vêm de Estoque e as saídas dos rollups diários
+    por produto (venda_produto_diaria), os mesmos usados por saldo_na_data.
+    Com reconstruir=True todos os checkpoints são refeitos. Retorna a
+    quantidade de checkpoints gravados.
+    """
+    ontem = datetime.utcnow().date() - timedelta(days=1)
+    ate = min(ate, ontem) if ate else ontem
+
+    if reconstruir:
+        session.query(SaldoProdutoDiario).delete(synchronize_session=False)
+
+    ultimo_dia = session.query(db.func.max(SaldoProdutoDiario.dia)).scalar()
+    if ultimo_dia is not None and ultimo_dia >= ate:
+        session.commit()
+        return 0
+
+    desde = ultimo_dia + timedelta(days=1) if ultimo_dia is not None else None
+    checkpoints = _checkpoints(session, desde, ate, _saldos_iniciais(session))
+    if checkpoints:
+        session.execute(insert(SaldoProdutoDiario), checkpoints)
+    session.commit()
+    return len(checkpoints)
+
+
+def _saldos_iniciais(session, produto_ids=None):
+    """Saldo de cada produto no seu checkpoint mais recente."""
+    ultimos = session.query(
+        SaldoProdutoDiario.produto_id, db.func.max(SaldoProdutoDiario.dia).label("dia")
+    )
+    if produto_ids is not None:
+        ultimos = ultimos.filter(SaldoProdutoDiario.produto_id.in_(produto_ids))
+    ultimos = ultimos.group_by(SaldoProdutoDiario.produto_id).subquery()
+    return Counter(dict(session.query(SaldoProdutoDiario.produto_id, SaldoProdutoDiario.saldo).join(
+        ultimos, (ultimos.c.produto_id == SaldoProdutoDiario.produto_id) & (ultimos.c.dia == SaldoProdutoDiario.dia)
+    )))
+
+
+def _checkpoints(session, desde, ate, saldos, produto_ids=None):
+    """Checkpoints dos dias com movimentação de `desde` (None = início) a `ate`, somada a `saldos`."""
+    dia_entrada = db.func.date(Estoque.data_entrada)
+    entradas = session.query(Estoque.produto_id, dia_entrada, db.func.sum(Estoque.quantidade)).filter(
+        Estoque.data_entrada < datetime.combine(ate + timedelta(days=1), time.min))
+    saidas = session.query(VendaProdutoDiaria.produto_id, VendaProdutoDiaria.dia, VendaProdutoDiaria.quantidade).filter(
+        VendaProdutoDiaria.dia <= ate)
+    if desde is not None:
+        entradas = entradas.filter(Estoque.data_entrada >= datetime.combine(desde, time.min))
+        saidas = saidas.filter(VendaProdutoDiaria.dia >= desde)
+    if produto_ids is not None:
+        entradas = entradas.filter(Estoque.produto_id.in_(produto_ids))
+        saidas = saidas.filter(VendaProdutoDiaria.produto_id.in_(produto_ids))
+
+    movimentos = Counter()
+    for produto_id, dia, quantidade in entradas.group_by(Estoque.produto_id, dia_entrada):
+        movimentos[(_como_data(dia), produto_id)] += quantidade
+    for produto_id, dia, quantidade in saidas:
+        movimentos[(dia, produto_id)] -= quantidade
+
+    checkpoints = []
+    for (dia, produto_id), delta in sorted(movimentos.items()):
+        saldos[produto_id] += delta
+        checkpoints.append({"produto_id": produto_id, "dia": dia, "saldo": saldos[produto_id]})
+    return checkpoints
+
+
+def saldo_na_data(session, produto_id, dia):
+    """Saldo do produto ao fim de `dia`: checkpoint mais próximo + movimentação desde então.
+
+    Retorna (saldo, dia do checkpoint usado ou None). O custo é de três
+    consultas por índice, limitadas ao período posterior ao checkpoint.
+    """
+    checkpoint = session.query(SaldoProdutoDiario.dia, SaldoProdutoDiario.saldo).filter(
+        SaldoProdutoDiario.produto_id == produto_id, SaldoProdutoDiario.dia <= dia
+    ).order_by(SaldoProdutoDiario.dia.desc()).first()
+
+    entradas = session.query(db.func.coalesce(db.func.sum(Estoque.quantidade), 0)).filter(
+        Estoque.produto_id == produto_id,
+        Estoque.data_entrada < datetime.combine(dia + timedelta(days=1), time.min))
+    saidas = session.query(db.func.coalesce(db.func.sum(VendaProdutoDiaria.quantidade), 0)).filter(
+        VendaProdutoDiaria.produto_id == produto_id, VendaProdutoDiaria.dia <= dia)
+    saldo = 0
+    if checkpoint is not None:
+        entradas = entradas.filter(
+            Estoque.data_entrada >= datetime.combine(checkpoint.dia + timedelta(days=1), time.min))
+        saidas = saidas.filter(VendaProdutoDiaria.dia > checkpoint.dia)
+        saldo = checkpoint.saldo
+
+    saldo += entradas.scalar() - saidas.scalar()
+    return saldo, checkpoint.dia if checkpoint is not None else None
@@ -0,0 +1,78 @@
+"""Serialização rápida das respostas de listagem.
+
+As listagens montam dicionários diretamente das colunas selecionadas (tuplas),
+sem construir um modelo Pydantic por linha, e são codificadas com orjson
+quando o pacote está instalado. Os schemas continuam descrevendo as respostas
+na documentação OpenAPI.
+"""
+import json
+from datetime import timezone
+
+from flask import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson é opcional
+    orjson = None
+
+DIAS_SEMANA = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+MESES = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+def data_http(valor):
+    """Formata a data como o JSON padrão do Flask (RFC 822, em GMT).
+
+    Mantém o formato já devolvido pela API para datas (ex.: data_entrada),
+    sem passar pelo encoder padrão a cada linha. Datas sem fuso são UTC.
+    """
+    if valor is None:
+        return None
+    if valor.tzinfo is not None:
+        valor = valor.astimezone(timezone.utc)
+    return (f"{DIAS_SEMANA[valor.weekday()]}, {valor.day:02d} {MESES[valor.month - 1]} {valor.year:04d} "
+            f"{valor.hour:02d}:{valor.minute:02d}:{valor.second:02d} GMT")
+
+
+def produto_como_dict(produto_id, nome, descricao, preco):
+    """Representação de ProdutoSchema a partir das colunas do produto."""
+    return {"id": produto_id, "nome": nome, "descricao": descricao, "preco": preco}
+
+
+def estoque_como_dict(estoque_id, produto_id, quantidade, data_entrada, numero_nota_fiscal):
+    """Representação de EstoqueSchema a partir das colunas da entrada de estoque."""
+    return {
+        "id": estoque_id,
+        "produto_id": produto_id,
+        "quantidade": quantidade,
+        "data_entrada": data_http(data_entrada),
+        "numero_nota_fiscal": numero_nota_fiscal,
+    }
+
+
+def venda_como_dict(venda_id, codigo, data, itens):
+    """Representação de VendaSchema de uma venda recém-registrada (itens do corpo recebido).
+
+    Assim como VendaSchema.from_orm(venda), frete e pagamentos não fazem parte
+    do cabeçalho retornado.
+    """
+    return {
+        "id": venda_id,
+        "codigo": codigo,
+        "itens": [{"produto_id": item.produto_id, "quantidade": item.quantidade, "preco": item.preco}
+                  for item in itens or []],
+        "data": data_http(data),
+        "frete": None,
+        "pagamentos": None,
+    }
+
+
+def codificar_json(dados):
+    """Codifica em JSON (bytes UTF-8) com o encoder mais rápido disponível."""
+    if orjson is not None:
+        return orjson.dumps(dados)
+    return json.dumps(dados, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def resposta_json(dados, status=200, headers=None):
+    """Resposta application/json já codificada, sem passar pelo jsonify."""
+    return Response(codificar_json(dados), status=status, headers=headers, mimetype="application/json")
@@ -0,0 +1,302 @@
+import logging
+from collections import Counter, defaultdict
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from models.arquivo import pagamento_arquivado, venda_arquivada, venda_item_arquivada
+from models.pagamento import Pagamento
+from models.venda import Venda
+from models.vendaItem import VendaItem
+from services.arquivo import arquivo_disponivel, codigos_arquivados
+from services.contadores import VALOR_TOTAL_VENDAS, incrementar_contador
+from services.rollup import acumular_rollups
+from schemas.venda import FreteSchema, PagamentoSchema, VendaItemSchema, VendaSchema
+from services.saldo import (EstoqueInsuficienteError, ProdutoInexistenteError, ajustar_saldos, produtos_inexistentes,
+                            reservar_estoque)
+
+logger = logging.getLogger(__name__)
+
+
+def dados_venda(body, data):
+    """Monta as colunas do cabeçalho da venda a partir do VendaSchema recebido."""
+    frete = body.frete
+    return {
+        "codigo": body.codigo,
+        "data": data,
+        "frete_cep": frete.cep if frete else None,
+        "frete_logradouro": frete.logradouro if frete else None,
+        "frete_numero": frete.numero if frete else None,
+        "frete_complemento": frete.complemento if frete else None,
+        "frete_bairro": frete.bairro if frete else None,
+        "frete_cidade": frete.cidade if frete else None,
+        "frete_uf": frete.uf if frete else None,
+    }
+
+
+def frete_da_venda(venda):
+    """FreteSchema a partir das colunas frete_* da venda (None se a venda não tem frete)."""
+    if venda.frete_cep is None:
+        return None
+    return FreteSchema(
+        cep=venda.frete_cep,
+        logradouro=venda.frete_logradouro,
+        numero=venda.frete_numero,
+        complemento=venda.frete_complemento,
+        bairro=venda.frete_bairro,
+        cidade=venda.frete_cidade,
+        uf=venda.frete_uf,
+    )
+
+
+def carregar_vendas(session, vendas, arquivadas=False):
+    """Monta o VendaSchema de cada venda com os seus itens e pagamentos.
+
+    Os itens e os pagamentos de todas as vendas são lidos em uma consulta
+    (IN) cada, em vez de uma consulta por venda via venda.itens. Com
+    arquivadas=True são lidos das tabelas do banco de arquivo.
+    """
+    if not vendas:
+        return []
+
+    tabela_itens = venda_item_arquivada if arquivadas else VendaItem.__table__
+    tabela_pagamentos = pagamento_arquivado if arquivadas else Pagamento.__table__
+
+    itens = defaultdict(list)
+    for item in session.execute(select(
+            tabela_itens.c.venda_id, tabela_itens.c.produto_id, tabela_itens.c.quantidade, tabela_itens.c.preco
+    ).where(tabela_itens.c.venda_id.in_([venda.id for venda in vendas])).order_by(tabela_itens.c.id)):
+        itens[item.venda_id].append(VendaItemSchema(produto_id=item.produto_id, quantidade=item.quantidade,
+                                                    preco=item.preco))
+
+    pagamentos = defaultdict(list)
+    for pagamento in session.execute(select(
+            tabela_pagamentos.c.codigo_venda, tabela_pagamentos.c.forma, tabela_pagamentos.c.valor
+    ).where(tabela_pagamentos.c.codigo_venda.in_([venda.codigo for venda in vendas])).order_by(tabela_pagamentos.c.id)):
+        pagamentos[pagamento.codigo_venda].append(PagamentoSchema(forma=pagamento.forma, valor=pagamento.valor))
+
+    return [
+        VendaSchema(
+            id=venda.id,
+            codigo=venda.codigo,
+            data=venda.data,
+            frete=frete_da_venda(venda),
+            itens=itens[venda.id],
+            pagamentos=pagamentos[venda.codigo],
+        )
+        for venda in vendas
+    ]
+
+
+def consultar_vendas(tabela, limite, after_id=0, codigo=None, data_inicio=None, data_fim=None):
+    """SELECT de uma página de vendas de `tabela` (venda ou a do arquivo), ordenada pelo id."""
+    consulta = select(tabela).where(tabela.c.id > after_id)
+    if codigo:
+        consulta = consulta.where(tabela.c.codigo == codigo)
+    if data_inicio:
+        consulta = consulta.where(tabela.c.data >= data_inicio)
+    if data_fim:
+        consulta = consulta.where(tabela.c.data <= data_fim)
+    return consulta.order_by(tabela.c.id).limit(limite)
+
+
+def listar_vendas(session, limite, after_id=0, codigo=None, data_inicio=None, data_fim=None,
+                  incluir_arquivadas=False):
+    """Retorna (vendas, mais) com uma página de VendaSchema ordenada pelo id.
+
+    `mais` indica que existe uma próxima página. Sem incluir_arquivadas a
+    página custa três consultas; com ela, as vendas do banco de arquivo são
+    intercaladas pelo id, com mais três consultas.
+    """
+    filtros = {"after_id": after_id, "codigo": codigo, "data_inicio": data_inicio, "data_fim": data_fim}
+    linhas = [(venda, False) for venda in session.execute(consultar_vendas(Venda.__table__, limite + 1, **filtros))]
+    if incluir_arquivadas and arquivo_disponivel(session.connection()):
+        linhas += [(venda, True) for venda in session.execute(consultar_vendas(venda_arquivada, limite + 1, **filtros))]
+        linhas.sort(key=lambda linha: linha[0].id)
+
+    # A linha excedente indica que existe uma próxima página
+    mais = len(linhas) > limite
+    linhas = linhas[:limite]
+
+    vendas = {}
+    for arquivadas in (False, True):
+        grupo = [venda for venda, arquivada in linhas if arquivada == arquivadas]
+        vendas.update((venda.id, schema) for venda, schema in zip(grupo, carregar_vendas(session, grupo, arquivadas)))
+    return [vendas[venda.id] for venda, _ in linhas], mais
+
+
+def buscar_venda(session, venda_id=None, codigo=None, incluir_arquivadas=False):
+    """VendaSchema da venda com o id e/ou código informados, ou None.
+
+    Com incluir_arquivadas, a venda também é procurada no banco de arquivo.
+    """
+    tabelas = [(Venda.__table__, False)]
+    if incluir_arquivadas and arquivo_disponivel(session.connection()):
+        tabelas.append((venda_arquivada, True))
+
+    for tabela, arquivadas in tabelas:
+        consulta = select(tabela)
+        if venda_id is not None:
+            consulta = consulta.where(tabela.c.id == venda_id)
+        if codigo:
+            consulta = consulta.where(tabela.c.codigo == codigo)
+        venda = session.execute(consulta.limit(1)).first()
+        if venda is not None:
+            return carregar_vendas(session, [venda], arquivadas)[0]
+    return None
+
+
+def saidas_da_venda(venda):
+    """Quantidade vendida por produto (itens repetidos do mesmo produto são somados)."""
+    saidas = Counter()
+    for item in venda.itens or []:
+        saidas[item.produto_id] += item.quantidade
+    return saidas
+
+
+def codigos_existentes(session, codigos):
+    """Códigos, dentre `codigos`, já usados por vendas registradas ou arquivadas."""
+    existentes = {codigo for (codigo,) in session.query(Venda.codigo).filter(Venda.codigo.in_(codigos))}
+    return existentes | codigos_arquivados(session, set(codigos) - existentes)
+
+
+def registrar_vendas_em_lote(session, vendas, data, tamanho_lote=500, validar_estoque=False):
+    """Registra uma lista de vendas com inserções em massa.
+
+    As vendas são gravadas em transações de até tamanho_lote vendas, cada uma
+    com um único INSERT em massa por tabela. Vendas com código repetido (no
+    banco ou dentro do próprio lote) e vendas de produtos não cadastrados são
+    rejeitadas individualmente. Com validar_estoque, cada venda reserva o seu estoque e é rejeitada se algum
+    item não tiver saldo.
+
+    Um erro de banco (ex.: OperationalError por banco bloqueado) interrompe o
+    lote: as vendas dos blocos já gravados mantêm o seu resultado e as demais
+    são marcadas como não registradas, com o erro na mensagem.
+
+    Retorna um resultado por venda, na mesma ordem recebida.
+    """
+    resultados = [None] * len(vendas)
+    vistos = set()
+
+    for inicio in range(0, len(vendas), tamanho_lote):
+        indices = []
+        for indice in range(inicio, min(inicio + tamanho_lote, len(vendas))):
+            codigo = vendas[indice].codigo
+            if codigo in vistos:
+                resultados[indice] = _falha(codigo, "Código de venda repetido no lote.")
+            else:
+                vistos.add(codigo)
+                indices.append(indice)
+
+        try:
+            _registrar_bloco(session, vendas, indices, data, resultados, validar_estoque)
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger.exception("Erro ao registrar o lote de vendas:")
+            erro = getattr(e, "orig", None) or e
+            mensagem = f"Venda não registrada: o lote foi interrompido por um erro do banco ({erro})."
+            for indice, resultado in enumerate(resultados):
+                if resultado is None:
+                    resultados[indice] = _falha(vendas[indice].codigo, mensagem)
+            break
+
+    return resultados
+
+
+def _registrar_bloco(session, vendas, indices, data, resultados, validar_estoque=False):
+    """Grava um bloco de vendas em uma única transação."""
+    codigos = [vendas[indice].codigo for indice in indices]
+    existentes = codigos_existentes(session, codigos)
+    inexistentes = set(produtos_inexistentes(
+        session, {item.produto_id for indice in indices for item in vendas[indice].itens or []}))
+
+    pendentes = []
+    for indice in indices:
+        produtos = sorted({item.produto_id for item in vendas[indice].itens or []} & inexistentes)
+        if vendas[indice].codigo in existentes:
+            resultados[indice] = _falha(vendas[indice].codigo, "Já existe uma venda com este código.")
+        elif produtos:
+            resultados[indice] = _falha(vendas[indice].codigo, str(ProdutoInexistenteError(produtos)))
+        else:
+            pendentes.append(indice)
+
+    if not pendentes:
+        return
+
+    try:
+        if validar_estoque:
+            pendentes = _reservar_bloco(session, vendas, pendentes, resultados)
+            if not pendentes:
+                session.commit()
+                return
+
+        session.execute(insert(Venda), [dados_venda(vendas[indice], data) for indice in pendentes])
+
+        ids = dict(session.query(Venda.codigo, Venda.id).filter(
+            Venda.codigo.in_([vendas[indice].codigo for indice in pendentes])
+        ).all())
+
+        itens, pagamentos, saidas, valor_total = [], [], Counter(), 0.0
+        for indice in pendentes:
+            venda = vendas[indice]
+            for item in venda.itens or []:
+                itens.append({
+                    "venda_id": ids[venda.codigo],
+                    "produto_id": item.produto_id,
+                    "quantidade": item.quantidade,
+                    "preco": item.preco,
+                })
+                saidas[item.produto_id] += item.quantidade
+                valor_total += item.quantidade * item.preco
+            for pagamento in venda.pagamentos or []:
+                pagamentos.append({
+                    "codigo_venda": venda.codigo,
+                    "forma": pagamento.forma,
+                    "valor": pagamento.valor,
+                })
+
+        # Saldos ajustados antes de gravar os itens (ver ajustar_saldos)
+        if not validar_estoque:
+            ajustar_saldos(session, saidas=saidas)
+        if itens:
+            session.execute(insert(VendaItem), itens)
+        if pagamentos:
+            session.execute(insert(Pagamento), pagamentos)
+        incrementar_contador(session, VALOR_TOTAL_VENDAS, valor_total)
+        acumular_rollups(session, data, [vendas[indice] for indice in pendentes])
+
+        session.commit()
+    except IntegrityError as e:
+        session.rollback()
+        if len(pendentes) == 1:
+            codigo = vendas[pendentes[0]].codigo
+            if codigo in codigos_existentes(session, [codigo]):
+                resultados[pendentes[0]] = _falha(codigo, "Já existe uma venda com este código.")
+            else:
+                resultados[pendentes[0]] = _falha(codigo, f"Erro de integridade ao registrar a venda: {e.orig}")
+            return
+        # Conflito concorrente dentro do bloco: regrava venda a venda para isolar a falha
+        for indice in pendentes:
+            _registrar_bloco(session, vendas, [indice], data, resultados, validar_estoque)
+        return
+
+    for indice in pendentes:
+        codigo = vendas[indice].codigo
+        resultados[indice] = {"codigo": codigo, "sucesso": True, "id": ids[codigo], "mensagem": None}
+
+
+def _reservar_bloco(session, vendas, pendentes, resultados):
+    """Reserva o estoque de cada venda do bloco, rejeitando as que não têm saldo."""
+    reservadas = []
+    for indice in pendentes:
+        try:
+            reservar_estoque(session, saidas_da_venda(vendas[indice]))
+        except EstoqueInsuficienteError as e:
+            resultados[indice] = _falha(vendas[indice].codigo, str(e))
+        else:
+            reservadas.append(indice)
+    return reservadas
+
+
+def _falha(codigo, mensagem):
+    return {"codigo": codigo, "sucesso": False, "id": None, "mensagem": mensagem}
@@ -0,0 +1,93 @@
+"""Base dos testes: aplicação apontada para bancos SQLite descartáveis.
+
+O banco principal e o de arquivo ficam em um diretório temporário e são
+recriados a cada teste. Os testes são executados com nose2 (ou pytest):
+
+    python -m nose2 -s tests
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from sqlalchemy import event
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, RAIZ)
+
+DIRETORIO = tempfile.mkdtemp(prefix="vestsoft-testes-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DIRETORIO, 'testes.db')}"
+os.environ["DATABASE_ARQUIVO"] = os.path.join(DIRETORIO, "arquivo.db")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import app as aplicacao  # noqa: E402
+from database import db, init_db  # noqa: E402
+
+app = aplicacao.app
+
+
+class TesteApi(unittest.TestCase):
+    """Cada teste começa com os bancos vazios, o cache de produtos limpo e um app context ativo."""
+
+    def setUp(self):
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+        shutil.rmtree(DIRETORIO, ignore_errors=True)
+        os.makedirs(DIRETORIO)
+        # Os ids dos produtos recomeçam em cada banco novo
+        aplicacao.produto_cache.limpar()
+
+        self.contexto = app.app_context()
+        self.contexto.push()
+        init_db()
+        self.cliente = app.test_client()
+
+    def tearDown(self):
+        db.session.remove()
+        self.contexto.pop()
+
+    def criar_produto(self, nome="Camiseta", preco=10.0):
+        resposta = self.cliente.post("/produtos", json={"nome": nome, "descricao": f"{nome} básica", "preco": preco})
+        self.assertEqual(resposta.status_code, 201, resposta.get_data(as_text=True))
+        return resposta.get_json()["produto"]["id"]
+
+    def criar_estoque(self, produto_id, quantidade, data_entrada="2026-01-10T10:00:00", numero_nota_fiscal="NF1"):
+        resposta = self.cliente.post("/estoques", json={
+            "produto_id": produto_id, "quantidade": quantidade, "data_entrada": data_entrada,
+            "numero_nota_fiscal": numero_nota_fiscal})
+        self.assertEqual(resposta.status_code, 201, resposta.get_data(as_text=True))
+        return resposta.get_json()["id"]
+
+    def criar_venda(self, codigo, itens, pagamentos=None):
+        resposta = self.cliente.post("/vendas", json={
+            "codigo": codigo,
+            "itens": [{"produto_id": produto_id, "quantidade": quantidade, "preco": preco}
+                      for produto_id, quantidade, preco in itens],
+            "pagamentos": pagamentos or []})
+        self.assertEqual(resposta.status_code, 201, resposta.get_data(as_text=True))
+        return resposta.get_json()["venda"]["id"]
+
+    def saldos(self):
+        """Saldo de cada produto pela listagem de GET /produtos: id -> saldo."""
+        resposta = self.cliente.get("/produtos?limit=1000")
+        return {produto["id"]: produto["saldo"] for produto in resposta.get_json()["produtos"]}
+
+    def comandos_sql(self, url):
+        """Quantidade de comandos SQL executados por um GET (em todos os engines)."""
+        comandos = []
+
+        def _contar(*_):
+            comandos.append(1)
+
+        engines = list(db.engines.values())
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", _contar)
+        try:
+            resposta = self.cliente.get(url)
+            self.assertEqual(resposta.status_code, 200, resposta.get_data(as_text=True))
+        finally:
+            for engine in engines:
+                event.remove(engine, "before_cursor_execute", _contar)
+        return len(comandos)
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+from base import TesteApi
+
+from database import db
+from models.venda import Venda
+from services.arquivo import arquivar_vendas
+from services.contadores import reconciliar_contadores
+from services.rollup import reconstruir_rollups
+from services.saldo import recalcular_saldos
+
+
+class TesteArquivo(TesteApi):
+    def setUp(self):
+        super().setUp()
+        self.produto_id = self.criar_produto()
+        self.criar_estoque(self.produto_id, 20)
+        for i in range(4):
+            self.criar_venda(f"v{i}", [(self.produto_id, 2, 10.0)], [{"forma": "pix", "valor": 20.0}])
+
+        # As três primeiras vendas passam a ser de 400 dias atrás
+        antiga = datetime.utcnow() - timedelta(days=400)
+        db.session.query(Venda).filter(Venda.codigo.in_(["v0", "v1", "v2"])).update(
+            {Venda.data: antiga}, synchronize_session=False)
+        db.session.commit()
+        reconstruir_rollups(db.session)
+
+        self.registro = arquivar_vendas(db.session, datetime.utcnow() - timedelta(days=365))
+
+    def test_vendas_antigas_sao_movidas_com_itens_e_pagamentos(self):
+        self.assertEqual((self.registro.vendas, self.registro.itens, self.registro.pagamentos), (3, 3, 3))
+        self.assertEqual([venda["codigo"] for venda in self.cliente.get("/vendas").get_json()["vendas"]], ["v3"])
+
+        self.assertEqual(self.cliente.get("/venda?codigo=v0").status_code, 404)
+        resposta = self.cliente.get("/venda?codigo=v0&incluir_arquivadas=1")
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(len(resposta.get_json()["itens"]), 1)
+        self.assertEqual(len(self.cliente.get("/vendas?incluir_arquivadas=1").get_json()["vendas"]), 4)
+
+    def test_saldos_e_contadores_incluem_as_vendas_arquivadas(self):
+        self.assertEqual(self.saldos(), {self.produto_id: 12})
+        self.assertEqual(recalcular_saldos(db.session, corrigir=False), [])
+        self.assertEqual(reconciliar_contadores(db.session, corrigir=False), [])
+
+    def test_codigo_arquivado_nao_pode_ser_reutilizado(self):
+        item = [{"produto_id": self.produto_id, "quantidade": 1, "preco": 1.0}]
+        resposta = self.cliente.post("/vendas", json={"codigo": "v1", "itens": item})
+        self.assertEqual(resposta.status_code, 400)
+
+        resposta = self.cliente.post("/vendas/lote", json={"vendas": [
+            {"codigo": "v1", "itens": item}, {"codigo": "v9", "itens": item}]})
+        self.assertEqual([resultado["sucesso"] for resultado in resposta.get_json()["resultados"]], [False, True])
+
+    def test_horizonte_no_meio_do_dia_nao_desfalca_os_rollups(self):
+        # Duas vendas no mesmo dia, antes e depois do horário do horizonte, e uma venda atual
+        dia = datetime.combine(datetime.utcnow().date() - timedelta(days=10), datetime.min.time())
+        self.criar_estoque(self.produto_id, 10)
+        for codigo, hora in (("m1", 9), ("m2", 15)):
+            venda_id = self.criar_venda(codigo, [(self.produto_id, 1, 5.0)])
+            db.session.query(Venda).filter(Venda.id == venda_id).update(
+                {Venda.data: dia.replace(hour=hora)}, synchronize_session=False)
+        db.session.commit()
+        self.criar_venda("m3", [(self.produto_id, 1, 5.0)])
+        reconstruir_rollups(db.session)
+
+        registro = arquivar_vendas(db.session, dia.replace(hour=12))
+        self.assertEqual((registro.horizonte, registro.vendas), (dia, 0))
+        reconstruir_rollups(db.session)
+
+        resposta = self.cliente.get(f"/vendas/relatorio?de={dia.date()}&ate={dia.date()}")
+        self.assertEqual([periodo["vendas"] for periodo in resposta.get_json()["periodos"]], [2])
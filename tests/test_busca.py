@@ -0,0 +1,51 @@
+from unittest import mock
+
+from base import TesteApi
+
+from services import busca
+
+
+class TesteBusca(TesteApi):
+    def buscar(self, q, **parametros):
+        resposta = self.cliente.get("/produtos/busca", query_string=dict(parametros, q=q))
+        self.assertEqual(resposta.status_code, 200, resposta.get_data(as_text=True))
+        return resposta.get_json()
+
+    def ids(self, q, **parametros):
+        return [produto["id"] for produto in self.buscar(q, **parametros)["produtos"]]
+
+    def test_prefixos_sem_acentos_e_relevancia(self):
+        regata = self.criar_produto("Regata de algodão")
+        camisa = self.criar_produto("Camisa de algodão")
+        self.cliente.put("/produto", json={"id": regata, "nome": "Regata", "descricao": "camisa de algodão",
+                                           "preco": 1.0})
+
+        # "Camisa" no nome pesa mais que na descrição
+        self.assertEqual(self.ids("cami"), [camisa, regata])
+        self.assertEqual(self.ids("cami algodao"), [camisa, regata])
+        self.assertEqual(self.ids("calça"), [])
+
+    def test_gatilhos_mantem_o_indice_sincronizado(self):
+        produto_id = self.criar_produto("Camiseta")
+        self.assertEqual(self.ids("camiseta"), [produto_id])
+
+        self.cliente.put("/produto", json={"id": produto_id, "nome": "Bermuda", "descricao": "d", "preco": 1.0})
+        self.assertEqual(self.ids("camiseta"), [])
+        self.assertEqual(self.ids("bermuda"), [produto_id])
+
+        self.cliente.delete(f"/produto?id={produto_id}")
+        self.assertEqual(self.ids("bermuda"), [])
+
+    def test_paginacao_pela_relevancia(self):
+        criados = {self.criar_produto(f"Meia {i}") for i in range(5)}
+        primeira = self.buscar("meia", limit=3)
+        segunda = self.buscar("meia", limit=3, after=primeira["proximo_cursor"])
+        self.assertIsNone(segunda["proximo_cursor"])
+        self.assertEqual({produto["id"] for produto in primeira["produtos"] + segunda["produtos"]}, criados)
+
+    def test_alternativa_sem_fts_usa_like(self):
+        camiseta = self.criar_produto("Camiseta")
+        self.criar_produto("Bermuda")
+        with mock.patch.object(busca, "busca_textual_disponivel", return_value=False):
+            corpo = self.buscar("cami")
+        self.assertEqual([(produto["id"], produto["nome"]) for produto in corpo["produtos"]], [(camiseta, "Camiseta")])
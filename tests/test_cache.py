@@ -0,0 +1,22 @@
+from base import TesteApi, aplicacao
+
+
+class TesteCacheProdutos(TesteApi):
+    def test_acerto_nao_consulta_o_banco(self):
+        produto_id = self.criar_produto()
+        self.assertGreater(self.comandos_sql(f"/produto?id={produto_id}"), 0)
+        self.assertEqual(self.comandos_sql(f"/produto?id={produto_id}"), 0)
+
+    def test_escrita_remove_apenas_o_produto_alterado(self):
+        camiseta, calca = self.criar_produto("Camiseta"), self.criar_produto("Calça")
+        self.cliente.get(f"/produto?id={camiseta}")
+        self.cliente.get(f"/produto?id={calca}")
+
+        resposta = self.cliente.put("/produto", json={"id": camiseta, "nome": "Regata", "descricao": "d", "preco": 1.0})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertIsNone(aplicacao.produto_cache.obter(aplicacao.chave_produto(camiseta)))
+        self.assertEqual(self.comandos_sql(f"/produto?id={calca}"), 0)
+        self.assertEqual(self.cliente.get(f"/produto?id={camiseta}").get_json()["nome"], "Regata")
+
+        self.assertEqual(self.cliente.delete(f"/produto?id={calca}").status_code, 200)
+        self.assertEqual(self.cliente.get(f"/produto?id={calca}").status_code, 404)
@@ -0,0 +1,22 @@
+from base import TesteApi
+
+from database import db
+from models.contador import Contador
+from services.contadores import TOTAL_PRODUTOS, TOTAL_SAIDAS_ESTOQUE, reconciliar_contadores
+
+
+class TesteContadores(TesteApi):
+    def test_contador_ausente_equivale_a_zero(self):
+        produto_id = self.criar_produto()
+        self.criar_estoque(produto_id, 5)
+        # Sem vendas, total_saidas_estoque e valor_total_vendas ainda não existem
+        self.assertIsNone(db.session.get(Contador, TOTAL_SAIDAS_ESTOQUE))
+        self.assertEqual(reconciliar_contadores(db.session, corrigir=False), [])
+
+    def test_divergencia_e_corrigida(self):
+        self.criar_produto()
+        db.session.get(Contador, TOTAL_PRODUTOS).valor = 7
+        db.session.commit()
+
+        self.assertEqual(reconciliar_contadores(db.session), [(TOTAL_PRODUTOS, 7, 1)])
+        self.assertEqual(self.cliente.get("/produtos/total").get_json()["total"], 1)
@@ -0,0 +1,16 @@
+import json
+
+from base import TesteApi
+
+
+class TesteEstoques(TesteApi):
+    def test_ndjson_usa_o_formato_da_listagem_json(self):
+        produto_id = self.criar_produto()
+        for quantidade in (3, 4):
+            self.criar_estoque(produto_id, quantidade)
+
+        listagem = self.cliente.get(f"/estoques?produto_id={produto_id}").get_json()["estoques"]
+        resposta = self.cliente.get(f"/estoques?produto_id={produto_id}&stream=1")
+        self.assertEqual(resposta.mimetype, "application/x-ndjson")
+        self.assertEqual([json.loads(linha) for linha in resposta.get_data(as_text=True).splitlines()], listagem)
+        self.assertEqual(listagem[0]["data_entrada"], "Sat, 10 Jan 2026 10:00:00 GMT")
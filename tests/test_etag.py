@@ -0,0 +1,67 @@
+from base import TesteApi, aplicacao
+
+from database import db
+from models.saldoProduto import SaldoProduto
+from services.saldo import recalcular_saldos
+
+
+class TesteEtag(TesteApi):
+    def etag(self, url):
+        resposta = self.cliente.get(url)
+        self.assertEqual(resposta.status_code, 200)
+        return resposta.headers["ETag"]
+
+    def test_listagem_inalterada_responde_304(self):
+        self.criar_produto()
+        etag = self.etag("/produtos")
+        resposta = self.cliente.get("/produtos", headers={"If-None-Match": etag})
+        self.assertEqual(resposta.status_code, 304)
+        self.assertEqual(resposta.headers["ETag"], etag)
+
+    def test_etag_varia_com_a_url(self):
+        self.criar_produto()
+        self.assertNotEqual(self.etag("/produtos"), self.etag("/produtos?limit=1"))
+
+    def test_escritas_invalidam_a_etag(self):
+        produto_id = self.criar_produto()
+        etag = self.etag("/produtos")
+        self.criar_estoque(produto_id, 5)
+        self.assertEqual(self.cliente.get("/produtos", headers={"If-None-Match": etag}).status_code, 200)
+
+        etag = self.etag("/produtos")
+        self.criar_venda("v1", [(produto_id, 1, 10.0)])
+        self.assertEqual(self.cliente.get("/produtos", headers={"If-None-Match": etag}).status_code, 200)
+
+        etag_estoques = self.etag(f"/estoques?produto_id={produto_id}")
+        self.criar_estoque(produto_id, 1)
+        self.assertEqual(self.cliente.get(f"/estoques?produto_id={produto_id}",
+                                          headers={"If-None-Match": etag_estoques}).status_code, 200)
+
+    def test_corpo_nao_vem_do_cache_desatualizado(self):
+        produto_id = self.criar_produto("Camiseta")
+        self.assertEqual(self.cliente.get(f"/produto?id={produto_id}").get_json()["nome"], "Camiseta")
+        etag = self.etag("/produtos")
+        # Entrada antiga que outro worker ainda manteria no seu cache local
+        entrada_antiga = aplicacao.produto_cache.obter(aplicacao.chave_produto(produto_id))
+
+        resposta = self.cliente.put("/produto", json={"id": produto_id, "nome": "Regata", "descricao": "d", "preco": 1.0})
+        self.assertEqual(resposta.status_code, 200)
+        resposta = self.cliente.get("/produtos")
+        self.assertNotEqual(resposta.headers["ETag"], etag)
+        self.assertEqual(resposta.get_json()["produtos"][0]["nome"], "Regata")
+
+        aplicacao.produto_cache.definir(aplicacao.chave_produto(produto_id), entrada_antiga)
+        self.assertEqual(self.cliente.get("/produtos").get_json()["produtos"][0]["nome"], "Regata")
+        self.assertEqual(self.cliente.get("/produtos/busca?q=regata").get_json()["produtos"][0]["nome"], "Regata")
+
+    def test_correcao_de_saldos_invalida_a_etag(self):
+        produto_id = self.criar_produto()
+        self.criar_estoque(produto_id, 5)
+        db.session.query(SaldoProduto).update({SaldoProduto.total_entradas: 99})
+        db.session.commit()
+        etag = self.etag("/produtos")
+
+        recalcular_saldos(db.session)
+        resposta = self.cliente.get("/produtos", headers={"If-None-Match": etag})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.get_json()["produtos"][0]["saldo"], 5)
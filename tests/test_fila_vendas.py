@@ -0,0 +1,89 @@
+import threading
+
+from base import TesteApi, aplicacao
+
+from database import db
+from models.venda import Venda
+from schemas.venda import VendaSchema
+from services.fila_vendas import FilaEscritaVendas, ResultadoDesconhecidoError, TempoEsgotadoError
+
+
+class FilaTravada(FilaEscritaVendas):
+    """Fila cuja thread escritora só grava o grupo depois de liberada."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.gravando = threading.Event()
+        self.liberar = threading.Event()
+
+    def _gravar(self, grupo):
+        self.gravando.set()
+        self.liberar.wait(5)
+        super()._gravar(grupo)
+
+
+class TesteFilaVendas(TesteApi):
+    def setUp(self):
+        super().setUp()
+        self.produto_id = self.criar_produto()
+
+    def venda(self, codigo):
+        return VendaSchema(codigo=codigo, itens=[{"produto_id": self.produto_id, "quantidade": 1, "preco": 2.0}])
+
+    def registrar_em_paralelo(self, fila, codigos):
+        resultados = [None] * len(codigos)
+
+        def _registrar(indice):
+            resultados[indice] = fila.registrar(self.venda(codigos[indice])).resultado
+
+        threads = [threading.Thread(target=_registrar, args=(indice,)) for indice in range(len(codigos))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return resultados
+
+    def test_vendas_concorrentes_recebem_o_proprio_resultado(self):
+        fila = FilaEscritaVendas(aplicacao.app, db, tamanho_grupo=10, espera_ms=50)
+        resultados = self.registrar_em_paralelo(fila, ["g1", "g2", "g3", "g3"])
+
+        # Uma das duas vendas g3 é rejeitada pelo código repetido
+        self.assertEqual(sorted(resultado["sucesso"] for resultado in resultados), [False, True, True, True])
+        ids = dict(db.session.query(Venda.codigo, Venda.id))
+        self.assertEqual({resultado["codigo"]: resultado["id"] for resultado in resultados if resultado["sucesso"]},
+                         ids)
+        self.assertEqual(self.saldos(), {self.produto_id: -3})
+
+    def test_prazo_esgotado_tem_resultado_deterministico(self):
+        fila = FilaTravada(aplicacao.app, db, tamanho_grupo=1, espera_ms=0, timeout=0.2)
+
+        # O grupo de t1 fica em gravação além do prazo; t2 esgota o prazo ainda na fila
+        with self.assertRaises(ResultadoDesconhecidoError):
+            fila.registrar(self.venda("t1"))
+        self.assertTrue(fila.gravando.is_set())
+        with self.assertRaises(TempoEsgotadoError):
+            fila.registrar(self.venda("t2"))
+
+        fila.liberar.set()
+        # Uma nova venda só é gravada depois da fila ter descartado t2
+        fila.timeout = 5
+        self.assertTrue(fila.registrar(self.venda("t3")).resultado["sucesso"])
+        db.session.remove()
+        self.assertEqual({codigo for (codigo,) in db.session.query(Venda.codigo)}, {"t1", "t3"})
+
+    def test_endpoint_responde_202_com_a_gravacao_em_andamento(self):
+        fila = FilaTravada(aplicacao.app, db, tamanho_grupo=1, espera_ms=0, timeout=0.2)
+        fila_original, aplicacao.fila_vendas = aplicacao.fila_vendas, fila
+        try:
+            resposta = self.cliente.post("/vendas", json=self.venda("e1").dict())
+            self.assertEqual(resposta.status_code, 202)
+            self.assertEqual(resposta.get_json()["codigo"], "e1")
+
+            resposta = self.cliente.post("/vendas", json=self.venda("e2").dict())
+            self.assertEqual(resposta.status_code, 503)
+        finally:
+            fila.liberar.set()
+            aplicacao.fila_vendas = fila_original
+        # Aguarda a gravação de e1 antes que o próximo teste recrie o banco
+        fila.timeout = 5
+        self.assertTrue(fila.registrar(self.venda("e3")).resultado["sucesso"])
@@ -0,0 +1,46 @@
+import io
+
+from base import TesteApi
+
+from database import db
+from services.saldo import recalcular_saldos
+
+CABECALHO = "produto_id,quantidade,data_entrada,numero_nota_fiscal\n"
+
+
+class TesteImportacao(TesteApi):
+    def importar(self, linhas, tamanho_lote=500):
+        resposta = self.cliente.post("/estoques/importar", data={
+            "arquivo": (io.BytesIO((CABECALHO + "".join(linhas)).encode()), "nota.csv"),
+            "tamanho_lote": tamanho_lote}, content_type="multipart/form-data")
+        self.assertEqual(resposta.status_code, 200, resposta.get_data(as_text=True))
+        return resposta.get_json()
+
+    def test_importa_linhas_validas_e_rejeita_as_invalidas(self):
+        produto_id = self.criar_produto()
+        relatorio = self.importar([
+            f"{produto_id},5,2026-01-10T10:00:00,NF1\n",
+            f"{produto_id},0,2026-01-10T10:00:00,NF1\n",
+            "999,3,2026-01-10T10:00:00,NF1\n",
+            f"{produto_id},x,2026-01-10T10:00:00,NF1\n",
+            f"{produto_id},2,,NF1\n",
+        ], tamanho_lote=2)
+
+        self.assertEqual((relatorio["importadas"], relatorio["rejeitadas"]), (2, 3))
+        self.assertEqual([rejeicao["linha"] for rejeicao in relatorio["rejeicoes"]], [3, 4, 5])
+        self.assertEqual(self.saldos(), {produto_id: 7})
+        self.assertEqual(recalcular_saldos(db.session, corrigir=False), [])
+
+    def test_datas_com_e_sem_fuso_no_mesmo_bloco(self):
+        produto_id = self.criar_produto()
+        relatorio = self.importar([
+            f"{produto_id},1,2026-01-10T10:00:00,NF1\n",
+            f"{produto_id},2,2026-01-09T10:00:00-03:00,NF1\n",
+        ])
+        self.assertEqual(relatorio["importadas"], 2)
+        self.assertEqual(self.saldos(), {produto_id: 3})
+
+    def test_colunas_ausentes(self):
+        resposta = self.cliente.post("/estoques/importar", data={
+            "arquivo": (io.BytesIO(b"produto_id,quantidade\n1,2\n"), "nota.csv")}, content_type="multipart/form-data")
+        self.assertEqual(resposta.status_code, 400)
@@ -0,0 +1,37 @@
+from base import TesteApi
+
+
+class TestePaginacao(TesteApi):
+    def percorrer(self, url, chave):
+        ids, cursor, paginas = [], None, 0
+        while True:
+            resposta = self.cliente.get(url + (f"&after={cursor}" if cursor else ""))
+            self.assertEqual(resposta.status_code, 200)
+            corpo = resposta.get_json()
+            ids += [item["id"] for item in corpo[chave]]
+            paginas += 1
+            cursor = corpo["proximo_cursor"]
+            if not cursor:
+                return ids, paginas
+
+    def test_produtos_percorridos_pelo_cursor(self):
+        criados = [self.criar_produto(f"Produto {i}") for i in range(25)]
+        ids, paginas = self.percorrer("/produtos?limit=10", "produtos")
+        self.assertEqual(ids, criados)
+        self.assertEqual(paginas, 3)
+
+    def test_pagina_exata_nao_gera_proximo_cursor(self):
+        for i in range(10):
+            self.criar_produto(f"Produto {i}")
+        self.assertIsNone(self.cliente.get("/produtos?limit=10").get_json()["proximo_cursor"])
+
+    def test_vendas_percorridas_pelo_cursor(self):
+        produto_id = self.criar_produto()
+        criadas = [self.criar_venda(f"v{i}", [(produto_id, 1, 5.0)]) for i in range(7)]
+        ids, paginas = self.percorrer("/vendas?limit=3", "vendas")
+        self.assertEqual(ids, criadas)
+        self.assertEqual(paginas, 3)
+
+    def test_cursor_invalido(self):
+        for url in ("/produtos?after=invalido", "/vendas?after=invalido", "/produtos/busca?q=a&after=invalido"):
+            self.assertEqual(self.cliente.get(url).status_code, 400, url)
@@ -0,0 +1,24 @@
+from base import TesteApi, app
+
+from benchmarks.gerador import gerar_dados
+from database import db
+from services.planos import amostra_do_banco, planos_dos_endpoints, requisicoes_monitoradas, varredura_completa
+
+
+class TestePlanos(TesteApi):
+    def test_consultas_dos_endpoints_usam_indices(self):
+        gerar_dados(db.session, produtos=50, estoques=500, vendas=200, semente=1)
+        requisicoes = requisicoes_monitoradas(amostra_do_banco(db.session), escrita=True)
+        planos = planos_dos_endpoints(app, db.engines.values(), requisicoes)
+
+        # Todas as requisições executaram SQL e tiveram os planos capturados
+        self.assertEqual({nome for nome, _, _ in planos}, {nome for nome, _, _, _ in requisicoes})
+        problemas = [f"{nome}: {statement} -> {plano}" for nome, statement, plano in planos
+                     if varredura_completa(plano)]
+        self.assertEqual(problemas, [])
+
+    def test_varredura_completa_e_detectada(self):
+        self.assertTrue(varredura_completa(["SCAN estoque"]))
+        self.assertFalse(varredura_completa(["SEARCH estoque USING COVERING INDEX ix_estoque_produto_id_data_entrada (produto_id=?)"]))
+        self.assertFalse(varredura_completa(["SCAN contador"]))
+        self.assertFalse(varredura_completa(["MATERIALIZE anon_1", "SCAN anon_1"]))
@@ -0,0 +1,80 @@
+from datetime import date, datetime
+
+from base import TesteApi
+
+from database import db
+from models.venda import Venda
+from models.vendaDiaria import VendaDiaria, VendaProdutoDiaria
+from services.rollup import reconstruir_rollups
+
+
+class TesteRollup(TesteApi):
+    def setUp(self):
+        super().setUp()
+        self.camiseta, self.calca = self.criar_produto("Camiseta"), self.criar_produto("Calça")
+
+    def rollups(self):
+        return (sorted(db.session.query(VendaDiaria.dia, VendaDiaria.quantidade, VendaDiaria.receita,
+                                        VendaDiaria.vendas)),
+                sorted(db.session.query(VendaProdutoDiaria.dia, VendaProdutoDiaria.produto_id,
+                                        VendaProdutoDiaria.quantidade, VendaProdutoDiaria.receita,
+                                        VendaProdutoDiaria.vendas)))
+
+    def relatorio(self, url):
+        resposta = self.cliente.get(url)
+        self.assertEqual(resposta.status_code, 200, resposta.get_data(as_text=True))
+        return [(periodo["inicio"], periodo["quantidade"], periodo["receita"], periodo["vendas"])
+                for periodo in resposta.get_json()["periodos"]]
+
+    def test_rollups_mantidos_a_cada_venda_equivalem_a_reconstrucao(self):
+        self.criar_venda("v1", [(self.camiseta, 2, 10.0), (self.calca, 1, 50.0)])
+        self.criar_venda("v2", [(self.camiseta, 1, 10.0), (self.camiseta, 1, 12.0)])
+        self.cliente.post("/vendas/lote", json={"vendas": [
+            {"codigo": "l1", "itens": [{"produto_id": self.calca, "quantidade": 3, "preco": 40.0}]}]})
+
+        mantidos = self.rollups()
+        hoje = datetime.utcnow().date()
+        self.assertEqual(mantidos[0], [(hoje, 8, 212.0, 3)])
+        self.assertEqual(reconstruir_rollups(db.session), 1)
+        self.assertEqual(self.rollups(), mantidos)
+
+    def test_relatorio_por_dia_semana_mes_e_produto(self):
+        for codigo, dia, itens in (
+            ("v1", datetime(2026, 3, 2, 10), [(self.camiseta, 1, 10.0)]),
+            ("v2", datetime(2026, 3, 4, 10), [(self.camiseta, 2, 10.0), (self.calca, 1, 50.0)]),
+            ("v3", datetime(2026, 3, 10, 10), [(self.calca, 1, 50.0)]),
+            ("v4", datetime(2026, 4, 1, 10), [(self.camiseta, 1, 10.0)]),
+        ):
+            venda_id = self.criar_venda(codigo, itens)
+            db.session.query(Venda).filter(Venda.id == venda_id).update({Venda.data: dia},
+                                                                         synchronize_session=False)
+        db.session.commit()
+        reconstruir_rollups(db.session)
+
+        periodo = "de=2026-03-01&ate=2026-04-30"
+        self.assertEqual(self.relatorio(f"/vendas/relatorio?{periodo}"), [
+            ("2026-03-02", 1, 10.0, 1), ("2026-03-04", 3, 70.0, 1), ("2026-03-10", 1, 50.0, 1),
+            ("2026-04-01", 1, 10.0, 1)])
+        self.assertEqual(self.relatorio(f"/vendas/relatorio?{periodo}&granularidade=semana"), [
+            ("2026-03-02", 4, 80.0, 2), ("2026-03-09", 1, 50.0, 1), ("2026-03-30", 1, 10.0, 1)])
+        self.assertEqual(self.relatorio(f"/vendas/relatorio?{periodo}&granularidade=mes"), [
+            ("2026-03-01", 5, 130.0, 3), ("2026-04-01", 1, 10.0, 1)])
+        self.assertEqual(self.relatorio(f"/vendas/relatorio?{periodo}&granularidade=mes&produto_id={self.calca}"), [
+            ("2026-03-01", 2, 100.0, 2)])
+        self.assertEqual(self.cliente.get("/vendas/relatorio?de=2026-04-30&ate=2026-03-01").status_code, 400)
+
+    def test_reconstrucao_de_um_periodo_preserva_os_demais_dias(self):
+        venda_id = self.criar_venda("v1", [(self.camiseta, 1, 10.0)])
+        db.session.query(Venda).filter(Venda.id == venda_id).update({Venda.data: datetime(2026, 1, 5, 10)},
+                                                                     synchronize_session=False)
+        db.session.commit()
+        reconstruir_rollups(db.session)
+        self.criar_venda("v2", [(self.camiseta, 1, 10.0)])
+
+        # Rollup de 05/01 adulterado fora do período reconstruído permanece como está
+        db.session.query(VendaDiaria).filter(VendaDiaria.dia == date(2026, 1, 5)).update({VendaDiaria.vendas: 9})
+        db.session.commit()
+        hoje = datetime.utcnow().date()
+        reconstruir_rollups(db.session, de=hoje, ate=hoje)
+        self.assertEqual([(dia, vendas) for dia, _, _, vendas in self.rollups()[0]],
+                         [(date(2026, 1, 5), 9), (hoje, 1)])
@@ -0,0 +1,64 @@
+import os
+from unittest import mock
+
+from base import TesteApi
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+
+from config import url_leitura
+from database import BIND_LEITURA, db
+from models.produto import Produto
+
+
+class TesteRoteamento(TesteApi):
+    def engines_usados(self, metodo, url, **kwargs):
+        """Nomes dos engines ("primario"/"leitura") que executaram SQL na requisição."""
+        usados = set()
+        engines = {"primario": db.engine, "leitura": db.engines[BIND_LEITURA]}
+        ouvintes = {nome: (lambda *_, nome=nome: usados.add(nome)) for nome in engines}
+        for nome, engine in engines.items():
+            event.listen(engine, "before_cursor_execute", ouvintes[nome])
+        try:
+            resposta = self.cliente.open(url, method=metodo, **kwargs)
+            self.assertLess(resposta.status_code, 400, resposta.get_data(as_text=True))
+        finally:
+            for nome, engine in engines.items():
+                event.remove(engine, "before_cursor_execute", ouvintes[nome])
+        return usados
+
+    def test_get_le_do_engine_de_leitura_e_escritas_vao_ao_primario(self):
+        produto_id = self.criar_produto()
+        self.assertEqual(self.engines_usados("GET", "/produtos"), {"leitura"})
+        self.assertEqual(self.engines_usados("GET", f"/estoques?produto_id={produto_id}"), {"leitura"})
+        self.assertEqual(self.engines_usados("POST", "/produtos", json={"nome": "Calça", "descricao": "d",
+                                                                        "preco": 1.0}), {"primario"})
+
+    def test_cabecalho_x_ler_primario(self):
+        self.criar_produto()
+        self.assertEqual(self.engines_usados("GET", "/produtos", headers={"X-Ler-Primario": "1"}), {"primario"})
+
+    def test_sessao_passa_ao_primario_apos_a_primeira_escrita(self):
+        db.session.info["leitura"] = True
+        self.assertIs(db.session.get_bind(clause=db.select(Produto)), db.engines[BIND_LEITURA])
+
+        db.session.add(Produto(nome="Camiseta", descricao="d", preco=1.0))
+        db.session.flush()
+        self.assertIs(db.session.get_bind(clause=db.select(Produto)), db.engine)
+        db.session.rollback()
+
+    def test_engine_de_leitura_e_somente_leitura(self):
+        with db.engines[BIND_LEITURA].connect() as conexao:
+            with self.assertRaises(OperationalError):
+                conexao.execute(text("DELETE FROM produto"))
+
+    def test_url_de_leitura(self):
+        arquivo = "sqlite:////tmp/vestsoft.db"
+        with mock.patch.dict(os.environ, {"DB_ROTEAR_LEITURAS": "1"}):
+            self.assertEqual(url_leitura(arquivo), arquivo)
+            self.assertIsNone(url_leitura("sqlite://"))
+            self.assertIsNone(url_leitura("postgresql://servidor/vestsoft"))
+        with mock.patch.dict(os.environ, {"DATABASE_URL_LEITURA": "postgresql://replica/vestsoft"}):
+            self.assertEqual(url_leitura("postgresql://servidor/vestsoft"), "postgresql://replica/vestsoft")
+        with mock.patch.dict(os.environ, {"DB_ROTEAR_LEITURAS": "0"}):
+            self.assertIsNone(url_leitura(arquivo))
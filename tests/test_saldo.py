@@ -0,0 +1,93 @@
+from base import TesteApi
+
+from database import db
+from models.saldoProduto import SaldoProduto
+from services.saldo import recalcular_saldos
+
+
+class TesteSaldo(TesteApi):
+    def test_saldo_acompanha_entradas_e_vendas(self):
+        camiseta, calca = self.criar_produto("Camiseta"), self.criar_produto("Calça")
+        estoque_id = self.criar_estoque(camiseta, 10)
+        self.criar_estoque(calca, 4)
+        self.criar_venda("v1", [(camiseta, 3, 10.0), (calca, 1, 50.0)])
+        self.assertEqual(self.saldos(), {camiseta: 7, calca: 3})
+
+        # Alteração da entrada move a quantidade para o outro produto
+        resposta = self.cliente.put("/estoque", json={
+            "id": estoque_id, "produto_id": calca, "quantidade": 6,
+            "data_entrada": "2026-01-10T10:00:00", "numero_nota_fiscal": "NF1"})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(self.saldos(), {camiseta: -3, calca: 9})
+
+        self.assertEqual(self.cliente.delete(f"/estoque?id={estoque_id}").status_code, 200)
+        self.assertEqual(self.saldos(), {camiseta: -3, calca: 3})
+        self.assertEqual(recalcular_saldos(db.session, corrigir=False), [])
+
+    def test_venda_em_lote_debita_o_saldo(self):
+        produto_id = self.criar_produto()
+        self.criar_estoque(produto_id, 10)
+        resposta = self.cliente.post("/vendas/lote", json={"vendas": [
+            {"codigo": f"l{i}", "itens": [{"produto_id": produto_id, "quantidade": 2, "preco": 1.0}]}
+            for i in range(3)]})
+        self.assertEqual(resposta.get_json()["registradas"], 3)
+        self.assertEqual(self.saldos(), {produto_id: 4})
+        self.assertEqual(recalcular_saldos(db.session, corrigir=False), [])
+
+    def test_linha_de_saldo_ausente_e_recriada_a_partir_do_historico(self):
+        produto_id = self.criar_produto()
+        self.criar_estoque(produto_id, 10)
+        self.criar_venda("v1", [(produto_id, 4, 10.0)])
+        db.session.query(SaldoProduto).delete()
+        db.session.commit()
+
+        self.criar_estoque(produto_id, 5)
+        self.assertEqual(self.saldos(), {produto_id: 11})
+        self.assertEqual(recalcular_saldos(db.session, corrigir=False), [])
+
+    def test_recalcular_saldos_corrige_divergencias(self):
+        produto_id = self.criar_produto()
+        self.criar_estoque(produto_id, 10)
+        db.session.query(SaldoProduto).update({SaldoProduto.total_entradas: 99})
+        db.session.commit()
+
+        self.assertEqual(recalcular_saldos(db.session), [(produto_id, 99, 10)])
+        self.assertEqual(self.saldos(), {produto_id: 10})
+
+    def test_venda_com_quantidade_nao_positiva_e_rejeitada(self):
+        produto_id = self.criar_produto()
+        self.criar_estoque(produto_id, 10)
+        for quantidade in (0, -5):
+            resposta = self.cliente.post("/vendas", json={
+                "codigo": f"q{quantidade}", "itens": [{"produto_id": produto_id, "quantidade": quantidade, "preco": 1.0}]})
+            self.assertEqual(resposta.status_code, 422)
+        self.assertEqual(self.saldos(), {produto_id: 10})
+
+    def test_produto_inexistente_e_rejeitado_sem_criar_saldo(self):
+        produto_id = self.criar_produto()
+        self.criar_estoque(produto_id, 10)
+        inexistente = produto_id + 1
+
+        resposta = self.cliente.post("/estoques", json={
+            "produto_id": inexistente, "quantidade": 5, "data_entrada": "2026-01-10T10:00:00",
+            "numero_nota_fiscal": "NF2"})
+        self.assertEqual(resposta.status_code, 404)
+        resposta = self.cliente.post("/vendas", json={
+            "codigo": "v1", "itens": [{"produto_id": inexistente, "quantidade": 1, "preco": 1.0}]})
+        self.assertEqual(resposta.status_code, 400)
+        resposta = self.cliente.post("/vendas/lote", json={"vendas": [
+            {"codigo": "l1", "itens": [{"produto_id": produto_id, "quantidade": 1, "preco": 1.0}]},
+            {"codigo": "l2", "itens": [{"produto_id": inexistente, "quantidade": 1, "preco": 1.0}]}]})
+        self.assertEqual([resultado["sucesso"] for resultado in resposta.get_json()["resultados"]], [True, False])
+        self.assertIsNone(db.session.get(SaldoProduto, inexistente))
+
+        # O próximo produto recebe o id recusado acima
+        self.assertEqual(self.criar_produto("Calça"), inexistente)
+        self.assertEqual(self.saldos(), {produto_id: 9, inexistente: 0})
+
+    def test_produto_cadastrado_sobre_linha_de_saldo_existente(self):
+        db.session.add(SaldoProduto(produto_id=1, total_entradas=3, total_saidas=0))
+        db.session.commit()
+        self.assertEqual(self.saldos(), {})
+        produto_id = self.criar_produto()
+        self.assertEqual(self.saldos(), {produto_id: 3})
@@ -0,0 +1,77 @@
+from datetime import datetime, time, timedelta
+
+from base import TesteApi
+
+from database import db
+from models.saldoProdutoDiario import SaldoProdutoDiario
+from models.venda import Venda
+from services.rollup import reconstruir_rollups
+from services.saldo_historico import gerar_checkpoints
+
+
+class TesteSaldoHistorico(TesteApi):
+    def setUp(self):
+        super().setUp()
+        hoje = datetime.utcnow().date()
+        self.dias = [hoje - timedelta(days=n) for n in (10, 9, 8)]
+        self.camiseta, self.calca = self.criar_produto("Camiseta"), self.criar_produto("Calça")
+        self.criar_estoque(self.camiseta, 10, self.momento(0))
+        self.criar_estoque(self.camiseta, 5, self.momento(2))
+        self.criar_estoque(self.calca, 7, self.momento(1))
+
+        venda_id = self.criar_venda("v1", [(self.camiseta, 3, 10.0)])
+        db.session.query(Venda).filter(Venda.id == venda_id).update(
+            {Venda.data: datetime.combine(self.dias[1], time(15))}, synchronize_session=False)
+        db.session.commit()
+        reconstruir_rollups(db.session)
+        gerar_checkpoints(db.session)
+
+    def momento(self, indice, hora=10):
+        return datetime.combine(self.dias[indice], time(hora)).isoformat()
+
+    def saldo(self, produto_id, dia):
+        resposta = self.cliente.get(f"/estoque/saldo?produto_id={produto_id}&data={dia}")
+        self.assertEqual(resposta.status_code, 200, resposta.get_data(as_text=True))
+        corpo = resposta.get_json()
+        return corpo["saldo"], corpo["checkpoint"]
+
+    def checkpoints(self):
+        return sorted(db.session.query(SaldoProdutoDiario.produto_id, SaldoProdutoDiario.dia,
+                                       SaldoProdutoDiario.saldo))
+
+    def test_saldo_ao_fim_de_cada_dia(self):
+        antes = self.dias[0] - timedelta(days=1)
+        self.assertEqual(self.saldo(self.camiseta, antes), (0, None))
+        self.assertEqual(self.saldo(self.camiseta, self.dias[0]), (10, str(self.dias[0])))
+        self.assertEqual(self.saldo(self.camiseta, self.dias[1]), (7, str(self.dias[1])))
+        self.assertEqual(self.saldo(self.camiseta, self.dias[2]), (12, str(self.dias[2])))
+        self.assertEqual(self.saldo(self.calca, self.dias[2]), (7, str(self.dias[1])))
+        self.assertEqual(self.cliente.get(f"/estoque/saldo?produto_id=99&data={antes}").status_code, 404)
+
+    def test_entrada_retroativa_refaz_apenas_os_checkpoints_do_produto(self):
+        checkpoints_calca = [checkpoint for checkpoint in self.checkpoints() if checkpoint[0] == self.calca]
+
+        self.criar_estoque(self.camiseta, 4, self.momento(0, hora=18), numero_nota_fiscal="NF2")
+        self.assertEqual(self.saldo(self.camiseta, self.dias[1]), (11, str(self.dias[1])))
+        self.assertEqual([checkpoint for checkpoint in self.checkpoints() if checkpoint[0] == self.calca],
+                         checkpoints_calca)
+
+        incrementais = self.checkpoints()
+        gerar_checkpoints(db.session, reconstruir=True)
+        self.assertEqual(incrementais, self.checkpoints())
+
+    def test_alteracao_e_exclusao_de_entrada_refazem_os_checkpoints(self):
+        estoque_id = self.criar_estoque(self.camiseta, 2, self.momento(1), numero_nota_fiscal="NF3")
+        resposta = self.cliente.put("/estoque", json={
+            "id": estoque_id, "produto_id": self.calca, "quantidade": 2, "data_entrada": self.momento(0),
+            "numero_nota_fiscal": "NF3"})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(self.saldo(self.camiseta, self.dias[2]), (12, str(self.dias[2])))
+        self.assertEqual(self.saldo(self.calca, self.dias[0]), (2, str(self.dias[0])))
+
+        self.assertEqual(self.cliente.delete(f"/estoque?id={estoque_id}").status_code, 200)
+        self.assertEqual(self.saldo(self.calca, self.dias[2]), (7, str(self.dias[1])))
+
+        incrementais = self.checkpoints()
+        gerar_checkpoints(db.session, reconstruir=True)
+        self.assertEqual(incrementais, self.checkpoints())
@@ -0,0 +1,58 @@
+from base import TesteApi
+
+FRETE = {"cep": "01001-000", "logradouro": "Praça da Sé", "numero": 10, "bairro": "Sé", "cidade": "São Paulo",
+         "uf": "SP"}
+
+
+class TesteVendas(TesteApi):
+    def setUp(self):
+        super().setUp()
+        self.camiseta, self.calca = self.criar_produto("Camiseta"), self.criar_produto("Calça")
+
+    def registrar(self, codigo, frete=None):
+        resposta = self.cliente.post("/vendas", json={
+            "codigo": codigo, "frete": frete,
+            "itens": [{"produto_id": self.camiseta, "quantidade": 1, "preco": 10.0},
+                      {"produto_id": self.calca, "quantidade": 2, "preco": 50.0}],
+            "pagamentos": [{"forma": "pix", "valor": 60.0}, {"forma": "dinheiro", "valor": 50.0}]})
+        self.assertEqual(resposta.status_code, 201, resposta.get_data(as_text=True))
+        return resposta.get_json()["venda"]["id"]
+
+    def test_listagem_traz_itens_pagamentos_e_frete(self):
+        self.registrar("v1", FRETE)
+        self.registrar("v2")
+
+        vendas = self.cliente.get("/vendas").get_json()["vendas"]
+        self.assertEqual([venda["codigo"] for venda in vendas], ["v1", "v2"])
+        self.assertEqual([(item["produto_id"], item["quantidade"]) for item in vendas[0]["itens"]],
+                         [(self.camiseta, 1), (self.calca, 2)])
+        self.assertEqual([pagamento["forma"] for pagamento in vendas[0]["pagamentos"]], ["pix", "dinheiro"])
+        self.assertEqual(vendas[0]["frete"]["cidade"], "São Paulo")
+        self.assertIsNone(vendas[1]["frete"])
+
+    def test_listagem_custa_tres_consultas_por_pagina(self):
+        for i in range(3):
+            self.registrar(f"v{i}")
+        poucas = self.comandos_sql("/vendas")
+        for i in range(3, 20):
+            self.registrar(f"v{i}")
+        self.assertEqual(self.comandos_sql("/vendas"), poucas)
+
+    def test_filtros_por_codigo_e_data(self):
+        self.registrar("v1")
+        self.registrar("v2")
+        self.assertEqual([venda["codigo"] for venda in self.cliente.get("/vendas?codigo=v2").get_json()["vendas"]],
+                         ["v2"])
+        self.assertEqual(self.cliente.get("/vendas?data_fim=2000-01-01T00:00:00").get_json()["vendas"], [])
+
+    def test_busca_por_id_ou_codigo(self):
+        venda_id = self.registrar("v1", FRETE)
+
+        por_id = self.cliente.get(f"/venda?id={venda_id}").get_json()
+        por_codigo = self.cliente.get("/venda?codigo=v1").get_json()
+        self.assertEqual(por_id, por_codigo)
+        self.assertEqual((por_id["codigo"], len(por_id["itens"]), len(por_id["pagamentos"])), ("v1", 2, 2))
+
+        self.assertEqual(self.cliente.get("/venda?codigo=inexistente").status_code, 404)
+        self.assertEqual(self.cliente.get(f"/venda?id={venda_id}&codigo=outra").status_code, 404)
+        self.assertEqual(self.cliente.get("/venda").status_code, 400)
@@ -0,0 +1,52 @@
+from unittest import mock
+
+from base import TesteApi
+
+from sqlalchemy.exc import OperationalError
+
+from database import db
+from models.venda import Venda
+from services import venda as servico_venda
+from services.saldo import recalcular_saldos
+
+
+class TesteVendasLote(TesteApi):
+    def setUp(self):
+        super().setUp()
+        self.produto_id = self.criar_produto()
+        self.criar_estoque(self.produto_id, 20)
+
+    def lote(self, codigos, tamanho_lote=500):
+        resposta = self.cliente.post("/vendas/lote", json={"tamanho_lote": tamanho_lote, "vendas": [
+            {"codigo": codigo, "itens": [{"produto_id": self.produto_id, "quantidade": 1, "preco": 2.0}]}
+            for codigo in codigos]})
+        self.assertEqual(resposta.status_code, 200, resposta.get_data(as_text=True))
+        return resposta.get_json()
+
+    def test_codigos_repetidos_sao_rejeitados_individualmente(self):
+        self.criar_venda("existente", [(self.produto_id, 1, 2.0)])
+        corpo = self.lote(["a", "existente", "b", "a"], tamanho_lote=2)
+        self.assertEqual((corpo["registradas"], corpo["rejeitadas"]), (2, 2))
+        self.assertEqual([resultado["sucesso"] for resultado in corpo["resultados"]], [True, False, True, False])
+
+    def test_erro_do_banco_informa_as_vendas_ja_gravadas(self):
+        original = servico_venda.acumular_rollups
+        chamadas = []
+
+        def _falhar_no_segundo_bloco(*args, **kwargs):
+            chamadas.append(1)
+            if len(chamadas) == 2:
+                raise OperationalError("INSERT", {}, Exception("database is locked"))
+            return original(*args, **kwargs)
+
+        with mock.patch.object(servico_venda, "acumular_rollups", _falhar_no_segundo_bloco), \
+                self.assertLogs("services.venda", "ERROR"):
+            corpo = self.lote([f"v{i}" for i in range(5)], tamanho_lote=2)
+
+        self.assertEqual((corpo["registradas"], corpo["rejeitadas"]), (2, 3))
+        resultados = corpo["resultados"]
+        self.assertEqual([resultado["sucesso"] for resultado in resultados], [True, True, False, False, False])
+        self.assertIn("database is locked", resultados[2]["mensagem"])
+        self.assertEqual({codigo for (codigo,) in db.session.query(Venda.codigo)}, {"v0", "v1"})
+        self.assertEqual(self.saldos(), {self.produto_id: 18})
+        self.assertEqual(recalcular_saldos(db.session, corrigir=False), [])
@@ -0,0 +1,30 @@
+"""Ponto de entrada WSGI de produção.
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+"""
+import gc
+
+from app import app
+from database import db, init_db
+
+
+def criar_app():
+    """Prepara a aplicação para ser servida por vários processos.
+
+    Com preload_app (gunicorn.conf.py) esta função roda uma única vez no
+    processo mestre, antes do fork: importações, criação das tabelas e geração
+    da especificação OpenAPI ficam compartilhadas pelos workers.
+    """
+    with app.app_context():
+        init_db()
+        # Gera (ou lê de OPENAPI_ARQUIVO) e guarda a especificação OpenAPI antes do fork
+        if app.docs:
+            app.api_doc
+        # Conexões abertas no mestre não podem ser herdadas pelos workers
+        db.engine.dispose()
+    # O que foi carregado até aqui fica fora das coletas (e as páginas compartilhadas após o fork)
+    gc.freeze()
+    return app
+
+
+application = criar_app()